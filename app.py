@@ -28,5 +28,5 @@ def ir():
 if __name__ == '__main__':
     if not invoice_app.Initialize():
         exit(-1)
-    app.run()
+    app.run(threaded=True)
 
@@ -0,0 +1,117 @@
+# Copyright (c) 2024 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Compare per-sample color jitter, blur, noise and normalization with the
+batch operators of loader.batch_transforms on rec sized images.
+
+python3 benchmark/benchmark_batch_ops.py --batch_size=128
+"""
+import argparse
+import os
+import sys
+import time
+
+__dir__ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(__dir__, '..')))
+
+import cv2
+import numpy as np
+
+from ppocr.data.imaug import create_operators, transform
+from ppocr.data.imaug.rec_img_aug import add_gasuss_noise
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch_size", type=int, default=128)
+    parser.add_argument("--height", type=int, default=48)
+    parser.add_argument("--width", type=int, default=320)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args()
+
+
+def per_sample(images, ops):
+    outs = []
+    for img in images:
+        data = transform({'image': img}, ops[:1])
+        img = np.array(data['image'])
+        if np.random.random_sample() < 0.4:
+            img = cv2.GaussianBlur(img, (5, 5), np.random.uniform(0.1, 1.5))
+        if np.random.random_sample() < 0.4:
+            img = add_gasuss_noise(img, var=np.random.uniform(0, 100))
+        data = transform({'image': img}, ops[1:])
+        outs.append(data['image'])
+    return np.stack(outs)
+
+
+def timeit(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        st = time.time()
+        fn()
+        times.append(time.time() - st)
+    return min(times)
+
+
+def main(args):
+    rng = np.random.RandomState(0)
+    images = rng.randint(0, 256, (args.batch_size, args.height, args.width,
+                                  3)).astype('uint8')
+    sample_ops = create_operators([{
+        'ColorJitter': {
+            'brightness': 0.3,
+            'contrast': 0.3,
+            'saturation': 0.3
+        }
+    }, {
+        'NormalizeImage': {
+            'mean': [0.5, 0.5, 0.5],
+            'std': [0.5, 0.5, 0.5],
+            'order': 'hwc'
+        }
+    }, {
+        'ToCHWImage': None
+    }])
+    batch_ops = create_operators([{
+        'BatchColorJitter': {
+            'brightness': 0.3,
+            'contrast': 0.3,
+            'saturation': 0.3
+        }
+    }, {
+        'BatchGaussianBlur': None
+    }, {
+        'BatchGaussianNoise': None
+    }, {
+        'BatchNormalizeImage': {
+            'mean': [0.5, 0.5, 0.5],
+            'std': [0.5, 0.5, 0.5]
+        }
+    }])
+    batch = np.ascontiguousarray(images.transpose((0, 3, 1, 2)))
+
+    sample_time = timeit(lambda: per_sample(images, sample_ops), args.repeat)
+    batch_time = timeit(lambda: transform({'image': batch}, batch_ops),
+                        args.repeat)
+    print("batch: {} x 3x{}x{}".format(args.batch_size, args.height,
+                                       args.width))
+    print("per sample ops: {:.1f} ms, {:.0f} samples/s".format(
+        sample_time * 1000, args.batch_size / sample_time))
+    print("batch ops     : {:.1f} ms, {:.0f} samples/s".format(
+        batch_time * 1000, args.batch_size / batch_time))
+    print("speedup: {:.2f}x".format(sample_time / batch_time))
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,102 @@
+# Copyright (c) 2024 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Latency and peak memory of TextClassifier on pages of synthetic crops.
+--legacy adds back the deepcopy of the crops and the memory shrinking
+after every batch for comparison. Run each mode in its own process so the
+peak RSS is not shared:
+
+python3 benchmark/benchmark_cls.py --cls_model_dir=./ch_ppocr_mobile_v2.0_cls_infer/ \\
+    --num_crops=300 --legacy=False
+"""
+import copy
+import os
+import resource
+import sys
+import time
+
+__dir__ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(__dir__, '..')))
+
+import numpy as np
+
+import tools.infer.utility as utility
+from tools.infer.predict_cls import TextClassifier
+
+
+def parse_args():
+    parser = utility.init_args()
+    parser.add_argument("--num_crops", type=int, default=300)
+    parser.add_argument("--num_pages", type=int, default=20)
+    parser.add_argument("--legacy", type=utility.str2bool, default=False)
+    return parser.parse_args()
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ShrinkingPredictor(object):
+    """
+    the previous behaviour, shrink the memory pool after every batch
+    """
+
+    def __init__(self, predictor):
+        self.predictor = predictor
+
+    def run(self, *args):
+        res = self.predictor.run(*args)
+        self.predictor.try_shrink_memory()
+        return res
+
+    def __getattr__(self, name):
+        return getattr(self.predictor, name)
+
+
+def make_page(num_crops, seed):
+    rng = np.random.RandomState(seed)
+    return [
+        rng.randint(0, 255, (rng.randint(24, 48), rng.randint(20, 600), 3),
+                    np.uint8) for _ in range(num_crops)
+    ]
+
+
+def main(args):
+    text_classifier = TextClassifier(args)
+    if args.legacy and not args.use_onnx:
+        text_classifier.predictor = ShrinkingPredictor(
+            text_classifier.predictor)
+    pages = [make_page(args.num_crops, seed) for seed in range(args.num_pages)]
+
+    # warm up
+    text_classifier(pages[0])
+    rss_start = peak_rss_mb()
+    latencies = []
+    for page in pages:
+        st = time.time()
+        if args.legacy:
+            page = copy.deepcopy(page)
+        text_classifier(page)
+        latencies.append(time.time() - st)
+    latencies = np.array(latencies) * 1000
+    print("legacy: {}, pages: {}, crops per page: {}".format(
+        args.legacy, args.num_pages, args.num_crops))
+    print("page latency p50: {:.1f} ms, p99: {:.1f} ms".format(
+        np.percentile(latencies, 50), np.percentile(latencies, 99)))
+    print("peak RSS: {:.0f} MB ({:.0f} MB above warm up)".format(
+        peak_rss_mb(), peak_rss_mb() - rss_start))
+
+
+if __name__ == "__main__":
+    main(parse_args())
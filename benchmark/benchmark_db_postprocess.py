@@ -0,0 +1,98 @@
+# Copyright (c) 2024 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Compare DBPostProcess with DBBatchPostProcess on dense synthetic
+receipt-like probability maps.
+
+python3 benchmark/benchmark_db_postprocess.py --batch_size=4 --size=960
+"""
+import argparse
+import os
+import sys
+import time
+
+__dir__ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(__dir__, '..')))
+
+import cv2
+import numpy as np
+
+from ppocr.postprocess.db_postprocess import DBPostProcess, DBBatchPostProcess
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch_size", type=int, default=4)
+    parser.add_argument("--size", type=int, default=960)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args()
+
+
+def make_dense_map(size, seed, line_h=10, gap=6):
+    """
+    rows of slightly tilted text segments over low background noise
+    """
+    rng = np.random.RandomState(seed)
+    prob_map = np.zeros((size, size), np.float32)
+    y = 4
+    while y + line_h < size - 4:
+        x = 4
+        while True:
+            w = rng.randint(15, 120)
+            if x + w > size - 4:
+                break
+            rect = ((x + w / 2, y + line_h / 2), (w, line_h),
+                    rng.uniform(-2, 2))
+            pts = cv2.boxPoints(rect).astype(np.int32)
+            cv2.fillPoly(prob_map, [pts], float(rng.uniform(0.7, 1.0)))
+            x += w + rng.randint(8, 30)
+        y += line_h + gap
+    prob_map += rng.uniform(0, 0.2, prob_map.shape).astype(np.float32)
+    return prob_map
+
+
+def timeit(post_process, preds, shape_list, repeat):
+    times = []
+    for _ in range(repeat):
+        st = time.time()
+        res = post_process(preds, shape_list)
+        times.append(time.time() - st)
+    return min(times), res
+
+
+def main(args):
+    maps = np.stack([
+        make_dense_map(args.size, seed) for seed in range(args.batch_size)
+    ])[:, np.newaxis]
+    preds = {'maps': maps}
+    shape_list = np.array([[args.size, args.size, 1., 1.]] * args.batch_size)
+    params = dict(thresh=0.3, box_thresh=0.6, unclip_ratio=1.5)
+
+    base_time, base_res = timeit(
+        DBPostProcess(**params), preds, shape_list, args.repeat)
+    batch_time, batch_res = timeit(
+        DBBatchPostProcess(**params), preds, shape_list, args.repeat)
+
+    base_num = sum([len(res['points']) for res in base_res])
+    batch_num = sum([len(res['points']) for res in batch_res])
+    print("maps: {} x {}x{}".format(args.batch_size, args.size, args.size))
+    print("DBPostProcess     : {:.1f} ms, {} boxes".format(base_time * 1000,
+                                                           base_num))
+    print("DBBatchPostProcess: {:.1f} ms, {} boxes".format(batch_time * 1000,
+                                                           batch_num))
+    print("speedup: {:.2f}x".format(base_time / batch_time))
+
+
+if __name__ == "__main__":
+    main(parse_args())
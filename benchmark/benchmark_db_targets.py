@@ -0,0 +1,145 @@
+# Copyright (c) 2024 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Throughput of the DB training targets, MakeBorderMap and MakeShrinkMap, on
+dense synthetic document samples. MakeBorderMap is compared with the
+per-edge implementation kept in benchmark/PaddleOCR_DBNet, and the target
+cache is measured on a second pass over the same samples.
+
+python3 benchmark/benchmark_db_targets.py --num_samples=20 --size=640
+"""
+import argparse
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+__dir__ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(__dir__, '..')))
+
+import cv2
+import numpy as np
+
+from ppocr.data.imaug.make_border_map import MakeBorderMap
+from ppocr.data.imaug.make_shrink_map import MakeShrinkMap
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num_samples", type=int, default=20)
+    parser.add_argument("--size", type=int, default=640)
+    return parser.parse_args()
+
+
+def load_reference_border_map():
+    # loaded from its file, the package imports training only dependencies
+    path = os.path.join(__dir__, 'PaddleOCR_DBNet', 'data_loader', 'modules',
+                        'make_border_map.py')
+    spec = importlib.util.spec_from_file_location('reference_border_map',
+                                                  path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.MakeBorderMap()
+
+
+def make_sample(size, seed, line_h=14, gap=10):
+    """
+    rows of slightly tilted word boxes
+    """
+    rng = np.random.RandomState(seed)
+    polys = []
+    y = 4
+    while y + line_h < size - 4:
+        x = 4
+        while True:
+            w = rng.randint(20, 120)
+            if x + w > size - 4:
+                break
+            rect = ((x + w / 2, y + line_h / 2), (w, line_h),
+                    rng.uniform(-3, 3))
+            polys.append(cv2.boxPoints(rect))
+            x += w + rng.randint(5, 30)
+        y += line_h + gap
+    return {
+        'image': np.zeros((size, size, 3), np.uint8),
+        'polys': np.array(polys, np.float32),
+        'ignore_tags': [False] * len(polys)
+    }
+
+
+def run(op, samples):
+    outputs = []
+    st = time.time()
+    for sample in samples:
+        data = {
+            'image': sample['image'],
+            'polys': sample['polys'].copy(),
+            'ignore_tags': list(sample['ignore_tags'])
+        }
+        outputs.append(op(data))
+    return time.time() - st, outputs
+
+
+def main(args):
+    samples = [make_sample(args.size, seed) for seed in range(args.num_samples)]
+    num_polys = sum([len(sample['polys']) for sample in samples])
+    print("samples: {}, {}x{}, {:.0f} boxes per sample".format(
+        len(samples), args.size, args.size, num_polys / len(samples)))
+
+    reference = load_reference_border_map()
+    ref_samples = [{
+        'img': s['image'],
+        'text_polys': s['polys'],
+        'ignore_tags': s['ignore_tags']
+    } for s in samples]
+    st = time.time()
+    ref_outputs = [reference(dict(s)) for s in ref_samples]
+    ref_time = time.time() - st
+    border_time, border_outputs = run(MakeBorderMap(), samples)
+    max_diff = max([
+        np.abs(r['threshold_map'] - b['threshold_map']).max()
+        for r, b in zip(ref_outputs, border_outputs)
+    ])
+    shrink_time, _ = run(MakeShrinkMap(), samples)
+
+    cache_dir = tempfile.mkdtemp()
+    try:
+        border_op = MakeBorderMap(cache_dir=cache_dir)
+        shrink_op = MakeShrinkMap(cache_dir=cache_dir)
+
+        def cached(data):
+            return shrink_op(border_op(data))
+
+        fill_time, _ = run(cached, samples)
+        hit_time, _ = run(cached, samples)
+    finally:
+        shutil.rmtree(cache_dir)
+
+    def report(name, elapse):
+        print("{:<28}: {:7.1f} samples/s".format(name, len(samples) /
+                                                 elapse))
+
+    report("MakeBorderMap (per edge)", ref_time)
+    report("MakeBorderMap", border_time)
+    report("MakeShrinkMap", shrink_time)
+    report("both, filling the cache", fill_time)
+    report("both, from the cache", hit_time)
+    print("MakeBorderMap speedup: {:.2f}x, max threshold_map diff: {}".format(
+        ref_time / border_time, max_diff))
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,95 @@
+# Copyright (c) 2024 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+SER latency and peak memory of the invoice app, with the dygraph model or
+with the exported inference model. Run each mode in its own process so the
+peak RSS is not shared:
+
+python3 benchmark/benchmark_invoice_ser.py --mode=dygraph \\
+    -c configs/kie/vi_layoutxlm/ser_vi_layoutxlm_xfund_zh.yml \\
+    -o Architecture.Backbone.checkpoints=./ser_vi_layoutxlm_xfund_pretrained/best_accuracy \\
+    Global.infer_img=./ppstructure/docs/kie/input/
+
+python3 benchmark/benchmark_invoice_ser.py --mode=inference \\
+    -c configs/kie/vi_layoutxlm/ser_vi_layoutxlm_xfund_zh.yml \\
+    -o Global.ser_model_dir=./inference/ser_vi_layoutxlm \\
+    Global.enable_mkldnn=True Global.infer_img=./ppstructure/docs/kie/input/
+"""
+import os
+import resource
+import sys
+import time
+
+__dir__ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(__dir__, '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(__dir__, '../tools')))
+
+import numpy as np
+
+from ppocr.utils.utility import get_image_file_list
+from tools.program import ArgsParser, load_config, merge_config
+from tools.invoice_app import SerPredictor, SerInferencePredictor
+
+
+def parse_args():
+    parser = ArgsParser()
+    parser.add_argument(
+        "--mode",
+        type=str,
+        default="inference",
+        choices=["dygraph", "inference"])
+    parser.add_argument("--batch_size", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args()
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(args):
+    config = merge_config(load_config(args.config), args.opt)
+    rss_start = peak_rss_mb()
+    if args.mode == "inference":
+        predictor = SerInferencePredictor(config)
+    else:
+        predictor = SerPredictor(config)
+
+    # OCR and tokenization are the same for both modes, run them once
+    samples = []
+    for image_file in get_image_file_list(config['Global']['infer_img']):
+        sample = predictor.preprocess({'img_path': image_file})
+        if sample is not None:
+            samples.append(sample)
+    assert len(samples) > 0, "no image with text found"
+
+    # warm up
+    predictor.predict_batch(samples[:args.batch_size])
+    latencies = []
+    for _ in range(args.repeat):
+        for beg in range(0, len(samples), args.batch_size):
+            st = time.time()
+            predictor.predict_batch(samples[beg:beg + args.batch_size])
+            latencies.append(time.time() - st)
+    latencies = np.array(latencies) * 1000
+    print("mode: {}, batch_size: {}, batches: {}".format(
+        args.mode, args.batch_size, len(latencies)))
+    print("SER latency p50: {:.1f} ms, p99: {:.1f} ms".format(
+        np.percentile(latencies, 50), np.percentile(latencies, 99)))
+    print("peak RSS: {:.0f} MB ({:.0f} MB above start)".format(
+        peak_rss_mb(), peak_rss_mb() - rss_start))
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,113 @@
+# Copyright (c) 2024 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Load generator for the invoice endpoint of app.py. Start the server first,
+with or without micro-batching:
+
+python3 app.py -c configs/kie/vi_layoutxlm/ser_vi_layoutxlm_xfund_zh.yml \\
+    -o Architecture.Backbone.checkpoints=... \\
+    Global.max_batch_size=8 Global.max_batch_wait_ms=10
+
+python3 benchmark/benchmark_invoice_serving.py --image_dir=/path/to/invoices \\
+    --concurrency=1,4,16 --requests=200
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+__dir__ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(__dir__, '..')))
+
+from ppocr.utils.utility import get_image_file_list
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--url",
+        type=str,
+        default="http://127.0.0.1:5000/api/v1/invoice/ir",
+        help="invoice endpoint")
+    parser.add_argument(
+        "--image_dir",
+        type=str,
+        required=True,
+        help="invoice files, the paths must be readable by the server")
+    parser.add_argument(
+        "--concurrency",
+        type=str,
+        default="1,4,16",
+        help="comma separated number of concurrent clients")
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=100,
+        help="number of requests for each concurrency level")
+    return parser.parse_args()
+
+
+def send_request(url, file_path):
+    body = json.dumps({'filepath': os.path.abspath(file_path)}).encode()
+    req = urllib.request.Request(
+        url, data=body, headers={'Content-Type': 'application/json'})
+    st = time.time()
+    with urllib.request.urlopen(req) as resp:
+        resp.read()
+    return time.time() - st
+
+
+def run_level(url, file_list, concurrency, request_num):
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(idx):
+        latency = send_request(url, file_list[idx % len(file_list)])
+        with lock:
+            latencies.append(latency)
+
+    st = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(request_num)))
+    elapse = time.time() - st
+    latencies = np.array(latencies) * 1000
+    return {
+        'concurrency': concurrency,
+        'p50_ms': np.percentile(latencies, 50),
+        'p99_ms': np.percentile(latencies, 99),
+        'rps': request_num / elapse
+    }
+
+
+def main(args):
+    file_list = get_image_file_list(args.image_dir)
+    assert len(file_list) > 0, "no files found in {}".format(args.image_dir)
+    # warm up
+    send_request(args.url, file_list[0])
+    print("{:>12} {:>10} {:>10} {:>10}".format("concurrency", "p50(ms)",
+                                               "p99(ms)", "req/s"))
+    for concurrency in [int(c) for c in args.concurrency.split(",")]:
+        res = run_level(args.url, file_list, concurrency, args.requests)
+        print("{:>12} {:>10.1f} {:>10.1f} {:>10.2f}".format(res[
+            'concurrency'], res['p50_ms'], res['p99_ms'], res['rps']))
+
+
+if __name__ == "__main__":
+    main(parse_args())
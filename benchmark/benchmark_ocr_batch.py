@@ -0,0 +1,79 @@
+# Copyright (c) 2024 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Compare the throughput of TextSystem.predict_batch with the per-image loop.
+
+python3 benchmark/benchmark_ocr_batch.py --image_dir=./doc/imgs \\
+    --det_model_dir=... --rec_model_dir=... --det_batch_num=4
+"""
+import os
+import sys
+import time
+
+__dir__ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(__dir__, '..')))
+
+import cv2
+
+import tools.infer.utility as utility
+from tools.infer.predict_system import TextSystem
+from ppocr.utils.utility import get_image_file_list
+from ppocr.utils.logging import get_logger
+
+logger = get_logger()
+
+
+def main(args):
+    img_list = []
+    for image_file in get_image_file_list(args.image_dir):
+        img = cv2.imread(image_file)
+        if img is not None:
+            img_list.append(img)
+    if len(img_list) == 0:
+        logger.error("no images found in {}".format(args.image_dir))
+        return
+    text_sys = TextSystem(args)
+
+    # warm up both paths
+    text_sys(img_list[0])
+    text_sys.predict_batch(img_list[:args.det_batch_num])
+
+    st = time.time()
+    loop_box_num = 0
+    for img in img_list:
+        dt_boxes, rec_res, _ = text_sys(img)
+        loop_box_num += len(rec_res) if rec_res is not None else 0
+    loop_time = time.time() - st
+
+    st = time.time()
+    batch_box_num = 0
+    for beg_no in range(0, len(img_list), args.det_batch_num):
+        ocr_res, _ = text_sys.predict_batch(
+            img_list[beg_no:beg_no + args.det_batch_num])
+        for dt_boxes, rec_res in ocr_res:
+            batch_box_num += len(rec_res) if rec_res is not None else 0
+    batch_time = time.time() - st
+
+    img_num = len(img_list)
+    logger.info("images: {}, det_batch_num: {}, rec_batch_num: {}".format(
+        img_num, args.det_batch_num, args.rec_batch_num))
+    logger.info("per-image loop: {:.3f}s, {:.2f} img/s, {} boxes".format(
+        loop_time, img_num / loop_time, loop_box_num))
+    logger.info("predict_batch : {:.3f}s, {:.2f} img/s, {} boxes".format(
+        batch_time, img_num / batch_time, batch_box_num))
+    logger.info("speedup: {:.2f}x".format(loop_time / batch_time))
+
+
+if __name__ == "__main__":
+    main(utility.parse_args())
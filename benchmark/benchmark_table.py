@@ -0,0 +1,112 @@
+# Copyright (c) 2024 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Per-stage time of TableSystem with the table structure model and the
+text det/rec run one after the other and concurrently. Every image of
+--image_dir is one table, --tables_per_page tables make a page.
+
+python3 benchmark/benchmark_table.py --image_dir=./ppstructure/docs/table \\
+    --det_model_dir=... --rec_model_dir=... --table_model_dir=... \\
+    --rec_char_dict_path=./ppocr/utils/ppocr_keys_v1.txt \\
+    --table_char_dict_path=./ppocr/utils/dict/table_structure_dict.txt
+"""
+import os
+import sys
+import time
+
+__dir__ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(__dir__, '..')))
+
+import cv2
+import numpy as np
+
+from ppocr.utils.utility import get_image_file_list
+from ppocr.utils.logging import get_logger
+from ppstructure.table.predict_table import TableSystem
+from ppstructure.utility import init_args
+
+logger = get_logger()
+
+STAGES = ['table', 'det', 'rec', 'ocr', 'match', 'all']
+
+
+def parse_args():
+    parser = init_args()
+    parser.add_argument("--tables_per_page", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args()
+
+
+def run_pages(table_sys, img_list, tables_per_page):
+    """
+    per-stage time summed over the tables of every page, and the page
+    wall time
+    """
+    page_times = []
+    for beg in range(0, len(img_list), tables_per_page):
+        page_time = {stage: 0. for stage in STAGES}
+        st = time.time()
+        for img in img_list[beg:beg + tables_per_page]:
+            _, time_dict = table_sys(img)
+            for stage in STAGES:
+                page_time[stage] += time_dict[stage]
+        page_time['page'] = time.time() - st
+        page_times.append(page_time)
+    return page_times
+
+
+def main(args):
+    img_list = []
+    for image_file in get_image_file_list(args.image_dir):
+        img = cv2.imread(image_file)
+        if img is not None:
+            img_list.append(img)
+    if len(img_list) == 0:
+        logger.error("no images found in {}".format(args.image_dir))
+        return
+    table_sys = TableSystem(args)
+    structure_executor = table_sys.structure_executor
+    table_sys(img_list[0])
+
+    results = {}
+    for name, executor in [('serial', None), ('parallel', structure_executor)]:
+        if name == 'parallel' and executor is None:
+            continue
+        table_sys.structure_executor = executor
+        best = None
+        for _ in range(args.repeat):
+            page_times = run_pages(table_sys, img_list, args.tables_per_page)
+            total = sum([page_time['page'] for page_time in page_times])
+            if best is None or total < best[0]:
+                best = (total, page_times)
+        results[name] = best[1]
+
+    print("{} tables, {} per page".format(len(img_list), args.tables_per_page))
+    print("{:<10}".format('mode') + "".join(
+        ["{:>10}".format(stage) for stage in STAGES + ['page']]))
+    for name, page_times in results.items():
+        mean_time = [
+            np.mean([page_time[stage] for page_time in page_times]) * 1000
+            for stage in STAGES + ['page']
+        ]
+        print("{:<10}".format(name) + "".join(
+            ["{:>9.1f}ms".format(t) for t in mean_time]))
+    if len(results) == 2:
+        serial = np.mean([t['page'] for t in results['serial']])
+        parallel = np.mean([t['page'] for t in results['parallel']])
+        print("page latency speedup: {:.2f}x".format(serial / parallel))
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,114 @@
+# Copyright (c) 2024 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Time TableMatch.match_result against the python loop it replaced on
+synthetic tables: a grid of rows x cols cells with boxes_per_cell jittered
+OCR boxes in every cell, and check that both match the same way.
+
+python3 benchmark/benchmark_table_match.py --rows 50 --cols 20 \\
+    --boxes_per_cell 2
+"""
+import argparse
+import os
+import sys
+import time
+
+__dir__ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(__dir__, '..')))
+
+import numpy as np
+
+from ppstructure.table.matcher import TableMatch, distance, compute_iou
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--cols", type=int, default=20)
+    parser.add_argument("--boxes_per_cell", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def match_result_loop(dt_boxes, pred_bboxes):
+    """
+    reference, the python loop TableMatch.match_result used before
+    """
+    matched = {}
+    for i, gt_box in enumerate(dt_boxes):
+        distances = []
+        for j, pred_box in enumerate(pred_bboxes):
+            if len(pred_box) == 8:
+                pred_box = [
+                    np.min(pred_box[0::2]), np.min(pred_box[1::2]),
+                    np.max(pred_box[0::2]), np.max(pred_box[1::2])
+                ]
+            distances.append((distance(gt_box, pred_box),
+                              1. - compute_iou(gt_box, pred_box)
+                              ))  # compute iou and l1 distance
+        sorted_distances = distances.copy()
+        # select det box by iou and l1 distance
+        sorted_distances = sorted(
+            sorted_distances, key=lambda item: (item[1], item[0]))
+        if distances.index(sorted_distances[0]) not in matched.keys():
+            matched[distances.index(sorted_distances[0])] = [i]
+        else:
+            matched[distances.index(sorted_distances[0])].append(i)
+    return matched
+
+
+def make_table(rows, cols, boxes_per_cell, seed):
+    """
+    float32 cell boxes as quads like the table structure model outputs and
+    the OCR boxes of the det model, jittered around the cells
+    """
+    rng = np.random.RandomState(seed)
+    cell_w, cell_h = 120., 30.
+    x0, y0 = np.meshgrid(np.arange(cols) * cell_w, np.arange(rows) * cell_h)
+    cells = np.stack(
+        [x0.ravel(), y0.ravel(), x0.ravel() + cell_w, y0.ravel() + cell_h],
+        axis=1)
+    pred_bboxes = cells[:, [0, 1, 2, 1, 2, 3, 0, 3]].astype(np.float32)
+
+    cells = np.repeat(cells, boxes_per_cell, axis=0)
+    dt_boxes = cells + rng.uniform(-8, 8, cells.shape)
+    dt_boxes[:, 2:] = np.maximum(dt_boxes[:, 2:], dt_boxes[:, :2] + 1)
+    return dt_boxes.astype(np.float32), pred_bboxes
+
+
+def main(args):
+    dt_boxes, pred_bboxes = make_table(args.rows, args.cols,
+                                       args.boxes_per_cell, args.seed)
+    matcher = TableMatch()
+
+    st = time.time()
+    ref = match_result_loop(dt_boxes, pred_bboxes)
+    loop_time = time.time() - st
+
+    vec_time = float('inf')
+    for _ in range(args.repeat):
+        st = time.time()
+        res = matcher.match_result(dt_boxes, pred_bboxes)
+        vec_time = min(vec_time, time.time() - st)
+    assert res == ref and list(res) == list(ref), \
+        "match_result differs from the loop reference"
+
+    print("{} ocr boxes x {} cells".format(len(dt_boxes), len(pred_bboxes)))
+    print("loop: {:.3f}s, numpy: {:.4f}s, speedup: {:.1f}x".format(
+        loop_time, vec_time, loop_time / vec_time))
+
+
+if __name__ == "__main__":
+    main(parse_args())
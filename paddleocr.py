@@ -46,7 +46,8 @@ ppocr = importlib.import_module('ppocr', 'paddleocr')
 ppstructure = importlib.import_module('ppstructure', 'paddleocr')
 from ppocr.utils.logging import get_logger
 from tools.infer import predict_system
-from ppocr.utils.utility import check_and_read, get_image_file_list, alpha_to_color, binarize_img
+from ppocr.utils.utility import check_and_read, get_image_file_list, alpha_to_color, binarize_img, LazyPDFReader
+from ppocr.utils.result_cache import ResultCache, get_fingerprint
 from ppocr.utils.network import maybe_download, download_with_progressbar, is_link, confirm_model_dir_url
 from tools.infer.utility import draw_ocr, str2bool, check_gpu
 from ppstructure.utility import init_args, draw_structure_result
@@ -515,7 +516,7 @@ def img_decode(content: bytes):
     return cv2.imdecode(np_arr, cv2.IMREAD_UNCHANGED)
 
 
-def check_img(img):
+def check_img(img, page_num=0, lazy=False):
     if isinstance(img, bytes):
         img = img_decode(img)
     if isinstance(img, str):
@@ -524,7 +525,8 @@ def check_img(img):
             download_with_progressbar(img, 'tmp.jpg')
             img = 'tmp.jpg'
         image_file = img
-        img, flag_gif, flag_pdf = check_and_read(image_file)
+        img, flag_gif, flag_pdf = check_and_read(
+            image_file, page_num=page_num, lazy=lazy)
         if not flag_gif and not flag_pdf:
             with open(image_file, 'rb') as f:
                 img_str = f.read()
@@ -615,6 +617,27 @@ class PaddleOCR(predict_system.TextSystem):
         # init det_model and rec_model
         super().__init__(params)
         self.page_num = params.page_num
+        self.result_cache = None
+        if params.use_result_cache:
+            self.result_cache = ResultCache(
+                fingerprint=get_fingerprint(
+                    vars(params), [
+                        params.det_model_dir, params.rec_model_dir,
+                        params.cls_model_dir
+                    ]),
+                max_memory_items=params.result_cache_size,
+                disk_dir=params.result_cache_dir,
+                max_disk_mb=params.result_cache_max_disk_mb)
+
+    def run_with_cache(self, fn, img, *key_args):
+        """
+        fn(img), answered from the result cache when it is enabled and the
+        same image was processed before with the same key_args
+        """
+        if self.result_cache is None:
+            return fn(img)
+        key = self.result_cache.make_key(img, *key_args)
+        return self.result_cache.get_or_compute(key, lambda: fn(img))
 
     def ocr(self,
             img,
@@ -637,19 +660,22 @@ class PaddleOCR(predict_system.TextSystem):
         """
         assert isinstance(img, (np.ndarray, list, str, bytes))
         if isinstance(img, list) and det == True:
-            logger.error('When input a list of images, det must be false')
+            logger.error(
+                'When input a list of images, det must be false, use ocr_batch instead'
+            )
             exit(0)
         if cls == True and self.use_angle_cls == False:
             logger.warning(
                 'Since the angle classifier is not initialized, it will not be used during the forward process'
             )
 
-        img = check_img(img)
+        # pdf pages are rasterized while the previous page is processed
+        img = check_img(img, page_num=self.page_num, lazy=True)
         # for infer pdf file
-        if isinstance(img, list):
-            if self.page_num > len(img) or self.page_num == 0:
-                self.page_num = len(img)
-            imgs = img[:self.page_num]
+        if isinstance(img, LazyPDFReader):
+            imgs = img
+        elif isinstance(img, list):
+            imgs = img[:self.page_num] if self.page_num > 0 else img
         else:
             imgs = [img]
 
@@ -662,27 +688,35 @@ class PaddleOCR(predict_system.TextSystem):
             return _image
 
         if det and rec:
-            ocr_res = []
-            for idx, img in enumerate(imgs):
+
+            def ocr_page(img):
                 img = preprocess_image(img)
                 dt_boxes, rec_res, _ = self.__call__(img, cls)
                 if not dt_boxes and not rec_res:
-                    ocr_res.append(None)
-                    continue
-                tmp_res = [[box.tolist(), res]
-                           for box, res in zip(dt_boxes, rec_res)]
-                ocr_res.append(tmp_res)
-            return ocr_res
-        elif det and not rec:
+                    return None
+                return [[box.tolist(), res]
+                        for box, res in zip(dt_boxes, rec_res)]
+
             ocr_res = []
             for idx, img in enumerate(imgs):
+                ocr_res.append(
+                    self.run_with_cache(ocr_page, img, 'ocr', cls, bin, inv,
+                                        alpha_color))
+            return ocr_res
+        elif det and not rec:
+
+            def det_page(img):
                 img = preprocess_image(img)
                 dt_boxes, elapse = self.text_detector(img)
                 if not dt_boxes:
-                    ocr_res.append(None)
-                    continue
-                tmp_res = [box.tolist() for box in dt_boxes]
-                ocr_res.append(tmp_res)
+                    return None
+                return [box.tolist() for box in dt_boxes]
+
+            ocr_res = []
+            for idx, img in enumerate(imgs):
+                ocr_res.append(
+                    self.run_with_cache(det_page, img, 'det', bin, inv,
+                                        alpha_color))
             return ocr_res
         else:
             ocr_res = []
@@ -701,6 +735,58 @@ class PaddleOCR(predict_system.TextSystem):
                 return cls_res
             return ocr_res
 
+    def ocr_batch(self,
+                  imgs,
+                  cls=True,
+                  bin=False,
+                  inv=False,
+                  alpha_color=(255, 255, 255)):
+        """
+        det + rec OCR for a list of images with cross-image batching
+        args：
+            imgs: list of images, each one can be ndarray, img_path or bytes
+            cls, bin, inv, alpha_color: same as ocr
+        return:
+            one result per input, which is the same as ocr(img) returns
+        """
+        assert isinstance(imgs, list)
+        if cls == True and self.use_angle_cls == False:
+            logger.warning(
+                'Since the angle classifier is not initialized, it will not be used during the forward process'
+            )
+
+        page_list, page_owner = [], []
+        for idx, img in enumerate(imgs):
+            img = check_img(img)
+            # for infer pdf file
+            if isinstance(img, list):
+                page_num = self.page_num
+                if page_num > len(img) or page_num == 0:
+                    page_num = len(img)
+                pages = img[:page_num]
+            else:
+                pages = [img]
+            for page in pages:
+                if page is not None:
+                    page = alpha_to_color(page, alpha_color)
+                    if inv:
+                        page = cv2.bitwise_not(page)
+                    if bin:
+                        page = binarize_img(page)
+                page_list.append(page)
+                page_owner.append(idx)
+
+        batch_res, _ = self.predict_batch(page_list, cls)
+        ocr_res = [[] for _ in imgs]
+        for owner, (dt_boxes, rec_res) in zip(page_owner, batch_res):
+            if not dt_boxes and not rec_res:
+                ocr_res[owner].append(None)
+                continue
+            tmp_res = [[box.tolist(), res]
+                       for box, res in zip(dt_boxes, rec_res)]
+            ocr_res[owner].append(tmp_res)
+        return ocr_res
+
 
 class PPStructure(StructureSystem):
     def __init__(self, **kwargs):
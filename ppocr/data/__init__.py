@@ -32,11 +32,12 @@ import copy
 from paddle.io import Dataset, DataLoader, BatchSampler, DistributedBatchSampler
 import paddle.distributed as dist
 
-from ppocr.data.imaug import transform, create_operators
+from ppocr.data.imaug import transform, transform_with_ocr, create_operators, KeepKeys
 from ppocr.data.simple_dataset import SimpleDataSet, MultiScaleDataSet
 from ppocr.data.lmdb_dataset import LMDBDataSet, LMDBDataSetSR, LMDBDataSetTableMaster
 from ppocr.data.pgnet_dataset import PGDataSet
 from ppocr.data.pubtab_dataset import PubTabDataSet
+from ppocr.data.shard_dataset import ShardDataSet
 from ppocr.data.multi_scale_sampler import MultiScaleSampler
 
 # for PaddleX dataset_type
@@ -97,6 +98,7 @@ def build_dataloader(config, mode, device, logger, seed=None):
         'MSTextRecDataset',
         'PubTabTableRecDataset',
         'KieDataset',
+        'ShardDataSet',
     ]
     module_name = config[mode]['dataset']['name']
     assert module_name in support_dict, Exception(
@@ -135,9 +137,31 @@ def build_dataloader(config, mode, device, logger, seed=None):
             shuffle=shuffle,
             drop_last=drop_last)
 
+    # batch operators run in the collate function on the collated batch
+    batch_ops = None
+    if 'batch_transforms' in loader_config:
+        batch_ops = create_operators(loader_config['batch_transforms'],
+                                     config['Global'])
+        keep_keys = [
+            op.keep_keys for op in getattr(dataset, 'ops', [])
+            if isinstance(op, KeepKeys)
+        ]
+        keep_keys = keep_keys[-1] if len(keep_keys) > 0 else None
+
     if 'collate_fn' in loader_config:
         from . import collate_fn
-        collate_fn = getattr(collate_fn, loader_config['collate_fn'])()
+        collate_cls = getattr(collate_fn, loader_config['collate_fn'])
+        if batch_ops is None:
+            collate_fn = collate_cls()
+        else:
+            assert collate_cls in [
+                collate_fn.DictCollator, collate_fn.ListCollator
+            ], "batch_transforms are not supported by {}".format(
+                loader_config['collate_fn'])
+            collate_fn = collate_cls(batch_ops=batch_ops, keep_keys=keep_keys)
+    elif batch_ops is not None:
+        from .collate_fn import BatchOpsCollator
+        collate_fn = BatchOpsCollator(batch_ops, keep_keys)
     else:
         collate_fn = None
     data_loader = DataLoader(
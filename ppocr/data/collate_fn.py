@@ -17,14 +17,46 @@ import numbers
 import numpy as np
 from collections import defaultdict
 
+from .imaug import transform
+
+
+def stack_field(values):
+    values = [
+        v.numpy() if isinstance(v, paddle.Tensor) else v for v in values
+    ]
+    return np.stack(values) if isinstance(values[0],
+                                          np.ndarray) else np.array(values)
+
+
+def apply_batch_ops(data_dict, keys, batch_ops, names=None):
+    """
+    stack the keys of data_dict and run batch_ops on them, under names
+    (e.g. the keep_keys of the samples) if the keys are list indices
+    """
+    names = dict(zip(keys, names if names is not None else keys))
+    batch = {names[k]: stack_field(data_dict[k]) for k in keys}
+    batch = transform(batch, batch_ops)
+    for k in keys:
+        data_dict[k] = batch[names[k]]
+    return data_dict
+
+
+def get_field_names(idxs, keep_keys):
+    # without KeepKeys the image is expected first, as in all the configs
+    if keep_keys is None:
+        return ['image' if idx == 0 else idx for idx in idxs]
+    return [keep_keys[idx] for idx in idxs]
+
 
 class DictCollator(object):
     """
     data batch
     """
 
+    def __init__(self, batch_ops=None, **kwargs):
+        self.batch_ops = batch_ops
+
     def __call__(self, batch):
-        # todo：support batch operators 
         data_dict = defaultdict(list)
         to_tensor_keys = []
         for sample in batch:
@@ -33,6 +65,9 @@ class DictCollator(object):
                     if k not in to_tensor_keys:
                         to_tensor_keys.append(k)
                 data_dict[k].append(v)
+        if self.batch_ops:
+            data_dict = apply_batch_ops(data_dict, to_tensor_keys,
+                                        self.batch_ops)
         for k in to_tensor_keys:
             data_dict[k] = paddle.to_tensor(data_dict[k])
         return data_dict
@@ -43,8 +78,11 @@ class ListCollator(object):
     data batch
     """
 
+    def __init__(self, batch_ops=None, keep_keys=None, **kwargs):
+        self.batch_ops = batch_ops
+        self.keep_keys = keep_keys
+
     def __call__(self, batch):
-        # todo：support batch operators 
         data_dict = defaultdict(list)
         to_tensor_idxs = []
         for sample in batch:
@@ -53,11 +91,37 @@ class ListCollator(object):
                     if idx not in to_tensor_idxs:
                         to_tensor_idxs.append(idx)
                 data_dict[idx].append(v)
+        if self.batch_ops:
+            data_dict = apply_batch_ops(
+                data_dict, to_tensor_idxs, self.batch_ops,
+                get_field_names(to_tensor_idxs, self.keep_keys))
         for idx in to_tensor_idxs:
             data_dict[idx] = paddle.to_tensor(data_dict[idx])
         return list(data_dict.values())
 
 
+class BatchOpsCollator(object):
+    """
+    the default numpy collation of list samples followed by the batch
+    operators of loader.batch_transforms
+    """
+
+    def __init__(self, batch_ops, keep_keys=None, **kwargs):
+        self.batch_ops = batch_ops
+        self.keep_keys = keep_keys
+
+    def __call__(self, batch):
+        fields = list(zip(*batch))
+        data_dict = {
+            idx: list(values)
+            for idx, values in enumerate(fields)
+        }
+        idxs = list(range(len(fields)))
+        data_dict = apply_batch_ops(data_dict, idxs, self.batch_ops,
+                                    get_field_names(idxs, self.keep_keys))
+        return [data_dict[idx] for idx in idxs]
+
+
 class SSLRotateCollate(object):
     """
     bach: [
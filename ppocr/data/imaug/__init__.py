@@ -32,6 +32,7 @@ from .ssl_img_aug import SSLRotateResize
 from .randaugment import RandAugment
 from .copy_paste import CopyPaste
 from .ColorJitter import ColorJitter
+from .batch_operators import *
 from .operators import *
 from .label_ops import *
 
@@ -59,6 +60,34 @@ def transform(data, ops=None):
     return data
 
 
+def transform_with_ocr(data_list, ops):
+    """
+    transform a list of KIE inference samples with the OCR hoisted out of
+    VQATokenLabelEncode: the ops before it run per sample, the OCR runs once
+    over all decoded images, and its results are passed to the rest of the
+    ops as data['ocr_result']. Failed samples are returned as None.
+    """
+    ocr_idx = [
+        idx for idx, op in enumerate(ops)
+        if isinstance(op, VQATokenLabelEncode) and op.infer_mode and
+        op.ocr_engine is not None and hasattr(op.ocr_engine, 'ocr_batch')
+    ]
+    if len(ocr_idx) == 0:
+        return [transform(data, ops) for data in data_list]
+    ocr_idx = ocr_idx[0]
+    data_list = [transform(data, ops[:ocr_idx]) for data in data_list]
+    valid_list = [data for data in data_list if data is not None]
+    if len(valid_list) > 0:
+        ocr_results = ops[ocr_idx].ocr_engine.ocr_batch(
+            [data['image'] for data in valid_list], cls=False)
+        for data, ocr_result in zip(valid_list, ocr_results):
+            data['ocr_result'] = ocr_result[0]
+    return [
+        None if data is None else transform(data, ops[ocr_idx:])
+        for data in data_list
+    ]
+
+
 def create_operators(op_param_list, global_config=None):
     """
     create operators based on the config
@@ -0,0 +1,165 @@
+# Copyright (c) 2024 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Batch operators, declared in loader.batch_transforms and run by the
+collate function on the collated batch. data is a dict of batched numpy
+arrays, data[key] is a [B, C, H, W] image batch with pixel values in
+[0, 255], so BatchNormalizeImage goes last.
+"""
+
+import cv2
+import numpy as np
+
+__all__ = [
+    'BatchNormalizeImage', 'BatchColorJitter', 'BatchGaussianNoise',
+    'BatchGaussianBlur'
+]
+
+
+def _sample_mask(batch_size, prob):
+    return np.random.random_sample(batch_size) < prob
+
+
+def _float_image(data, key):
+    # the collated batch is owned by the collate function, a contiguous
+    # float32 batch is modified in place
+    return np.require(data[key], dtype='float32', requirements=['C', 'W'])
+
+
+def _uniform(low, high, size):
+    return np.random.uniform(low, high, size).astype('float32')
+
+
+class BatchNormalizeImage(object):
+    """ normalize a [B, C, H, W] batch, see NormalizeImage
+    """
+
+    def __init__(self, scale=None, mean=None, std=None, key='image',
+                 **kwargs):
+        if isinstance(scale, str):
+            scale = eval(scale)
+        self.scale = np.float32(scale if scale is not None else 1.0 / 255.0)
+        mean = mean if mean is not None else [0.485, 0.456, 0.406]
+        std = std if std is not None else [0.229, 0.224, 0.225]
+        self.mean = np.array(mean).reshape((1, -1, 1, 1)).astype('float32')
+        self.std = np.array(std).reshape((1, -1, 1, 1)).astype('float32')
+        self.key = key
+
+    def __call__(self, data):
+        img = _float_image(data, self.key)
+        img *= self.scale
+        img -= self.mean
+        img /= self.std
+        data[self.key] = img
+        return data
+
+
+class BatchColorJitter(object):
+    """ random brightness, contrast and saturation factors per sample, drawn
+    like ColorJitter from [max(0, 1 - v), 1 + v]
+    """
+
+    def __init__(self,
+                 brightness=0.,
+                 contrast=0.,
+                 saturation=0.,
+                 prob=1.0,
+                 key='image',
+                 **kwargs):
+        self.brightness = brightness
+        self.contrast = contrast
+        self.saturation = saturation
+        self.prob = prob
+        self.key = key
+
+    def _factors(self, value, mask):
+        if value <= 0:
+            return np.ones(len(mask), dtype='float32')
+        factors = _uniform(max(0, 1 - value), 1 + value, len(mask))
+        factors[~mask] = 1
+        return factors
+
+    def __call__(self, data):
+        img = _float_image(data, self.key)
+        mask = _sample_mask(len(img), self.prob)
+        if mask.any():
+            b = self._factors(self.brightness, mask)
+            c = self._factors(self.contrast, mask)
+            s = self._factors(self.saturation, mask)
+            # brightness, contrast around the image mean and saturation
+            # around the channel mean, folded into a * x + b * gray + c
+            mean = img.mean(axis=(1, 2, 3))
+            gray = img.mean(axis=1, keepdims=True)
+            shape = (-1, 1, 1, 1)
+            img *= (s * c * b).reshape(shape)
+            gray *= ((1 - s) * c * b).reshape(shape)
+            img += gray
+            img += ((1 - c) * b * mean).reshape(shape)
+            np.clip(img, 0, 255, out=img)
+        data[self.key] = img
+        return data
+
+
+class BatchGaussianNoise(object):
+    """ additive gaussian noise, std drawn per sample from std_range
+    """
+
+    def __init__(self, std_range=(0., 10.), prob=0.4, key='image', **kwargs):
+        self.std_range = std_range
+        self.prob = prob
+        self.key = key
+
+    def __call__(self, data):
+        img = _float_image(data, self.key)
+        mask = _sample_mask(len(img), self.prob)
+        if mask.any():
+            # float32 gaussian samples of a Generator are much faster than
+            # np.random.normal, it is seeded from np.random
+            rng = np.random.default_rng(np.random.randint(2**31))
+            idx = np.nonzero(mask)[0]
+            std = _uniform(self.std_range[0], self.std_range[1], len(idx))
+            for i, sample_std in zip(idx, std):
+                noise = rng.standard_normal(img.shape[1:], dtype='float32')
+                noise *= sample_std
+                img[i] += noise
+            np.clip(img, 0, 255, out=img)
+        data[self.key] = img
+        return data
+
+
+class BatchGaussianBlur(object):
+    """ gaussian blur, sigma drawn per sample from sigma_range with the
+    kernel size of cv2.GaussianBlur
+    """
+
+    def __init__(self, sigma_range=(0.1, 1.5), prob=0.4, key='image',
+                 **kwargs):
+        self.sigma_range = sigma_range
+        self.prob = prob
+        self.key = key
+
+    def __call__(self, data):
+        img = _float_image(data, self.key)
+        mask = _sample_mask(len(img), self.prob)
+        if mask.any():
+            idx = np.nonzero(mask)[0]
+            sigma = _uniform(self.sigma_range[0], self.sigma_range[1],
+                             len(idx))
+            for i, sample_sigma in zip(idx, sigma):
+                # every [H, W] channel plane is contiguous
+                for c in range(img.shape[1]):
+                    img[i, c] = cv2.GaussianBlur(img[i, c], (0, 0),
+                                                 float(sample_sigma))
+        data[self.key] = img
+        return data
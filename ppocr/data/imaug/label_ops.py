@@ -26,6 +26,7 @@ import copy
 from random import sample
 
 from ppocr.utils.logging import get_logger
+from ppocr.utils.result_cache import LRUCache
 from ppocr.data.imaug.vqa.augment import order_by_tbyx
 
 
@@ -993,6 +994,8 @@ class VQATokenLabelEncode(object):
     """
     Label encode for NLP VQA methods
     """
+    # transcription -> encoded ids, shared by all encoders of an algorithm
+    encode_caches = {}
 
     def __init__(self,
                  class_path,
@@ -1003,6 +1006,7 @@ class VQATokenLabelEncode(object):
                  order_method=None,
                  infer_mode=False,
                  ocr_engine=None,
+                 encode_cache_size=4096,
                  **kwargs):
         super(VQATokenLabelEncode, self).__init__()
         from paddlenlp.transformers import LayoutXLMTokenizer, LayoutLMTokenizer, LayoutLMv2Tokenizer
@@ -1025,6 +1029,9 @@ class VQATokenLabelEncode(object):
         tokenizer_config = tokenizer_dict[algorithm]
         self.tokenizer = tokenizer_config['class'].from_pretrained(
             tokenizer_config['pretrained_model'])
+        if algorithm not in self.encode_caches:
+            self.encode_caches[algorithm] = LRUCache(encode_cache_size)
+        self.encode_cache = self.encode_caches[algorithm]
         self.label2id_map, id2label_map = load_vqa_bio_label_maps(class_path)
         self.add_special_ids = add_special_ids
         self.infer_mode = infer_mode
@@ -1117,11 +1124,14 @@ class VQATokenLabelEncode(object):
             # smooth_box
             info["bbox"] = self.trans_poly_to_bbox(info["points"])
 
-            encode_res = self.tokenizer.encode(
-                text,
-                pad_to_max_seq_len=False,
-                return_attention_mask=True,
-                return_token_type_ids=True)
+            # field names such as "名称" repeat on every form
+            encode_res = dict(
+                self.encode_cache.get_or_compute(
+                    text, lambda: self.tokenizer.encode(
+                        text,
+                        pad_to_max_seq_len=False,
+                        return_attention_mask=True,
+                        return_token_type_ids=True)))
 
             if not self.add_special_ids:
                 # TODO: use tok.all_special_ids to remove
@@ -1201,7 +1211,11 @@ class VQATokenLabelEncode(object):
 
     def _load_ocr_info(self, data):
         if self.infer_mode:
-            ocr_result = self.ocr_engine.ocr(data['image'], cls=False)[0]
+            # the caller may run the ocr itself, e.g. for a batch of pages
+            if 'ocr_result' in data:
+                ocr_result = data['ocr_result'] or []
+            else:
+                ocr_result = self.ocr_engine.ocr(data['image'], cls=False)[0]
             ocr_info = []
             for res in ocr_result:
                 ocr_info.append({
@@ -26,10 +26,14 @@ import cv2
 
 np.seterr(divide='ignore', invalid='ignore')
 import pyclipper
-from shapely.geometry import Polygon
 import sys
 import warnings
 
+from ppocr.utils.result_cache import ResultCache
+
+# (edges, height, width) elements of a chunk in _min_edge_distance
+_EDGE_CHUNK_ELEMS = 1 << 21
+
 warnings.simplefilter("ignore")
 
 __all__ = ['MakeBorderMap']
@@ -40,6 +44,8 @@ class MakeBorderMap(object):
                  shrink_ratio=0.4,
                  thresh_min=0.3,
                  thresh_max=0.7,
+                 cache_dir=None,
+                 cache_max_disk_mb=10240,
                  **kwargs):
         self.shrink_ratio = shrink_ratio
         self.thresh_min = thresh_min
@@ -48,9 +54,28 @@ class MakeBorderMap(object):
                 'epoch'] != "None":
             self.shrink_ratio = self.shrink_ratio + 0.2 * kwargs[
                 'epoch'] / float(kwargs['total_epoch'])
+        # targets of the same polygons on the same image size are reused
+        self.cache = None
+        if cache_dir is not None:
+            self.cache = ResultCache(
+                fingerprint='MakeBorderMap:{}:{}:{}'.format(
+                    self.shrink_ratio, thresh_min, thresh_max),
+                max_memory_items=0,
+                disk_dir=cache_dir,
+                max_disk_mb=cache_max_disk_mb)
 
     def __call__(self, data):
+        if self.cache is None:
+            canvas, mask = self.make_border_map(data)
+        else:
+            key = make_target_key(self.cache, data)
+            canvas, mask = self.cache.get_or_compute(
+                key, lambda: self.make_border_map(data))
+        data['threshold_map'] = canvas
+        data['threshold_mask'] = mask
+        return data
 
+    def make_border_map(self, data):
         img = data['image']
         text_polys = data['polys']
         ignore_tags = data['ignore_tags']
@@ -63,21 +88,17 @@ class MakeBorderMap(object):
                 continue
             self.draw_border_map(text_polys[i], canvas, mask=mask)
         canvas = canvas * (self.thresh_max - self.thresh_min) + self.thresh_min
-
-        data['threshold_map'] = canvas
-        data['threshold_mask'] = mask
-        return data
+        return canvas, mask
 
     def draw_border_map(self, polygon, canvas, mask):
         polygon = np.array(polygon)
         assert polygon.ndim == 2
         assert polygon.shape[1] == 2
 
-        polygon_shape = Polygon(polygon)
-        if polygon_shape.area <= 0:
+        area, length = polygon_area_length(polygon)
+        if area <= 0:
             return
-        distance = polygon_shape.area * (
-            1 - np.power(self.shrink_ratio, 2)) / polygon_shape.length
+        distance = area * (1 - np.power(self.shrink_ratio, 2)) / length
         subject = [tuple(l) for l in polygon]
         padding = pyclipper.PyclipperOffset()
         padding.AddPath(subject, pyclipper.JT_ROUND, pyclipper.ET_CLOSEDPOLYGON)
@@ -95,20 +116,13 @@ class MakeBorderMap(object):
         polygon[:, 0] = polygon[:, 0] - xmin
         polygon[:, 1] = polygon[:, 1] - ymin
 
-        xs = np.broadcast_to(
-            np.linspace(
-                0, width - 1, num=width).reshape(1, width), (height, width))
-        ys = np.broadcast_to(
-            np.linspace(
-                0, height - 1, num=height).reshape(height, 1), (height, width))
-
-        distance_map = np.zeros(
-            (polygon.shape[0], height, width), dtype=np.float32)
-        for i in range(polygon.shape[0]):
-            j = (i + 1) % polygon.shape[0]
-            absolute_distance = self._distance(xs, ys, polygon[i], polygon[j])
-            distance_map[i] = np.clip(absolute_distance / distance, 0, 1)
-        distance_map = distance_map.min(axis=0)
+        xs = np.arange(width, dtype=np.float64).reshape(1, width)
+        ys = np.arange(height, dtype=np.float64).reshape(height, 1)
+
+        # the clip commutes with the min over the edges
+        distance_map = self._min_edge_distance(xs, ys, polygon)
+        distance_map = np.clip(distance_map / distance, 0,
+                               1).astype(np.float32)
 
         xmin_valid = min(max(0, xmin), canvas.shape[1] - 1)
         xmax_valid = min(max(0, xmax), canvas.shape[1] - 1)
@@ -119,6 +133,53 @@ class MakeBorderMap(object):
                              xmin_valid - xmin:xmax_valid - xmax + width],
             canvas[ymin_valid:ymax_valid + 1, xmin_valid:xmax_valid + 1])
 
+    def _min_edge_distance(self, xs, ys, polygon):
+        '''
+        the min over the edges of polygon of _edge_distance, computed for
+        chunks of edges so that the float64 temporaries stay around
+        _EDGE_CHUNK_ELEMS values for polygons with many edges
+        '''
+        num_edges = len(polygon)
+        chunk = max(1, _EDGE_CHUNK_ELEMS // (ys.shape[0] * xs.shape[1]))
+        distance_map = None
+        for beg in range(0, num_edges, chunk):
+            end = min(beg + chunk, num_edges)
+            chunk_map = self._edge_distance(xs, ys, polygon, beg,
+                                            end).min(axis=0)
+            distance_map = chunk_map if distance_map is None else np.minimum(
+                distance_map, chunk_map, out=distance_map)
+        return distance_map
+
+    def _edge_distance(self, xs, ys, polygon, beg, end):
+        '''
+        the distance of _distance from every point to the edges beg to end
+        of polygon at once, as a (end - beg, height, width) array
+        ys: coordinates in the first axis, (height, 1)
+        xs: coordinates in the second axis, (1, width)
+        '''
+        # edge i goes from point i to point i + 1, the last one back to 0
+        point_idx = np.arange(beg, end + 1) % len(polygon)
+        points = polygon[point_idx][:, :, np.newaxis, np.newaxis]
+        point_1, point_2 = points[:-1], points[1:]
+        square_distance_p = np.square(xs - points[:, 0]) + np.square(
+            ys - points[:, 1])
+        # edge i ends where edge i + 1 starts
+        square_distance_1 = square_distance_p[:-1]
+        square_distance_2 = square_distance_p[1:]
+        square_distance = np.square(point_1[:, 0] - point_2[:, 0]) + np.square(
+            point_1[:, 1] - point_2[:, 1])
+
+        square_distance_12 = square_distance_1 * square_distance_2
+        cosin = (square_distance - square_distance_1 - square_distance_2) / (
+            2 * np.sqrt(square_distance_12))
+        square_sin = 1 - np.square(cosin)
+        square_sin = np.nan_to_num(square_sin, copy=False)
+        result = np.sqrt(square_distance_12 * square_sin / square_distance)
+        near_end = cosin < 0
+        result[near_end] = np.sqrt(
+            np.fmin(square_distance_1, square_distance_2)[near_end])
+        return result
+
     def _distance(self, xs, ys, point_1, point_2):
         '''
         compute the distance from point to a line
@@ -175,3 +236,27 @@ class MakeBorderMap(object):
             lineType=cv2.LINE_AA,
             shift=0)
         return ex_point_1, ex_point_2
+
+
+def polygon_area_length(polygon):
+    """
+    area and perimeter of a polygon, the same as those of shapely
+    """
+    polygon = np.asarray(polygon, dtype=np.float64)
+    x, y = polygon[:, 0], polygon[:, 1]
+    x_next, y_next = np.roll(x, -1), np.roll(y, -1)
+    area = abs(np.sum(x * y_next - x_next * y)) / 2.
+    length = np.sum(np.sqrt(np.square(x_next - x) + np.square(y_next - y)))
+    return area, length
+
+
+def make_target_key(cache, data):
+    """
+    cache key of the targets of data, made of its image size, polygons and
+    ignore tags
+    """
+    polys = [np.asarray(poly, dtype=np.float32) for poly in data['polys']]
+    points = np.concatenate(polys) if len(polys) > 0 else np.zeros((0, 2))
+    return cache.make_key(points, data['image'].shape[:2],
+                          [len(poly) for poly in polys],
+                          [bool(tag) for tag in data['ignore_tags']])
@@ -23,9 +23,11 @@ from __future__ import unicode_literals
 
 import numpy as np
 import cv2
-from shapely.geometry import Polygon
 import pyclipper
 
+from ppocr.utils.result_cache import ResultCache
+from .make_border_map import make_target_key, polygon_area_length
+
 __all__ = ['MakeShrinkMap']
 
 
@@ -35,15 +37,43 @@ class MakeShrinkMap(object):
     Typically following the process of class `MakeICDARData`.
     '''
 
-    def __init__(self, min_text_size=8, shrink_ratio=0.4, **kwargs):
+    def __init__(self,
+                 min_text_size=8,
+                 shrink_ratio=0.4,
+                 cache_dir=None,
+                 cache_max_disk_mb=10240,
+                 **kwargs):
         self.min_text_size = min_text_size
         self.shrink_ratio = shrink_ratio
         if 'total_epoch' in kwargs and 'epoch' in kwargs and kwargs[
                 'epoch'] != "None":
             self.shrink_ratio = self.shrink_ratio + 0.2 * kwargs[
                 'epoch'] / float(kwargs['total_epoch'])
+        self.cache = None
+        if cache_dir is not None:
+            self.cache = ResultCache(
+                fingerprint='MakeShrinkMap:{}:{}'.format(self.shrink_ratio,
+                                                         min_text_size),
+                max_memory_items=0,
+                disk_dir=cache_dir,
+                max_disk_mb=cache_max_disk_mb)
 
     def __call__(self, data):
+        if self.cache is None:
+            return self.make_shrink_map(data)
+        key = make_target_key(self.cache, data)
+        # the polys and ignore tags are updated in place as well
+        data['polys'], data['ignore_tags'], data['shrink_map'], data[
+            'shrink_mask'] = self.cache.get_or_compute(
+                key, lambda: self._make_shrink_map_outputs(data))
+        return data
+
+    def _make_shrink_map_outputs(self, data):
+        data = self.make_shrink_map(data)
+        return data['polys'], data['ignore_tags'], data['shrink_map'], data[
+            'shrink_mask']
+
+    def make_shrink_map(self, data):
         image = data['image']
         text_polys = data['polys']
         ignore_tags = data['ignore_tags']
@@ -51,6 +81,7 @@ class MakeShrinkMap(object):
         h, w = image.shape[:2]
         text_polys, ignore_tags = self.validate_polygons(text_polys,
                                                          ignore_tags, h, w)
+        data['polys'], data['ignore_tags'] = text_polys, ignore_tags
         gt = np.zeros((h, w), dtype=np.float32)
         mask = np.ones((h, w), dtype=np.float32)
         for i in range(len(text_polys)):
@@ -62,7 +93,7 @@ class MakeShrinkMap(object):
                              polygon.astype(np.int32)[np.newaxis, :, :], 0)
                 ignore_tags[i] = True
             else:
-                polygon_shape = Polygon(polygon)
+                area, length = polygon_area_length(polygon)
                 subject = [tuple(l) for l in polygon]
                 padding = pyclipper.PyclipperOffset()
                 padding.AddPath(subject, pyclipper.JT_ROUND,
@@ -76,8 +107,7 @@ class MakeShrinkMap(object):
                 # print(possible_ratios)
                 for ratio in possible_ratios:
                     # print(f"Change shrink ratio to {ratio}")
-                    distance = polygon_shape.area * (
-                        1 - np.power(ratio, 2)) / polygon_shape.length
+                    distance = area * (1 - np.power(ratio, 2)) / length
                     shrinked = padding.Execute(-distance)
                     if len(shrinked) == 1:
                         break
@@ -41,20 +41,25 @@ class DecodeImage(object):
 
     def __call__(self, data):
         img = data['image']
-        if six.PY2:
-            assert type(img) is str and len(
-                img) > 0, "invalid input 'img' in DecodeImage"
+        if isinstance(img, np.ndarray):
+            # already decoded BGR image, e.g. from ShardDataSet, which
+            # checks that its shards were decoded with ignore_orientation
+            pass
         else:
-            assert type(img) is bytes and len(
-                img) > 0, "invalid input 'img' in DecodeImage"
-        img = np.frombuffer(img, dtype='uint8')
-        if self.ignore_orientation:
-            img = cv2.imdecode(img, cv2.IMREAD_IGNORE_ORIENTATION |
-                               cv2.IMREAD_COLOR)
-        else:
-            img = cv2.imdecode(img, 1)
-        if img is None:
-            return None
+            if six.PY2:
+                assert type(img) is str and len(
+                    img) > 0, "invalid input 'img' in DecodeImage"
+            else:
+                assert type(img) is bytes and len(
+                    img) > 0, "invalid input 'img' in DecodeImage"
+            img = np.frombuffer(img, dtype='uint8')
+            if self.ignore_orientation:
+                img = cv2.imdecode(img, cv2.IMREAD_IGNORE_ORIENTATION |
+                                   cv2.IMREAD_COLOR)
+            else:
+                img = cv2.imdecode(img, 1)
+            if img is None:
+                return None
         if self.img_mode == 'GRAY':
             img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
         elif self.img_mode == 'RGB':
@@ -63,6 +68,9 @@ class DecodeImage(object):
 
         if self.channel_first:
             img = img.transpose((2, 0, 1))
+        if not img.flags.writeable:
+            # memory-mapped input, the following ops may write in place
+            img = img.copy()
 
         data['image'] = img
         return data
@@ -13,6 +13,7 @@
 # limitations under the License.
 import numpy as np
 import os
+import time
 from paddle.io import Dataset
 import lmdb
 import cv2
@@ -24,6 +25,52 @@ from PIL import Image
 from .imaug import transform, create_operators
 
 
+def open_lmdb(dirpath):
+    return lmdb.open(
+        dirpath,
+        max_readers=32,
+        readonly=True,
+        lock=False,
+        readahead=False,
+        meminit=False)
+
+
+# LMDB allows one env per path and process, shared by all the datasets
+_worker_envs = {}
+_worker_envs_pid = None
+
+
+def get_worker_env(dirpath):
+    """
+    env of dirpath opened by the current process. Envs inherited through a
+    fork are closed first, they must not be used in the child.
+    """
+    global _worker_envs_pid
+    if _worker_envs_pid != os.getpid():
+        for env in _worker_envs.values():
+            env.close()
+        _worker_envs.clear()
+        _worker_envs_pid = os.getpid()
+    if dirpath not in _worker_envs:
+        _worker_envs[dirpath] = open_lmdb(dirpath)
+    return _worker_envs[dirpath]
+
+
+def read_lmdb_meta(dirpath, key):
+    # read without keeping the env open, so nothing is inherited by the
+    # DataLoader workers
+    if os.getpid() == _worker_envs_pid and dirpath in _worker_envs:
+        env = _worker_envs[dirpath]
+        with env.begin(write=False) as txn:
+            return txn.get(key)
+    env = open_lmdb(dirpath)
+    try:
+        with env.begin(write=False) as txn:
+            return txn.get(key)
+    finally:
+        env.close()
+
+
 class LMDBDataSet(Dataset):
     def __init__(self, config, mode, logger, seed=None):
         super(LMDBDataSet, self).__init__()
@@ -47,31 +94,118 @@ class LMDBDataSet(Dataset):
         ratio_list = dataset_config.get("ratio_list", [1.0])
         self.need_reset = True in [x < 1 for x in ratio_list]
 
+        # read ahead prefetch_num positions of the order list in key order
+        self.prefetch_num = dataset_config.get("prefetch_num", 0)
+        self.stats_interval = dataset_config.get("read_stats_interval", 0)
+        self.logger = logger
+        self._worker_pid = None
+
     def load_hierarchical_lmdb_dataset(self, data_dir):
         lmdb_sets = {}
         dataset_idx = 0
         for dirpath, dirnames, filenames in os.walk(data_dir + '/'):
             if not dirnames:
-                env = lmdb.open(
-                    dirpath,
-                    max_readers=32,
-                    readonly=True,
-                    lock=False,
-                    readahead=False,
-                    meminit=False)
-                txn = env.begin(write=False)
-                num_samples = int(txn.get('num-samples'.encode()))
-                lmdb_sets[dataset_idx] = {"dirpath":dirpath, "env":env, \
-                    "txn":txn, "num_samples":num_samples}
+                # every DataLoader worker opens its own env in get_txn
+                num_samples = int(
+                    read_lmdb_meta(dirpath, 'num-samples'.encode()))
+                lmdb_sets[dataset_idx] = {
+                    "dirpath": dirpath,
+                    "num_samples": num_samples
+                }
                 dataset_idx += 1
         return lmdb_sets
 
+    def _init_worker(self):
+        """
+        per process state, LMDB envs must not be shared across a fork
+        """
+        self._worker_pid = os.getpid()
+        self._txns = {}
+        self._prefetched = {}
+        self._read_stats = {'samples': 0, 'bytes': 0, 'time': 0.}
+
+    def get_txn(self, lmdb_idx):
+        if self._worker_pid != os.getpid():
+            self._init_worker()
+        if lmdb_idx not in self._txns:
+            env = get_worker_env(self.lmdb_sets[lmdb_idx]['dirpath'])
+            self._txns[lmdb_idx] = env.begin(write=False)
+        return self._txns[lmdb_idx]
+
+    def get_sample_keys(self, index):
+        return ['label-%09d'.encode() % index, 'image-%09d'.encode() % index]
+
+    def read_samples(self, positions):
+        """
+        {key: value} of the samples at positions of the order list, read
+        with one cursor per LMDB in sorted key order
+        """
+        pairs = self.data_idx_order_list[positions]
+        samples = [None] * len(positions)
+        for lmdb_idx in np.unique(pairs[:, 0]):
+            sel = np.nonzero(pairs[:, 0] == lmdb_idx)[0]
+            sample_keys = [
+                self.get_sample_keys(int(file_idx))
+                for file_idx in pairs[sel, 1]
+            ]
+            keys = sorted([key for keys in sample_keys for key in keys])
+            with self.get_txn(int(lmdb_idx)).cursor() as cursor:
+                values = dict(cursor.getmulti(keys))
+            for i, keys in zip(sel, sample_keys):
+                samples[i] = {key: values.get(key) for key in keys}
+        return samples
+
+    def update_read_stats(self, num_samples, num_bytes, elapse):
+        stats = self._read_stats
+        last_samples = stats['samples']
+        stats['samples'] += num_samples
+        stats['bytes'] += num_bytes
+        stats['time'] += elapse
+        if self.stats_interval > 0 and stats['samples'] // \
+                self.stats_interval > last_samples // self.stats_interval:
+            elapse = max(stats['time'], 1e-6)
+            self.logger.info(
+                "lmdb reader pid {}: {} samples, {:.1f} samples/s, {:.2f} MB/s".
+                format(self._worker_pid, stats['samples'], stats[
+                    'samples'] / elapse, stats['bytes'] / 1024 / 1024 /
+                       elapse))
+
+    def get_sample_values(self, idx):
+        """
+        {key: value} of the sample at position idx of the order list. With
+        prefetch_num > 1 the following positions are read in the same pass
+        and kept until they are requested.
+        """
+        if self._worker_pid != os.getpid():
+            self._init_worker()
+        if idx in self._prefetched:
+            return self._prefetched.pop(idx)
+        st = time.time()
+        if self.prefetch_num > 1:
+            positions = np.arange(idx, min(idx + self.prefetch_num, len(self)))
+            samples = self.read_samples(positions)
+            # only the last window is kept
+            self._prefetched = dict(zip(positions[1:].tolist(), samples[1:]))
+        else:
+            lmdb_idx, file_idx = self.data_idx_order_list[idx]
+            txn = self.get_txn(int(lmdb_idx))
+            samples = [{
+                key: txn.get(key)
+                for key in self.get_sample_keys(int(file_idx))
+            }]
+        num_bytes = sum([
+            len(value) for sample in samples for value in sample.values()
+            if value is not None
+        ])
+        self.update_read_stats(len(samples), num_bytes, time.time() - st)
+        return samples[0]
+
     def dataset_traversal(self):
         lmdb_num = len(self.lmdb_sets)
         total_sample_num = 0
         for lno in range(lmdb_num):
             total_sample_num += self.lmdb_sets[lno]['num_samples']
-        data_idx_order_list = np.zeros((total_sample_num, 2))
+        data_idx_order_list = np.zeros((total_sample_num, 2), dtype=np.int64)
         beg_idx = 0
         for lno in range(lmdb_num):
             tmp_sample_num = self.lmdb_sets[lno]['num_samples']
@@ -107,10 +241,8 @@ class LMDBDataSet(Dataset):
         while len(ext_data) < ext_data_num:
             lmdb_idx, file_idx = self.data_idx_order_list[np.random.randint(
                 len(self))]
-            lmdb_idx = int(lmdb_idx)
-            file_idx = int(file_idx)
             sample_info = self.get_lmdb_sample_info(
-                self.lmdb_sets[lmdb_idx]['txn'], file_idx)
+                self.get_txn(int(lmdb_idx)), int(file_idx))
             if sample_info is None:
                 continue
             img, label = sample_info
@@ -121,22 +253,21 @@ class LMDBDataSet(Dataset):
             ext_data.append(data)
         return ext_data
 
-    def get_lmdb_sample_info(self, txn, index):
-        label_key = 'label-%09d'.encode() % index
-        label = txn.get(label_key)
+    def parse_sample_values(self, values, index):
+        label_key, img_key = self.get_sample_keys(index)
+        label = values.get(label_key)
         if label is None:
             return None
-        label = label.decode('utf-8')
-        img_key = 'image-%09d'.encode() % index
-        imgbuf = txn.get(img_key)
-        return imgbuf, label
+        return values.get(img_key), label.decode('utf-8')
+
+    def get_lmdb_sample_info(self, txn, index):
+        values = {key: txn.get(key) for key in self.get_sample_keys(index)}
+        return self.parse_sample_values(values, index)
 
     def __getitem__(self, idx):
-        lmdb_idx, file_idx = self.data_idx_order_list[idx]
-        lmdb_idx = int(lmdb_idx)
-        file_idx = int(file_idx)
-        sample_info = self.get_lmdb_sample_info(self.lmdb_sets[lmdb_idx]['txn'],
-                                                file_idx)
+        file_idx = int(self.data_idx_order_list[idx, 1])
+        sample_info = self.parse_sample_values(
+            self.get_sample_values(idx), file_idx)
         if sample_info is None:
             return self.__getitem__(np.random.randint(self.__len__()))
         img, label = sample_info
@@ -192,10 +323,8 @@ class LMDBDataSetSR(LMDBDataSet):
 
     def __getitem__(self, idx):
         lmdb_idx, file_idx = self.data_idx_order_list[idx]
-        lmdb_idx = int(lmdb_idx)
-        file_idx = int(file_idx)
-        sample_info = self.get_lmdb_sample_info(self.lmdb_sets[lmdb_idx]['txn'],
-                                                file_idx)
+        sample_info = self.get_lmdb_sample_info(
+            self.get_txn(int(lmdb_idx)), int(file_idx))
         if sample_info is None:
             return self.__getitem__(np.random.randint(self.__len__()))
         img_HR, img_lr, label_str = sample_info
@@ -210,17 +339,12 @@ class LMDBDataSetTableMaster(LMDBDataSet):
     def load_hierarchical_lmdb_dataset(self, data_dir):
         lmdb_sets = {}
         dataset_idx = 0
-        env = lmdb.open(
-            data_dir,
-            max_readers=32,
-            readonly=True,
-            lock=False,
-            readahead=False,
-            meminit=False)
-        txn = env.begin(write=False)
-        num_samples = int(pickle.loads(txn.get(b"__len__")))
-        lmdb_sets[dataset_idx] = {"dirpath":data_dir, "env":env, \
-            "txn":txn, "num_samples":num_samples}
+        num_samples = int(
+            pickle.loads(read_lmdb_meta(data_dir, b"__len__")))
+        lmdb_sets[dataset_idx] = {
+            "dirpath": data_dir,
+            "num_samples": num_samples
+        }
         return lmdb_sets
 
     def get_img_data(self, value):
@@ -275,10 +399,8 @@ class LMDBDataSetTableMaster(LMDBDataSet):
 
     def __getitem__(self, idx):
         lmdb_idx, file_idx = self.data_idx_order_list[idx]
-        lmdb_idx = int(lmdb_idx)
-        file_idx = int(file_idx)
-        data = self.get_lmdb_sample_info(self.lmdb_sets[lmdb_idx]['txn'],
-                                         file_idx)
+        data = self.get_lmdb_sample_info(
+            self.get_txn(int(lmdb_idx)), int(file_idx))
         if data is None:
             return self.__getitem__(np.random.randint(self.__len__()))
         outs = transform(data, self.ops)
@@ -0,0 +1,352 @@
+# Copyright (c) 2024 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Pre-decoded shard format, written by tools/make_shards.py and read by
+ShardDataSet.
+
+A shard directory holds:
+
+    meta.json             version, number of samples and variants
+    lines.bin             the original label file lines, utf-8
+    line_index.npy        (N, 2) int64 offset and length of every line
+    <variant>_index.npy   (N, 5) int64 shard, offset, height, width and
+                          channels of every image of the variant
+    <variant>_00000.bin   decoded BGR uint8 images, back to back
+
+The variant "raw" keeps the images at their original size, "rec_HxW"
+variants are resized the way RecResizeImg does before normalizing, so the
+resize of the transforms keeps them as they are.
+
+meta.json also records whether the EXIF orientation was ignored when the
+images were decoded, it has to match ignore_orientation of DecodeImage.
+"""
+import json
+import math
+import os
+import random
+import traceback
+
+import cv2
+import numpy as np
+from paddle.io import Dataset
+
+from .imaug import transform, create_operators
+from .simple_dataset import SimpleDataSet
+
+SHARD_VERSION = 1
+
+
+def rec_variant_name(image_shape):
+    _, img_h, img_w = image_shape
+    return 'rec_{}x{}'.format(img_h, img_w)
+
+
+def resize_rec_image(img, image_shape):
+    """
+    the resize of RecResizeImg without padding and normalization
+    """
+    _, img_h, img_w = image_shape
+    h, w = img.shape[:2]
+    ratio = w / float(h)
+    if math.ceil(img_h * ratio) > img_w:
+        resized_w = img_w
+    else:
+        resized_w = int(math.ceil(img_h * ratio))
+    return cv2.resize(img, (resized_w, img_h))
+
+
+class ShardWriter(object):
+    """
+    Appends decoded samples to the shards of a directory. Every sample is
+    written to all the variants, "raw" and one per rec image shape.
+    """
+
+    def __init__(self,
+                 save_dir,
+                 rec_image_shapes=(),
+                 max_shard_mb=1024,
+                 ignore_orientation=False):
+        self.save_dir = save_dir
+        self.ignore_orientation = ignore_orientation
+        self.rec_image_shapes = [list(shape) for shape in rec_image_shapes]
+        self.max_shard_bytes = max_shard_mb * 1024 * 1024
+        os.makedirs(save_dir, exist_ok=True)
+        self.variants = ['raw'] + [
+            rec_variant_name(shape) for shape in self.rec_image_shapes
+        ]
+        self._files = {}
+        self._index = {variant: [] for variant in self.variants}
+        self._shard_id = {variant: 0 for variant in self.variants}
+        self._offset = {variant: 0 for variant in self.variants}
+        self._lines = open(os.path.join(save_dir, 'lines.bin'), 'wb')
+        self._line_index = []
+        self._line_offset = 0
+
+    def _shard_path(self, variant, shard_id):
+        return os.path.join(self.save_dir,
+                            '{}_{:05d}.bin'.format(variant, shard_id))
+
+    def _write_image(self, variant, img):
+        buf = np.ascontiguousarray(img).tobytes()
+        if variant not in self._files or (
+                self._offset[variant] > 0 and
+                self._offset[variant] + len(buf) > self.max_shard_bytes):
+            if variant in self._files:
+                self._files[variant].close()
+                self._shard_id[variant] += 1
+                self._offset[variant] = 0
+            self._files[variant] = open(
+                self._shard_path(variant, self._shard_id[variant]), 'wb')
+        self._files[variant].write(buf)
+        channels = img.shape[2] if img.ndim == 3 else 1
+        self._index[variant].append([
+            self._shard_id[variant], self._offset[variant], img.shape[0],
+            img.shape[1], channels
+        ])
+        self._offset[variant] += len(buf)
+
+    def write(self, img, data_line):
+        """
+        img is the decoded BGR image, data_line the label file line bytes
+        """
+        self._write_image('raw', img)
+        for shape in self.rec_image_shapes:
+            self._write_image(
+                rec_variant_name(shape), resize_rec_image(img, shape))
+        self._lines.write(data_line)
+        self._line_index.append([self._line_offset, len(data_line)])
+        self._line_offset += len(data_line)
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._lines.close()
+        for variant in self.variants:
+            np.save(
+                os.path.join(self.save_dir, '{}_index.npy'.format(variant)),
+                np.array(
+                    self._index[variant], dtype=np.int64).reshape((-1, 5)))
+        np.save(
+            os.path.join(self.save_dir, 'line_index.npy'),
+            np.array(
+                self._line_index, dtype=np.int64).reshape((-1, 2)))
+        meta = {
+            'version': SHARD_VERSION,
+            'num_samples': len(self._line_index),
+            'ignore_orientation': self.ignore_orientation,
+            'variants': {
+                variant: self._shard_id[variant] + 1
+                for variant in self.variants
+            }
+        }
+        with open(os.path.join(self.save_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        return meta
+
+
+class ShardReader(object):
+    """
+    Zero-copy reader of a shard directory. The shards are memory-mapped
+    lazily and again after a fork, so the reader can be created before the
+    DataLoader workers start.
+    """
+
+    def __init__(self, shard_dir, variant='raw'):
+        with open(os.path.join(shard_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        assert meta['version'] == SHARD_VERSION, \
+            "unsupported shard version {} in {}".format(meta['version'],
+                                                        shard_dir)
+        assert variant in meta['variants'], \
+            "variant {} is not in {}, found {}".format(
+                variant, shard_dir, list(meta['variants'].keys()))
+        self.shard_dir = shard_dir
+        self.variant = variant
+        self.num_samples = meta['num_samples']
+        # shards written before the option were decoded with the orientation
+        self.ignore_orientation = meta.get('ignore_orientation', False)
+        self.num_shards = meta['variants'][variant]
+        self.index = np.load(
+            os.path.join(shard_dir, '{}_index.npy'.format(variant)))
+        self.line_index = np.load(os.path.join(shard_dir, 'line_index.npy'))
+        self._pid = None
+        self._shards = None
+        self._lines = None
+
+    def _open(self):
+        if self._pid == os.getpid():
+            return
+        self._shards = [
+            np.memmap(
+                os.path.join(self.shard_dir, '{}_{:05d}.bin'.format(
+                    self.variant, shard_id)),
+                dtype=np.uint8,
+                mode='r') for shard_id in range(self.num_shards)
+        ]
+        self._lines = np.memmap(
+            os.path.join(self.shard_dir, 'lines.bin'), dtype=np.uint8, mode='r')
+        self._pid = os.getpid()
+
+    def get_line(self, idx):
+        self._open()
+        offset, length = self.line_index[idx]
+        return self._lines[offset:offset + length].tobytes()
+
+    def get_image(self, idx):
+        """
+        read-only view of the decoded BGR image, (H, W, C) uint8
+        """
+        self._open()
+        shard_id, offset, h, w, c = [int(v) for v in self.index[idx]]
+        buf = self._shards[shard_id][offset:offset + h * w * c]
+        return buf.reshape((h, w, c))
+
+    def __len__(self):
+        return self.num_samples
+
+
+class ShardDataSet(SimpleDataSet):
+    """
+    SimpleDataSet over shard directories. Images come decoded from
+    memory-mapped shards instead of being read and decoded for every
+    sample, DecodeImage of the transforms passes them through.
+    """
+
+    def __init__(self, config, mode, logger, seed=None):
+        Dataset.__init__(self)
+        self.logger = logger
+        self.mode = mode.lower()
+
+        global_config = config['Global']
+        dataset_config = config[mode]['dataset']
+        loader_config = config[mode]['loader']
+
+        self.delimiter = dataset_config.get('delimiter', '\t')
+        shard_dirs = dataset_config['data_dir']
+        if isinstance(shard_dirs, str):
+            shard_dirs = [shard_dirs]
+        ratio_list = dataset_config.get("ratio_list", 1.0)
+        if isinstance(ratio_list, (float, int)):
+            ratio_list = [float(ratio_list)] * len(shard_dirs)
+        assert len(ratio_list) == len(
+            shard_dirs
+        ), "The length of ratio_list should be the same as the data_dir."
+        self.data_dir = ''
+        self.do_shuffle = loader_config['shuffle']
+        self.seed = seed
+        variant = dataset_config.get('variant', 'raw')
+        logger.info("Initialize indexs of shards:%s, variant: %s" %
+                    (shard_dirs, variant))
+        self.readers = [ShardReader(d, variant) for d in shard_dirs]
+        self.check_orientation(dataset_config['transforms'])
+        self.data_lines = self.get_shard_info_list(ratio_list)
+        self.data_idx_order_list = list(range(len(self.data_lines)))
+        if self.mode == "train" and self.do_shuffle:
+            self.shuffle_data_random()
+
+        self.set_epoch_as_seed(self.seed, dataset_config)
+
+        self.ops = create_operators(dataset_config['transforms'], global_config)
+        self.ext_op_transform_idx = dataset_config.get("ext_op_transform_idx",
+                                                       2)
+        self.need_reset = True in [x < 1 for x in ratio_list]
+
+    def check_orientation(self, transforms):
+        """
+        the images are decoded when the shards are written, so DecodeImage
+        can not apply its ignore_orientation any more, the shards must have
+        been written with the same setting
+        """
+        ignore_orientation = False
+        for op in transforms:
+            if 'DecodeImage' in op:
+                ignore_orientation = (op['DecodeImage'] or
+                                      {}).get('ignore_orientation', False)
+        for reader in self.readers:
+            assert reader.ignore_orientation == ignore_orientation, \
+                "DecodeImage sets ignore_orientation: {} but {} was written " \
+                "with ignore_orientation: {}, write the shards again with " \
+                "tools/make_shards.py{}".format(
+                    ignore_orientation, reader.shard_dir,
+                    reader.ignore_orientation, " --ignore_orientation"
+                    if ignore_orientation else "")
+
+    def get_shard_info_list(self, ratio_list):
+        """
+        (reader, sample) pairs, sampled with ratio_list like the lines of
+        SimpleDataSet
+        """
+        data_lines = []
+        for reader_idx, reader in enumerate(self.readers):
+            samples = [(reader_idx, i) for i in range(len(reader))]
+            if self.mode == "train" or ratio_list[reader_idx] < 1.0:
+                random.seed(self.seed)
+                samples = random.sample(
+                    samples, round(len(samples) * ratio_list[reader_idx]))
+            data_lines.extend(samples)
+        return data_lines
+
+    def load_data(self, file_idx):
+        reader_idx, sample_idx = self.data_lines[file_idx]
+        reader = self.readers[reader_idx]
+        data_line = reader.get_line(sample_idx).decode('utf-8')
+        substr = data_line.strip("\n").split(self.delimiter)
+        file_name = self._try_parse_filename_list(substr[0])
+        data = {
+            'img_path': file_name,
+            'label': substr[1],
+            'image': reader.get_image(sample_idx)
+        }
+        return data_line, data
+
+    def get_ext_data(self):
+        ext_data_num = 0
+        for op in self.ops:
+            if hasattr(op, 'ext_data_num'):
+                ext_data_num = getattr(op, 'ext_data_num')
+                break
+        load_data_ops = self.ops[:self.ext_op_transform_idx]
+        ext_data = []
+
+        while len(ext_data) < ext_data_num:
+            file_idx = self.data_idx_order_list[np.random.randint(self.__len__(
+            ))]
+            _, data = self.load_data(file_idx)
+            data = transform(data, load_data_ops)
+            if data is None:
+                continue
+            if 'polys' in data.keys():
+                if data['polys'].shape[1] != 4:
+                    continue
+            ext_data.append(data)
+        return ext_data
+
+    def __getitem__(self, idx):
+        file_idx = self.data_idx_order_list[idx]
+        data_line = self.data_lines[file_idx]
+        try:
+            data_line, data = self.load_data(file_idx)
+            data['ext_data'] = self.get_ext_data()
+            outs = transform(data, self.ops)
+        except:
+            self.logger.error(
+                "When parsing line {}, error happened with msg: {}".format(
+                    data_line, traceback.format_exc()))
+            outs = None
+        if outs is None:
+            # during evaluation, we should fix the idx to get same results for many times of evaluation.
+            rnd_idx = np.random.randint(self.__len__(
+            )) if self.mode == "train" else (idx + 1) % self.__len__()
+            return self.__getitem__(rnd_idx)
+        return outs
@@ -37,21 +37,22 @@ class E2EMetric(object):
         self.reset()
 
     def __call__(self, preds, batch, **kwargs):
+        # preds holds one result per image of the batch
         if self.mode == 'A':
             gt_polyons_batch = batch[2]
-            temp_gt_strs_batch = batch[3][0]
+            temp_gt_strs_batch = batch[3]
             ignore_tags_batch = batch[4]
-            gt_strs_batch = []
 
-            for temp_list in temp_gt_strs_batch:
-                t = ""
-                for index in temp_list:
-                    if index < self.max_index:
-                        t += self.label_list[index]
-                gt_strs_batch.append(t)
-
-            for pred, gt_polyons, gt_strs, ignore_tags in zip(
-                [preds], gt_polyons_batch, [gt_strs_batch], ignore_tags_batch):
+            for pred, gt_polyons, temp_gt_strs, ignore_tags in zip(
+                    preds, gt_polyons_batch, temp_gt_strs_batch,
+                    ignore_tags_batch):
+                gt_strs = []
+                for temp_list in temp_gt_strs:
+                    t = ""
+                    for index in temp_list:
+                        if index < self.max_index:
+                            t += self.label_list[index]
+                    gt_strs.append(t)
                 # prepare gt
                 gt_info_list = [{
                     'points': gt_polyon,
@@ -69,13 +70,14 @@ class E2EMetric(object):
                 result = get_socre_A(gt_info_list, e2e_info_list)
                 self.results.append(result)
         else:
-            img_id = batch[5][0]
-            e2e_info_list = [{
-                'points': det_polyon,
-                'texts': pred_str
-            } for det_polyon, pred_str in zip(preds['points'], preds['texts'])]
-            result = get_socre_B(self.gt_mat_dir, img_id, e2e_info_list)
-            self.results.append(result)
+            for pred, img_id in zip(preds, batch[5]):
+                e2e_info_list = [{
+                    'points': det_polyon,
+                    'texts': pred_str
+                } for det_polyon, pred_str in
+                                 zip(pred['points'], pred['texts'])]
+                result = get_socre_B(self.gt_mat_dir, img_id, e2e_info_list)
+                self.results.append(result)
 
     def get_metric(self):
         metrics = combine_results(self.results)
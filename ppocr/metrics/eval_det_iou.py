@@ -3,6 +3,7 @@
 from collections import namedtuple
 import numpy as np
 from shapely.geometry import Polygon
+from ppocr.utils.poly_geometry import poly_areas, poly_intersection_matrix, poly_iou_matrix
 """
 reference from :
 https://github.com/MhLiao/DB/blob/3c32b808d4412680310d3d28eeb6a2d5bf1566c5/concern/icdar2015_eval/detection/iou.py#L8
@@ -15,15 +16,6 @@ class DetectionIoUEvaluator(object):
         self.area_precision_constraint = area_precision_constraint
 
     def evaluate_image(self, gt, pred):
-        def get_union(pD, pG):
-            return Polygon(pD).union(Polygon(pG)).area
-
-        def get_intersection_over_union(pD, pG):
-            return get_intersection(pD, pG) / get_union(pD, pG)
-
-        def get_intersection(pD, pG):
-            return Polygon(pD).intersection(Polygon(pG)).area
-
         def compute_ap(confList, matchList, numGtCare):
             correct = 0
             AP = 0
@@ -107,15 +99,17 @@ class DetectionIoUEvaluator(object):
             detPol = points
             detPols.append(detPol)
             detPolPoints.append(points)
-            if len(gtDontCarePolsNum) > 0:
-                for dontCarePol in gtDontCarePolsNum:
-                    dontCarePol = gtPols[dontCarePol]
-                    intersected_area = get_intersection(dontCarePol, detPol)
-                    pdDimensions = Polygon(detPol).area
-                    precision = 0 if pdDimensions == 0 else intersected_area / pdDimensions
-                    if (precision > self.area_precision_constraint):
-                        detDontCarePolsNum.append(len(detPols) - 1)
-                        break
+
+        if len(gtDontCarePolsNum) > 0 and len(detPols) > 0:
+            # area of every det covered by the don't care gts
+            intersected_area = poly_intersection_matrix(
+                [gtPols[n] for n in gtDontCarePolsNum], detPols)
+            pdDimensions = poly_areas(detPols)
+            precision = intersected_area / np.maximum(pdDimensions, 1e-12)
+            precision[:, pdDimensions == 0] = 0
+            detDontCarePolsNum = np.nonzero(
+                np.any(precision > self.area_precision_constraint,
+                       axis=0))[0].tolist()
 
         evaluationLog += "DET polygons: " + str(len(detPols)) + (
             " (" + str(len(detDontCarePolsNum)) + " don't care)\n"
@@ -123,28 +117,21 @@ class DetectionIoUEvaluator(object):
 
         if len(gtPols) > 0 and len(detPols) > 0:
             # Calculate IoU and precision matrixs
-            outputShape = [len(gtPols), len(detPols)]
-            iouMat = np.empty(outputShape)
+            iouMat = poly_iou_matrix(gtPols, detPols)
             gtRectMat = np.zeros(len(gtPols), np.int8)
             detRectMat = np.zeros(len(detPols), np.int8)
-            for gtNum in range(len(gtPols)):
-                for detNum in range(len(detPols)):
-                    pG = gtPols[gtNum]
-                    pD = detPols[detNum]
-                    iouMat[gtNum, detNum] = get_intersection_over_union(pD, pG)
-
-            for gtNum in range(len(gtPols)):
-                for detNum in range(len(detPols)):
-                    if gtRectMat[gtNum] == 0 and detRectMat[
-                            detNum] == 0 and gtNum not in gtDontCarePolsNum and detNum not in detDontCarePolsNum:
-                        if iouMat[gtNum, detNum] > self.iou_constraint:
-                            gtRectMat[gtNum] = 1
-                            detRectMat[detNum] = 1
-                            detMatched += 1
-                            pairs.append({'gt': gtNum, 'det': detNum})
-                            detMatchedNums.append(detNum)
-                            evaluationLog += "Match GT #" + \
-                                             str(gtNum) + " with Det #" + str(detNum) + "\n"
+
+            # only the pairs over the constraint can match, in row order
+            for gtNum, detNum in np.argwhere(iouMat > self.iou_constraint):
+                if gtRectMat[gtNum] == 0 and detRectMat[
+                        detNum] == 0 and gtNum not in gtDontCarePolsNum and detNum not in detDontCarePolsNum:
+                    gtRectMat[gtNum] = 1
+                    detRectMat[detNum] = 1
+                    detMatched += 1
+                    pairs.append({'gt': gtNum, 'det': detNum})
+                    detMatchedNums.append(detNum)
+                    evaluationLog += "Match GT #" + \
+                                     str(gtNum) + " with Det #" + str(detNum) + "\n"
 
         numGtCare = (len(gtPols) - len(gtDontCarePolsNum))
         numDetCare = (len(detPols) - len(detDontCarePolsNum))
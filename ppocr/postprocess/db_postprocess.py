@@ -246,6 +246,172 @@ class DBPostProcess(object):
         return boxes_batch
 
 
+class DBBatchPostProcess(DBPostProcess):
+    """
+    Vectorized post process for DB with box_type 'quad'.
+
+    All probability maps of a batch are labeled by one
+    cv2.connectedComponentsWithStats pass. With score_mode 'slow' every
+    component without holes is scored by the mean probability over its
+    pixels in one pass, the others over their filled contour like
+    DBPostProcess, with 'fast' by the mean over the minimum area rectangle
+    like DBPostProcess. The minimum area rectangle of each component is unclipped in closed form: offsetting
+    a w x h rectangle by d = w * h * unclip_ratio / (2 * (w + h)) gives a
+    (w + 2d) x (h + 2d) minimum area rectangle, so no shapely or pyclipper
+    call is needed. box_type 'poly' falls back to DBPostProcess.
+    """
+
+    def __call__(self, outs_dict, shape_list):
+        if self.box_type != 'quad':
+            return super(DBBatchPostProcess, self).__call__(outs_dict,
+                                                            shape_list)
+        pred = outs_dict['maps']
+        if isinstance(pred, paddle.Tensor):
+            pred = pred.numpy()
+        pred = pred[:, 0, :, :]
+        segmentation = pred > self.thresh
+        if self.dilation_kernel is not None:
+            segmentation = np.stack([
+                cv2.dilate(mask.astype(np.uint8), self.dilation_kernel)
+                for mask in segmentation
+            ])
+        return self.boxes_from_bitmap_batch(pred, segmentation, shape_list)
+
+    def boxes_from_bitmap_batch(self, pred, bitmap, shape_list):
+        '''
+        pred, bitmap: maps with shape (N, H, W)
+        shape_list: (N, 4) array of [src_h, src_w, ratio_h, ratio_w]
+        '''
+        batch_size, height, width = bitmap.shape
+        boxes_batch = [{
+            'points': np.array(
+                [], dtype="int32")
+        } for _ in range(batch_size)]
+
+        # stack the maps vertically with an empty row between them so that
+        # components never cross image borders and labels stay grouped by
+        # image in raster order
+        stride = height + 1
+        stacked = np.zeros((batch_size, stride, width), dtype=np.uint8)
+        stacked[:, :height] = bitmap
+        stacked = stacked.reshape(-1, width)
+        stacked_pred = np.zeros((batch_size, stride, width), dtype=np.float32)
+        stacked_pred[:, :height] = pred
+        label_num, labels, stats, _ = cv2.connectedComponentsWithStats(
+            stacked, connectivity=8)
+        if label_num <= 1:
+            return boxes_batch
+
+        # mean score of every component in one pass
+        fg = np.flatnonzero(labels)
+        score = np.bincount(
+            labels.ravel()[fg],
+            weights=stacked_pred.ravel()[fg],
+            minlength=label_num) / np.maximum(stats[:, cv2.CC_STAT_AREA], 1)
+        comp_img_idx = stats[:, cv2.CC_STAT_TOP] // stride
+        first_label = np.searchsorted(comp_img_idx[1:], np.arange(batch_size))
+        rank = np.arange(label_num) - 1 - first_label[comp_img_idx]
+
+        # every 8-connected component has exactly one outer contour, those
+        # are the top level of RETR_CCOMP, components inside the holes of
+        # others included, the second level are the holes
+        outs = cv2.findContours(stacked, cv2.RETR_CCOMP,
+                                cv2.CHAIN_APPROX_SIMPLE)
+        contours, hierarchy = outs[-2], outs[-1]
+        is_outer = hierarchy[0, :, 3] == -1
+        has_hole = hierarchy[0, is_outer, 2] != -1
+        contours = [
+            contour for contour, outer in zip(contours, is_outer) if outer
+        ]
+        contour_label = np.array(
+            [labels[c[0, 0, 1], c[0, 0, 0]] for c in contours])
+        rects = [cv2.minAreaRect(contour) for contour in contours]
+        center = np.array([rect[0] for rect in rects], dtype=np.float64)
+        size = np.array([rect[1] for rect in rects], dtype=np.float64)
+        angle = np.array([rect[2] for rect in rects], dtype=np.float64)
+
+        # unclip every rectangle in closed form
+        box_w, box_h = size[:, 0], size[:, 1]
+        distance = box_w * box_h * self.unclip_ratio / np.maximum(
+            2 * (box_w + box_h), 1e-6)
+        sside = np.minimum(box_w, box_h)
+        keep = (rank[contour_label] < self.max_candidates) & (
+            sside >= self.min_size) & (
+                sside + 2 * distance >= self.min_size + 2)
+        keep = np.nonzero(keep)[0]
+        contour_img_idx = comp_img_idx[contour_label]
+        box_score = score[contour_label[keep]]
+        for kno, cno in enumerate(keep):
+            img_idx = contour_img_idx[cno]
+            if self.score_mode == 'fast':
+                # mean over the rectangle before unclipping, in its own map
+                box = cv2.boxPoints(rects[cno])
+                box[:, 1] -= img_idx * stride
+                box_score[kno] = self.box_score_fast(pred[img_idx], box)
+            elif has_hole[cno]:
+                # the filled contour covers the holes, unlike the pixels
+                contour = contours[cno].copy()
+                contour[:, :, 1] -= img_idx * stride
+                box_score[kno] = self.box_score_slow(pred[img_idx], contour)
+        keep = keep[box_score >= self.box_thresh]
+        if len(keep) == 0:
+            return boxes_batch
+
+        points = self.rect_points_batch(
+            center[keep], box_w[keep] + 2 * distance[keep],
+            box_h[keep] + 2 * distance[keep], angle[keep])
+        points = self.order_points_batch(points)
+
+        keep_img_idx = contour_img_idx[keep]
+        points[:, :, 1] -= (keep_img_idx * stride)[:, None]
+        shape_list = np.array(shape_list)
+        dest_h = shape_list[keep_img_idx, 0][:, None]
+        dest_w = shape_list[keep_img_idx, 1][:, None]
+        points[:, :, 0] = np.clip(
+            np.round(points[:, :, 0] / width * dest_w), 0, dest_w)
+        points[:, :, 1] = np.clip(
+            np.round(points[:, :, 1] / height * dest_h), 0, dest_h)
+        points = points.astype("int32")
+        for batch_index in range(batch_size):
+            img_points = points[keep_img_idx == batch_index]
+            if len(img_points) > 0:
+                boxes_batch[batch_index]['points'] = img_points
+        return boxes_batch
+
+    def rect_points_batch(self, center, box_w, box_h, angle):
+        '''
+        (N, 4, 2) corners of rotated rectangles, the same as cv2.boxPoints
+        '''
+        theta = np.deg2rad(angle)
+        cos_k, sin_k = np.cos(theta) * 0.5, np.sin(theta) * 0.5
+        points = np.zeros((len(center), 4, 2), dtype=np.float64)
+        points[:, 0, 0] = center[:, 0] - sin_k * box_h - cos_k * box_w
+        points[:, 0, 1] = center[:, 1] + cos_k * box_h - sin_k * box_w
+        points[:, 1, 0] = center[:, 0] + sin_k * box_h - cos_k * box_w
+        points[:, 1, 1] = center[:, 1] - cos_k * box_h - sin_k * box_w
+        points[:, 2, 0] = 2 * center[:, 0] - points[:, 0, 0]
+        points[:, 2, 1] = 2 * center[:, 1] - points[:, 0, 1]
+        points[:, 3, 0] = 2 * center[:, 0] - points[:, 1, 0]
+        points[:, 3, 1] = 2 * center[:, 1] - points[:, 1, 1]
+        return points
+
+    def order_points_batch(self, points):
+        '''
+        order the corners of (N, 4, 2) boxes the same way as get_mini_boxes
+        '''
+        index = np.argsort(points[:, :, 0], axis=1, kind='stable')
+        points = np.take_along_axis(points, index[:, :, None], axis=1)
+        left, right = points[:, :2], points[:, 2:]
+        left_swap = (left[:, 1, 1] <= left[:, 0, 1])[:, None]
+        right_swap = (right[:, 1, 1] <= right[:, 0, 1])[:, None]
+        top_left = np.where(left_swap, left[:, 1], left[:, 0])
+        bottom_left = np.where(left_swap, left[:, 0], left[:, 1])
+        top_right = np.where(right_swap, right[:, 1], right[:, 0])
+        bottom_right = np.where(right_swap, right[:, 0], right[:, 1])
+        return np.stack(
+            [top_left, top_right, bottom_right, bottom_left], axis=1)
+
+
 class DistillationDBPostProcess(object):
     def __init__(self,
                  model_name=["student"],
@@ -17,14 +17,10 @@ from __future__ import division
 from __future__ import print_function
 
 import numpy as np
-from .locality_aware_nms import nms_locality
+from .locality_aware_nms import merge_quadrangle_n9
 import cv2
 import paddle
 
-import os
-from ppocr.utils.utility import check_install
-import sys
-
 
 class EASTPostProcess(object):
     """
@@ -52,6 +48,25 @@ class EASTPostProcess(object):
         pred_quads = pred_quads.reshape((-1, 4, 2))  # (n, 4, 2)
         return pred_quads
 
+    def get_cover_scores(self, score_map, boxes):
+        """
+        mean of score_map inside every box, the mask of a box only covers
+        its bounding region instead of the whole score map.
+        """
+        h, w = score_map.shape
+        quads = boxes[:, :8].reshape((-1, 4, 2)).astype(np.int32) // 4
+        scores = np.zeros(len(quads), dtype=np.float32)
+        for i, quad in enumerate(quads):
+            x_min, y_min = np.maximum(quad.min(axis=0), 0)
+            x_max, y_max = np.minimum(quad.max(axis=0) + 1, [w, h])
+            if x_min >= x_max or y_min >= y_max:
+                continue
+            mask = np.zeros((y_max - y_min, x_max - x_min), dtype=np.uint8)
+            cv2.fillPoly(mask, [quad - [x_min, y_min]], 1)
+            scores[i] = cv2.mean(score_map[y_min:y_max, x_min:x_max],
+                                 mask)[0]
+        return scores
+
     def detect(self,
                score_map,
                geo_map,
@@ -78,24 +93,12 @@ class EASTPostProcess(object):
         boxes[:, :8] = text_box_restored.reshape((-1, 8))
         boxes[:, 8] = score_map[xy_text[:, 0], xy_text[:, 1]]
 
-        try:
-            check_install('lanms', 'lanms-nova')
-            import lanms
-            boxes = lanms.merge_quadrangle_n9(boxes, nms_thresh)
-        except:
-            print(
-                'You should install lanms by pip3 install lanms-nova to speed up nms_locality'
-            )
-            boxes = nms_locality(boxes.astype(np.float64), nms_thresh)
+        boxes = merge_quadrangle_n9(boxes, nms_thresh)
         if boxes.shape[0] == 0:
             return []
         # Here we filter some low score boxes by the average score map, 
         #   this is different from the orginal paper.
-        for i, box in enumerate(boxes):
-            mask = np.zeros_like(score_map, dtype=np.uint8)
-            cv2.fillPoly(mask, box[:8].reshape(
-                (-1, 4, 2)).astype(np.int32) // 4, 1)
-            boxes[i, 8] = cv2.mean(score_map, mask)[0]
+        boxes[:, 8] = self.get_cover_scores(score_map, boxes)
         boxes = boxes[boxes[:, 8] > cover_thresh]
         return boxes
 
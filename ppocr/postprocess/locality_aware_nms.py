@@ -6,6 +6,8 @@ This code is refered from: https://github.com/songdejia/EAST/blob/master/localit
 import numpy as np
 from shapely.geometry import Polygon
 
+from ppocr.utils.poly_geometry import poly_iou, poly_nms_indices
+
 
 def intersection(g, p):
     """
@@ -56,51 +58,21 @@ def standard_nms(S, thres):
     """
     Standard nms.
     """
-    order = np.argsort(S[:, 8])[::-1]
-    keep = []
-    while order.size > 0:
-        i = order[0]
-        keep.append(i)
-        ovr = np.array([intersection(S[i], S[t]) for t in order[1:]])
-
-        inds = np.where(ovr <= thres)[0]
-        order = order[inds + 1]
-
-    return S[keep]
+    return S[standard_nms_inds(S, thres)]
 
 
 def standard_nms_inds(S, thres):
     """
     Standard nms, retun inds.
     """
-    order = np.argsort(S[:, 8])[::-1]
-    keep = []
-    while order.size > 0:
-        i = order[0]
-        keep.append(i)
-        ovr = np.array([intersection(S[i], S[t]) for t in order[1:]])
-
-        inds = np.where(ovr <= thres)[0]
-        order = order[inds + 1]
-
-    return keep
+    return poly_nms_indices(S[:, :8].reshape((-1, 4, 2)), S[:, 8], thres)
 
 
 def nms(S, thres):
     """
     nms.
     """
-    order = np.argsort(S[:, 8])[::-1]
-    keep = []
-    while order.size > 0:
-        i = order[0]
-        keep.append(i)
-        ovr = np.array([intersection(S[i], S[t]) for t in order[1:]])
-
-        inds = np.where(ovr <= thres)[0]
-        order = order[inds + 1]
-
-    return keep
+    return standard_nms_inds(S, thres)
 
 
 def soft_nms(boxes_in, Nt_thres=0.3, threshold=0.8, sigma=0.5, method=2):
@@ -193,6 +165,31 @@ def nms_locality(polys, thres=0.3):
     return standard_nms(np.array(S), thres)
 
 
+def merge_quadrangle_n9(polys, thres=0.3):
+    """
+    locality aware nms of EAST, the same algorithm as nms_locality with the
+    IoU of ppocr.utils.poly_geometry, as a replacement of the optional
+    lanms.merge_quadrangle_n9.
+    :param polys: a N*9 numpy array. first 8 coordinates, then prob
+    :return: boxes after nms
+    """
+    S = []
+    p = None
+    for g in np.asarray(polys, dtype=np.float64):
+        if p is not None and poly_iou(g[:8], p[:8]) > thres:
+            p = weighted_merge(g, p)
+        else:
+            if p is not None:
+                S.append(p)
+            p = g
+    if p is not None:
+        S.append(p)
+
+    if len(S) == 0:
+        return np.zeros((0, 9), dtype=np.float32)
+    return standard_nms(np.array(S), thres).astype(np.float32)
+
+
 if __name__ == '__main__':
     # 343,350,448,135,474,143,369,359
     print(
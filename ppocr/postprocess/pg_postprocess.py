@@ -18,6 +18,9 @@ from __future__ import print_function
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import paddle
 
 __dir__ = os.path.dirname(__file__)
 sys.path.append(__dir__)
@@ -36,28 +39,38 @@ class PGPostProcess(object):
                  score_thresh,
                  mode,
                  point_gather_mode=None,
+                 num_workers=1,
                  **kwargs):
         self.character_dict_path = character_dict_path
         self.valid_set = valid_set
         self.score_thresh = score_thresh
         self.mode = mode
         self.point_gather_mode = point_gather_mode
-
-        # c++ la-nms is faster, but only support python 3.5
-        self.is_python35 = False
-        if sys.version_info.major == 3 and sys.version_info.minor == 5:
-            self.is_python35 = True
+        self.post = PGNet_PostProcess(
+            character_dict_path,
+            valid_set,
+            score_thresh,
+            point_gather_mode=point_gather_mode)
+        # the images of a batch are decoded in parallel by num_workers threads
+        self.executor = ThreadPoolExecutor(
+            num_workers) if num_workers > 1 else None
 
     def __call__(self, outs_dict, shape_list):
-        post = PGNet_PostProcess(
-            self.character_dict_path,
-            self.valid_set,
-            self.score_thresh,
-            outs_dict,
-            shape_list,
-            point_gather_mode=self.point_gather_mode)
+        maps = []
+        for key in ['f_score', 'f_border', 'f_char', 'f_direction']:
+            value = outs_dict[key]
+            if isinstance(value, paddle.Tensor):
+                value = value.numpy()
+            maps.append(value)
         if self.mode == 'fast':
-            data = post.pg_postprocess_fast()
+            decode = self.post.pg_postprocess_fast
         else:
-            data = post.pg_postprocess_slow()
-        return data
+            decode = self.post.pg_postprocess_slow
+
+        def decode_image(idx):
+            return decode(*[m[idx] for m in maps], shape=shape_list[idx])
+
+        img_idx = range(len(shape_list))
+        if self.executor is not None and len(shape_list) > 1:
+            return list(self.executor.map(decode_image, img_idx))
+        return [decode_image(idx) for idx in img_idx]
@@ -16,6 +16,7 @@ import numpy as np
 import paddle
 from paddle.nn import functional as F
 import re
+from collections import defaultdict
 
 
 class BaseRecLabelDecode(object):
@@ -47,6 +48,10 @@ class BaseRecLabelDecode(object):
         for i, char in enumerate(dict_character):
             self.dict[char] = i
         self.character = dict_character
+        # lookup tables used by decode_batch
+        self.character_table = np.array(dict_character, dtype=object)
+        self.character_len = np.array(
+            [len(char) for char in dict_character], dtype=np.int64)
 
     def pred_reverse(self, pred):
         pred_re = []
@@ -69,6 +74,9 @@ class BaseRecLabelDecode(object):
 
     def decode(self, text_index, text_prob=None, is_remove_duplicate=False):
         """ convert text-index into text-label. """
+        if isinstance(text_index, np.ndarray) and text_index.ndim == 2:
+            return self.decode_batch(text_index, text_prob,
+                                     is_remove_duplicate)
         result_list = []
         ignored_tokens = self.get_ignored_tokens()
         batch_size = len(text_index)
@@ -99,6 +107,48 @@ class BaseRecLabelDecode(object):
             result_list.append((text, np.mean(conf_list).tolist()))
         return result_list
 
+    def decode_batch(self,
+                     text_index,
+                     text_prob=None,
+                     is_remove_duplicate=False):
+        """
+        vectorized decode of a [B, T] text-index array: repeats and ignored
+        tokens are removed for the whole batch with array ops, and the kept
+        ids are mapped through the character table and joined once.
+        """
+        batch_size = text_index.shape[0]
+        selection = np.ones(text_index.shape, dtype=bool)
+        if is_remove_duplicate:
+            selection[:, 1:] = text_index[:, 1:] != text_index[:, :-1]
+        for ignored_token in self.get_ignored_tokens():
+            selection &= text_index != ignored_token
+
+        char_num = selection.sum(axis=1)
+        if text_prob is not None:
+            conf_list = np.where(selection, text_prob, 0).sum(
+                axis=1) / np.maximum(char_num, 1)
+        else:
+            conf_list = np.ones(batch_size)
+
+        row_idx, _ = np.nonzero(selection)
+        text_ids = text_index[selection]
+        text_all = ''.join(self.character_table[text_ids].tolist())
+        text_end = np.cumsum(
+            np.bincount(
+                row_idx,
+                weights=self.character_len[text_ids],
+                minlength=batch_size)).astype(np.int64)
+        text_beg = np.concatenate([[0], text_end[:-1]])
+
+        result_list = []
+        for beg, end, conf in zip(text_beg.tolist(),
+                                  text_end.tolist(), conf_list.tolist()):
+            text = text_all[beg:end]
+            if self.reverse:  # for arabic rec
+                text = self.pred_reverse(text)
+            result_list.append((text, conf))
+        return result_list
+
     def get_ignored_tokens(self):
         return [0]  # for ctc blank
 
@@ -106,24 +156,85 @@ class BaseRecLabelDecode(object):
 class CTCLabelDecode(BaseRecLabelDecode):
     """ Convert between text-label and text-index """
 
-    def __init__(self, character_dict_path=None, use_space_char=False,
+    def __init__(self,
+                 character_dict_path=None,
+                 use_space_char=False,
+                 beam_size=1,
                  **kwargs):
         super(CTCLabelDecode, self).__init__(character_dict_path,
                                              use_space_char)
+        self.beam_size = beam_size
 
     def __call__(self, preds, label=None, *args, **kwargs):
         if isinstance(preds, tuple) or isinstance(preds, list):
             preds = preds[-1]
         if isinstance(preds, paddle.Tensor):
             preds = preds.numpy()
-        preds_idx = preds.argmax(axis=2)
-        preds_prob = preds.max(axis=2)
-        text = self.decode(preds_idx, preds_prob, is_remove_duplicate=True)
+        if self.beam_size > 1:
+            text = [self.beam_search_decode(pred) for pred in preds]
+        else:
+            preds_idx = preds.argmax(axis=2)
+            preds_prob = np.take_along_axis(
+                preds, preds_idx[:, :, np.newaxis], axis=2)[:, :, 0]
+            text = self.decode(preds_idx, preds_prob, is_remove_duplicate=True)
         if label is None:
             return text
         label = self.decode(label)
         return text, label
 
+    def beam_search_decode(self, pred):
+        """
+        CTC prefix beam search over one [T, C] probability matrix, expanding
+        only the beam_size most likely classes of every step. The confidence
+        is the mean probability of each character at the step it is first
+        emitted, which is what greedy decoding reports for its best path.
+        """
+        blank = self.get_ignored_tokens()[0]
+        # prefix -> [p_blank, p_non_blank, probs of the emitted chars]
+        beams = {(): [1.0, 0.0, ()]}
+        for step_prob in pred.astype(np.float64):
+            topk = np.argpartition(-step_prob,
+                                   self.beam_size - 1)[:self.beam_size]
+            # prefix -> [p_blank, p_non_blank, emitted probs, best path prob]
+            next_beams = defaultdict(lambda: [0.0, 0.0, (), -1.0])
+
+            def extend(prefix, p_blank, p_non_blank, conf):
+                entry = next_beams[prefix]
+                entry[0] += p_blank
+                entry[1] += p_non_blank
+                # keep the emissions of the most likely path to this prefix
+                if p_blank + p_non_blank > entry[3]:
+                    entry[2], entry[3] = conf, p_blank + p_non_blank
+
+            for prefix, (p_b, p_nb, conf) in beams.items():
+                for c in topk.tolist():
+                    p = step_prob[c]
+                    if c == blank:
+                        extend(prefix, (p_b + p_nb) * p, 0.0, conf)
+                    elif len(prefix) > 0 and c == prefix[-1]:
+                        extend(prefix, 0.0, p_nb * p, conf)
+                        extend(prefix + (c, ), 0.0, p_b * p, conf + (p, ))
+                    else:
+                        extend(prefix + (c, ), 0.0, (p_b + p_nb) * p,
+                               conf + (p, ))
+            best = sorted(
+                next_beams.items(),
+                key=lambda x: x[1][0] + x[1][1],
+                reverse=True)[:self.beam_size]
+            # renormalize so long sequences do not underflow
+            norm = max(best[0][1][0] + best[0][1][1], 1e-300)
+            beams = {
+                prefix: [p_b / norm, p_nb / norm, conf]
+                for prefix, (p_b, p_nb, conf, _) in best
+            }
+        prefix, (_, _, conf) = max(beams.items(),
+                                   key=lambda x: x[1][0] + x[1][1])
+        text = ''.join([self.character[c] for c in prefix])
+        if self.reverse:  # for arabic rec
+            text = self.pred_reverse(text)
+        conf = float(np.mean(conf)) if len(conf) > 0 else 0.0
+        return (text, conf)
+
     def add_special_char(self, dict_character):
         dict_character = ['blank'] + dict_character
         return dict_character
@@ -24,7 +24,7 @@ sys.path.append(__dir__)
 sys.path.append(os.path.join(__dir__, '..'))
 
 import numpy as np
-from .locality_aware_nms import nms_locality
+from .locality_aware_nms import merge_quadrangle_n9
 import paddle
 import cv2
 import time
@@ -51,11 +51,6 @@ class SASTPostProcess(object):
         self.expand_scale = expand_scale
         self.tcl_map_thresh = tcl_map_thresh
 
-        # c++ la-nms is faster, but only support python 3.5
-        self.is_python35 = False
-        if sys.version_info.major == 3 and sys.version_info.minor == 5:
-            self.is_python35 = True
-
     def point_pair2poly(self, point_pair_list):
         """
         Transfer vertical point_pairs into poly point in clockwise.
@@ -140,14 +135,7 @@ class SASTPostProcess(object):
         return np.sum(edge) / 2.
 
     def nms(self, dets):
-        if self.is_python35:
-            from ppocr.utils.utility import check_install
-            check_install('lanms', 'lanms-nova')
-            import lanms
-            dets = lanms.merge_quadrangle_n9(dets, self.nms_thresh)
-        else:
-            dets = nms_locality(dets, self.nms_thresh)
-        return dets
+        return merge_quadrangle_n9(dets, self.nms_thresh)
 
     def cluster_by_quads_tco(self, tcl_map, tcl_map_thresh, quads, tco_map):
         """
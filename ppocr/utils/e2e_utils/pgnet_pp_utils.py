@@ -15,7 +15,6 @@
 from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
-import paddle
 import os
 import sys
 
@@ -27,38 +26,21 @@ from extract_textpoint_fast import generate_pivot_list_fast, restore_poly
 
 
 class PGNet_PostProcess(object):
-    # two different post-process
+    # two different post-process, the lexicon is loaded once and every
+    # call decodes the maps of one image
     def __init__(self,
                  character_dict_path,
                  valid_set,
                  score_thresh,
-                 outs_dict,
-                 shape_list,
                  point_gather_mode=None):
         self.Lexicon_Table = get_dict(character_dict_path)
         self.valid_set = valid_set
         self.score_thresh = score_thresh
-        self.outs_dict = outs_dict
-        self.shape_list = shape_list
         self.point_gather_mode = point_gather_mode
 
-    def pg_postprocess_fast(self):
-        p_score = self.outs_dict['f_score']
-        p_border = self.outs_dict['f_border']
-        p_char = self.outs_dict['f_char']
-        p_direction = self.outs_dict['f_direction']
-        if isinstance(p_score, paddle.Tensor):
-            p_score = p_score[0].numpy()
-            p_border = p_border[0].numpy()
-            p_direction = p_direction[0].numpy()
-            p_char = p_char[0].numpy()
-        else:
-            p_score = p_score[0]
-            p_border = p_border[0]
-            p_direction = p_direction[0]
-            p_char = p_char[0]
-
-        src_h, src_w, ratio_h, ratio_w = self.shape_list[0]
+    def pg_postprocess_fast(self, p_score, p_border, p_char, p_direction,
+                            shape):
+        src_h, src_w, ratio_h, ratio_w = shape
         instance_yxs_list, seq_strs = generate_pivot_list_fast(
             p_score,
             p_char,
@@ -75,22 +57,9 @@ class PGNet_PostProcess(object):
         }
         return data
 
-    def pg_postprocess_slow(self):
-        p_score = self.outs_dict['f_score']
-        p_border = self.outs_dict['f_border']
-        p_char = self.outs_dict['f_char']
-        p_direction = self.outs_dict['f_direction']
-        if isinstance(p_score, paddle.Tensor):
-            p_score = p_score[0].numpy()
-            p_border = p_border[0].numpy()
-            p_direction = p_direction[0].numpy()
-            p_char = p_char[0].numpy()
-        else:
-            p_score = p_score[0]
-            p_border = p_border[0]
-            p_direction = p_direction[0]
-            p_char = p_char[0]
-        src_h, src_w, ratio_h, ratio_w = self.shape_list[0]
+    def pg_postprocess_slow(self, p_score, p_border, p_char, p_direction,
+                            shape):
+        src_h, src_w, ratio_h, ratio_w = shape
         is_curved = self.valid_set == "totaltext"
         char_seq_idx_set, instance_yxs_list = generate_pivot_list_slow(
             p_score,
@@ -0,0 +1,112 @@
+# Copyright (c) 2024 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+__all__ = ['MicroBatchScheduler']
+
+
+class MicroBatchScheduler(object):
+    """
+    Merge requests submitted from many threads into micro-batches.
+
+    A single worker thread takes requests from the queue and dispatches a
+    batch once it holds max_batch_size requests or once its oldest request
+    has waited max_wait_ms. batch_fn receives a list of requests and must
+    return a list of results in the same order; a result that is an
+    Exception instance is raised from the future of that request only.
+    """
+
+    def __init__(self,
+                 batch_fn,
+                 max_batch_size=8,
+                 max_wait_ms=10,
+                 max_queue_size=0):
+        assert max_batch_size >= 1, "max_batch_size must be at least 1"
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.
+        self.request_num = 0
+        self.batch_num = 0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._closed = False
+        self._worker = threading.Thread(target=self._loop, daemon=True)
+        self._worker.start()
+
+    def submit(self, request):
+        """
+        Put a request into the queue and return a Future for its result.
+        """
+        if self._closed:
+            raise RuntimeError("MicroBatchScheduler is closed")
+        future = Future()
+        self._queue.put((request, future))
+        return future
+
+    def close(self):
+        """
+        Stop accepting requests, finish the queued ones and stop the worker.
+        """
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._worker.join()
+
+    @property
+    def avg_batch_size(self):
+        return self.request_num / max(self.batch_num, 1)
+
+    def _loop(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        self.request_num += len(batch)
+        self.batch_num += 1
+        requests = [request for request, _ in batch]
+        try:
+            results = self.batch_fn(requests)
+            assert len(results) == len(batch), \
+                "batch_fn returned {} results for {} requests".format(
+                    len(results), len(batch))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,300 @@
+# Copyright (c) 2024 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Pairwise polygon intersection, IoU and NMS shared by the detection metrics
+and post processing.
+
+Only pairs whose bounding boxes overlap are intersected. Pairs of convex
+quads, which is what most detectors output, are intersected in one batch
+with NumPy, all other pairs with shapely. Invalid polygons, e.g. self
+intersecting ones, are repaired with buffer(0) before they are measured.
+poly_iou computes the same IoU for a single pair, for callers whose pairs
+depend on each other and can not be batched.
+"""
+
+import numpy as np
+from shapely.geometry import Polygon
+
+__all__ = [
+    'poly_areas', 'poly_intersection_matrix', 'poly_iou_matrix', 'poly_iou',
+    'poly_nms_indices'
+]
+
+_EPS = 1e-6
+
+
+def _cross(o, a, b):
+    """
+    z of (a - o) x (b - o), broadcast over the leading axes
+    """
+    return (a[..., 0] - o[..., 0]) * (b[..., 1] - o[..., 1]) - \
+        (a[..., 1] - o[..., 1]) * (b[..., 0] - o[..., 0])
+
+
+def _signed_areas(quads):
+    x, y = quads[..., 0], quads[..., 1]
+    return 0.5 * np.sum(
+        x * np.roll(y, -1, axis=-1) - np.roll(x, -1, axis=-1) * y, axis=-1)
+
+
+def _is_convex_quad(quads):
+    """
+    whether every (4, 2) quad of quads is convex and not degenerate
+    """
+    turns = _cross(quads, np.roll(quads, -1, axis=1), np.roll(quads, -2,
+                                                              axis=1))
+    return np.all(turns > 0, axis=1) | np.all(turns < 0, axis=1)
+
+
+def _inside(points, quads, orient):
+    """
+    whether points (M, P, 2) lie inside or on the convex quads (M, 4, 2)
+    whose orientation is orient (M,)
+    """
+    beg = quads[:, np.newaxis, :, :]
+    end = np.roll(quads, -1, axis=1)[:, np.newaxis, :, :]
+    side = _cross(beg, end, points[:, :, np.newaxis, :])
+    return np.all(side * orient[:, np.newaxis, np.newaxis] >= -_EPS, axis=2)
+
+
+def _convex_quad_intersection(quads_a, quads_b):
+    """
+    intersection areas of the convex quads quads_a[i] and quads_b[i]
+
+    The intersection is the convex hull of the vertices of each quad that
+    lie inside the other one and of the crossing points of their edges.
+    All of these points are on the hull, so it is measured by sorting them
+    by angle around their mean.
+    """
+    m = len(quads_a)
+    orient_a = np.sign(_signed_areas(quads_a))
+    orient_b = np.sign(_signed_areas(quads_b))
+
+    # edge crossings, a[i] + t * ra = b[j] + u * rb
+    pa = quads_a[:, :, np.newaxis, :]
+    ra = np.roll(quads_a, -1, axis=1)[:, :, np.newaxis, :] - pa
+    pb = quads_b[:, np.newaxis, :, :]
+    rb = np.roll(quads_b, -1, axis=1)[:, np.newaxis, :, :] - pb
+    denom = ra[..., 0] * rb[..., 1] - ra[..., 1] * rb[..., 0]
+    diff = pb - pa
+    parallel = np.abs(denom) < _EPS
+    denom = np.where(parallel, 1, denom)
+    t = (diff[..., 0] * rb[..., 1] - diff[..., 1] * rb[..., 0]) / denom
+    u = (diff[..., 0] * ra[..., 1] - diff[..., 1] * ra[..., 0]) / denom
+    cross_valid = ~parallel & (t >= -_EPS) & (t <= 1 + _EPS) & \
+        (u >= -_EPS) & (u <= 1 + _EPS)
+    cross_points = pa + t[..., np.newaxis] * ra
+
+    points = np.concatenate(
+        [quads_a, quads_b, cross_points.reshape((m, 16, 2))], axis=1)
+    valid = np.concatenate(
+        [
+            _inside(quads_a, quads_b, orient_b),
+            _inside(quads_b, quads_a, orient_a), cross_valid.reshape((m, 16))
+        ],
+        axis=1)
+    num_valid = valid.sum(axis=1)
+
+    # invalid points duplicate the first valid one, which adds no area
+    first_valid = points[np.arange(m), np.argmax(valid, axis=1)]
+    points = np.where(valid[..., np.newaxis], points,
+                      first_valid[:, np.newaxis, :])
+    center = points.sum(axis=1) / 24.
+    angles = np.arctan2(points[..., 1] - center[:, np.newaxis, 1],
+                        points[..., 0] - center[:, np.newaxis, 0])
+    order = np.argsort(angles, axis=1)
+    points = np.take_along_axis(points, order[..., np.newaxis], axis=1)
+    areas = np.abs(_signed_areas(points))
+    areas[num_valid < 3] = 0
+    return areas
+
+
+def _to_polygon(poly):
+    polygon = Polygon(poly)
+    if not polygon.is_valid:
+        polygon = polygon.buffer(0)
+    return polygon
+
+
+def _as_poly_list(polys):
+    return [
+        np.asarray(
+            poly, dtype=np.float64).reshape((-1, 2)) for poly in polys
+    ]
+
+
+def _convex_quads(polys):
+    """
+    mask of the convex quads in polys and all polys as a (N, 4, 2) array,
+    the rows that are not convex quads are zero
+    """
+    is_quad = np.array([len(p) == 4 for p in polys], dtype=bool)
+    quads = np.zeros((len(polys), 4, 2))
+    if is_quad.any():
+        quads[is_quad] = np.stack([p for p, q in zip(polys, is_quad) if q])
+        is_quad[is_quad] = _is_convex_quad(quads[is_quad])
+    return is_quad, quads
+
+
+def poly_areas(polys):
+    """
+    areas of a list of polygons, each one is (K, 2) points or K * 2 values
+    """
+    polys = _as_poly_list(polys)
+    convex, quads = _convex_quads(polys)
+    areas = np.abs(_signed_areas(quads))
+    for i in np.nonzero(~convex)[0]:
+        areas[i] = _to_polygon(polys[i]).area
+    return areas
+
+
+def poly_intersection_matrix(polys_a, polys_b):
+    """
+    intersection areas of every polygon of polys_a with every polygon of
+    polys_b, as a (len(polys_a), len(polys_b)) matrix
+    """
+    polys_a, polys_b = _as_poly_list(polys_a), _as_poly_list(polys_b)
+    inter = np.zeros((len(polys_a), len(polys_b)))
+    if len(polys_a) == 0 or len(polys_b) == 0:
+        return inter
+
+    def bboxes(polys):
+        return np.array([np.concatenate([p.min(axis=0), p.max(axis=0)])
+                         for p in polys])
+
+    box_a, box_b = bboxes(polys_a), bboxes(polys_b)
+    overlap = (box_a[:, np.newaxis, 0] < box_b[np.newaxis, :, 2]) & \
+        (box_a[:, np.newaxis, 2] > box_b[np.newaxis, :, 0]) & \
+        (box_a[:, np.newaxis, 1] < box_b[np.newaxis, :, 3]) & \
+        (box_a[:, np.newaxis, 3] > box_b[np.newaxis, :, 1])
+    idx_a, idx_b = np.nonzero(overlap)
+    if len(idx_a) == 0:
+        return inter
+
+    convex_a, quads_a = _convex_quads(polys_a)
+    convex_b, quads_b = _convex_quads(polys_b)
+    fast = convex_a[idx_a] & convex_b[idx_b]
+    if fast.any():
+        inter[idx_a[fast], idx_b[fast]] = _convex_quad_intersection(
+            quads_a[idx_a[fast]], quads_b[idx_b[fast]])
+
+    shapes_a, shapes_b = {}, {}
+    for i, j in zip(idx_a[~fast], idx_b[~fast]):
+        if i not in shapes_a:
+            shapes_a[i] = _to_polygon(polys_a[i])
+        if j not in shapes_b:
+            shapes_b[j] = _to_polygon(polys_b[j])
+        inter[i, j] = shapes_a[i].intersection(shapes_b[j]).area
+    return inter
+
+
+def poly_iou_matrix(polys_a, polys_b):
+    """
+    IoU of every polygon of polys_a with every polygon of polys_b
+    """
+    inter = poly_intersection_matrix(polys_a, polys_b)
+    union = poly_areas(polys_a)[:, np.newaxis] + \
+        poly_areas(polys_b)[np.newaxis, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, _EPS), 0)
+
+
+def _is_convex_quad_list(quad):
+    """
+    _is_convex_quad of a single quad given as a list of 4 (x, y) points
+    """
+    turns = []
+    for i in range(4):
+        (x0, y0), (x1, y1), (x2, y2) = quad[i], quad[(i + 1) % 4], quad[
+            (i + 2) % 4]
+        turns.append((x1 - x0) * (y2 - y0) - (y1 - y0) * (x2 - x0))
+    return all([t > 0 for t in turns]) or all([t < 0 for t in turns])
+
+
+def _signed_area_list(points):
+    area = 0.
+    for i in range(len(points)):
+        (x0, y0), (x1, y1) = points[i - 1], points[i]
+        area += x0 * y1 - x1 * y0
+    return area * 0.5
+
+
+def _clip_convex_list(subject, clip):
+    """
+    Sutherland-Hodgman clipping of the convex polygon subject by the
+    convex polygon clip, both lists of (x, y) points
+    """
+    orient = 1 if _signed_area_list(clip) > 0 else -1
+    output = subject
+    for i in range(len(clip)):
+        if len(output) == 0:
+            break
+        (x1, y1), (x2, y2) = clip[i], clip[(i + 1) % len(clip)]
+        dx, dy = x2 - x1, y2 - y1
+        side = [orient * (dx * (y - y1) - dy * (x - x1)) for x, y in output]
+        points = []
+        for j in range(len(output)):
+            prev_side, cur_side = side[j - 1], side[j]
+            if (prev_side >= 0) != (cur_side >= 0):
+                (px, py), (cx, cy) = output[j - 1], output[j]
+                t = prev_side / (prev_side - cur_side)
+                points.append((px + t * (cx - px), py + t * (cy - py)))
+            if cur_side >= 0:
+                points.append(output[j])
+        output = points
+    return output
+
+
+def poly_iou(poly_a, poly_b):
+    """
+    IoU of two polygons, each one is (K, 2) points or K * 2 values, equal
+    to poly_iou_matrix([poly_a], [poly_b])[0, 0] without its batch overhead
+    """
+    list_a = np.asarray(poly_a, dtype=np.float64).reshape((-1, 2)).tolist()
+    list_b = np.asarray(poly_b, dtype=np.float64).reshape((-1, 2)).tolist()
+    xs_a, ys_a = [p[0] for p in list_a], [p[1] for p in list_a]
+    xs_b, ys_b = [p[0] for p in list_b], [p[1] for p in list_b]
+    if not (min(xs_a) < max(xs_b) and max(xs_a) > min(xs_b) and
+            min(ys_a) < max(ys_b) and max(ys_a) > min(ys_b)):
+        return 0.
+    convex_a = len(list_a) == 4 and _is_convex_quad_list(list_a)
+    convex_b = len(list_b) == 4 and _is_convex_quad_list(list_b)
+    if convex_a and convex_b:
+        area_a = abs(_signed_area_list(list_a))
+        area_b = abs(_signed_area_list(list_b))
+        inter = abs(_signed_area_list(_clip_convex_list(list_a, list_b)))
+    else:
+        shape_a, shape_b = _to_polygon(list_a), _to_polygon(list_b)
+        area_a = abs(_signed_area_list(list_a)) if convex_a else shape_a.area
+        area_b = abs(_signed_area_list(list_b)) if convex_b else shape_b.area
+        inter = shape_a.intersection(shape_b).area
+    union = area_a + area_b - inter
+    return inter / max(union, _EPS) if union > 0 else 0.
+
+
+def poly_nms_indices(polys, scores, thresh):
+    """
+    greedy nms, returns the indices of the kept polygons from the highest
+    score to the lowest
+    """
+    scores = np.asarray(scores)
+    order = np.argsort(scores, kind='stable')[::-1]
+    iou = poly_iou_matrix(polys, polys)
+    suppressed = np.zeros(len(order), dtype=bool)
+    keep = []
+    for i in order:
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        suppressed |= iou[i] > thresh
+    return keep
@@ -15,6 +15,8 @@
 import numpy as np
 from shapely.geometry import Polygon
 
+from ppocr.utils.poly_geometry import poly_nms_indices
+
 
 def points2polygon(points):
     """Convert k points to 1 polygon.
@@ -127,20 +129,8 @@ def poly_iou(poly_det, poly_gt):
 def poly_nms(polygons, threshold):
     assert isinstance(polygons, list)
 
-    polygons = np.array(sorted(polygons, key=lambda x: x[-1]))
-
-    keep_poly = []
-    index = [i for i in range(polygons.shape[0])]
-
-    while len(index) > 0:
-        keep_poly.append(polygons[index[-1]].tolist())
-        A = polygons[index[-1]][:-1]
-        index = np.delete(index, -1)
-        iou_list = np.zeros((len(index), ))
-        for i in range(len(index)):
-            B = polygons[index[i]][:-1]
-            iou_list[i] = boundary_iou(A, B)
-        remove_index = np.where(iou_list > threshold)
-        index = np.delete(index, remove_index)
-
-    return keep_poly
+    if len(polygons) == 0:
+        return []
+    polygons = np.array(polygons)
+    keep = poly_nms_indices(polygons[:, :-1], polygons[:, -1], threshold)
+    return polygons[keep].tolist()
@@ -0,0 +1,235 @@
+# Copyright (c) 2024 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+__all__ = ['LRUCache', 'ResultCache', 'get_fingerprint']
+
+
+def _update_hash(sha, obj):
+    if isinstance(obj, np.ndarray):
+        sha.update(str((obj.shape, obj.dtype.str)).encode())
+        sha.update(np.ascontiguousarray(obj).data)
+    elif isinstance(obj, (bytes, bytearray)):
+        sha.update(obj)
+    else:
+        sha.update(
+            json.dumps(
+                obj, sort_keys=True, default=str, ensure_ascii=False).encode())
+
+
+def get_fingerprint(config, model_paths=()):
+    """
+    Fingerprint of everything that changes a result: the config (any json
+    serializable object) and the name, size and mtime of every file under
+    model_paths. Missing paths are ignored.
+    """
+    sha = hashlib.sha256()
+    _update_hash(sha, config)
+    for model_path in model_paths:
+        if model_path is None:
+            continue
+        file_list = []
+        if os.path.isdir(model_path):
+            for root, _, files in os.walk(model_path):
+                file_list.extend([os.path.join(root, f) for f in files])
+        else:
+            # checkpoints are given as a prefix, e.g. ./output/best_accuracy
+            parent = os.path.dirname(model_path) or '.'
+            if os.path.isdir(parent):
+                prefix = os.path.basename(model_path)
+                file_list = [
+                    os.path.join(parent, f) for f in os.listdir(parent)
+                    if f.startswith(prefix)
+                ]
+        for file_path in sorted(file_list):
+            stat = os.stat(file_path)
+            sha.update("{}:{}:{}".format(file_path, stat.st_size,
+                                         stat.st_mtime_ns).encode())
+    return sha.hexdigest()
+
+
+class LRUCache(object):
+    """
+    Thread safe in-memory LRU mapping with hit and miss counters. Values
+    are returned as stored, callers must not modify them.
+    """
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.hit = 0
+        self.miss = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute_fn):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hit += 1
+                return self._data[key]
+            self.miss += 1
+        # computed outside the lock, a racing thread may compute it twice
+        value = compute_fn()
+        if self.max_size > 0:
+            with self._lock:
+                self._data[key] = value
+                self._data.move_to_end(key)
+                while len(self._data) > self.max_size:
+                    self._data.popitem(last=False)
+        return value
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ResultCache(object):
+    """
+    Content addressed cache of inference results.
+
+    Keys are sha256 digests of the input (e.g. the decoded image), the
+    call arguments and a fingerprint of the model and config, so a model or
+    config change never returns a stale result. Results are kept in an LRU
+    memory tier of max_memory_items entries and, if disk_dir is given, in
+    a disk tier of pickles that is evicted oldest-first once it grows over
+    max_disk_mb. Hits return a copy, so callers may modify the result.
+    """
+
+    def __init__(self,
+                 fingerprint='',
+                 max_memory_items=256,
+                 disk_dir=None,
+                 max_disk_mb=1024):
+        self.fingerprint = fingerprint
+        self.max_memory_items = max_memory_items
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_mb * 1024 * 1024
+        self.stats = {
+            'memory_hit': 0,
+            'disk_hit': 0,
+            'miss': 0,
+            'memory_evict': 0,
+            'disk_evict': 0
+        }
+        self._memory = OrderedDict()
+        self._disk_index = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        if disk_dir is not None:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    def make_key(self, data, *args):
+        sha = hashlib.sha256()
+        sha.update(self.fingerprint.encode())
+        _update_hash(sha, data)
+        _update_hash(sha, args)
+        return sha.hexdigest()
+
+    def get_or_compute(self, key, compute_fn):
+        """
+        return the cached result of key, or compute_fn() which is cached
+        """
+        found, value = self._get(key)
+        if found:
+            return copy.deepcopy(value)
+        value = compute_fn()
+        self._put(key, value)
+        return copy.deepcopy(value)
+
+    @property
+    def hit_rate(self):
+        hit = self.stats['memory_hit'] + self.stats['disk_hit']
+        return hit / max(hit + self.stats['miss'], 1)
+
+    def _get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats['memory_hit'] += 1
+                return True, self._memory[key]
+            if key in self._disk_index:
+                try:
+                    with open(self._disk_path(key), 'rb') as f:
+                        value = pickle.load(f)
+                except (OSError, pickle.UnpicklingError, EOFError):
+                    self._remove_disk_entry(key)
+                else:
+                    self._disk_index.move_to_end(key)
+                    os.utime(self._disk_path(key))
+                    self.stats['disk_hit'] += 1
+                    self._put_memory(key, value)
+                    return True, value
+            self.stats['miss'] += 1
+            return False, None
+
+    def _put(self, key, value):
+        with self._lock:
+            self._put_memory(key, value)
+            if self.disk_dir is not None and key not in self._disk_index:
+                self._put_disk(key, value)
+
+    def _put_memory(self, key, value):
+        if self.max_memory_items <= 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+            self.stats['memory_evict'] += 1
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + '.pkl')
+
+    def _load_disk_index(self):
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for f in files:
+                if f.endswith('.pkl'):
+                    stat = os.stat(os.path.join(root, f))
+                    entries.append((stat.st_mtime, f[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk_index[key] = size
+            self._disk_bytes += size
+
+    def _put_disk(self, key, value):
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = "{}.{}.tmp".format(path, threading.get_ident())
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        size = os.path.getsize(path)
+        self._disk_index[key] = size
+        self._disk_bytes += size
+        while self._disk_bytes > self.max_disk_bytes and len(
+                self._disk_index) > 1:
+            old_key = next(iter(self._disk_index))
+            self._remove_disk_entry(old_key)
+            self.stats['disk_evict'] += 1
+
+    def _remove_disk_entry(self, key):
+        self._disk_bytes -= self._disk_index.pop(key, 0)
+        try:
+            os.remove(self._disk_path(key))
+        except OSError:
+            pass
@@ -22,6 +22,8 @@ import paddle
 import importlib.util
 import sys
 import subprocess
+import queue
+import threading
 
 
 def print_dict(d, logger, delimiter=0):
@@ -94,7 +96,96 @@ def alpha_to_color(img, alpha_color=(255, 255, 255)):
         img = cv2.merge((B, G, R))
     return img
 
-def check_and_read(img_path):
+def rasterize_pdf_page(page):
+    import fitz
+    from PIL import Image
+    mat = fitz.Matrix(2, 2)
+    pm = page.get_pixmap(matrix=mat, alpha=False)
+
+    # if width or height > 2000 pixels, don't enlarge the image
+    if pm.width > 2000 or pm.height > 2000:
+        pm = page.get_pixmap(matrix=fitz.Matrix(1, 1), alpha=False)
+
+    img = Image.frombytes("RGB", [pm.width, pm.height], pm.samples)
+    img = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+    return img
+
+
+class LazyPDFReader(object):
+    """
+    Iterate over the pages of a PDF as BGR images, rasterized on demand.
+    With prefetch > 0 a background thread rasterizes up to prefetch pages
+    ahead, so rasterization overlaps the processing of the previous page
+    while at most prefetch + 1 pages are held in memory. len() is the
+    number of pages that will be yielded, limited by page_num if > 0.
+    """
+
+    def __init__(self, pdf_path, page_num=0, prefetch=1):
+        import fitz
+        self.pdf_path = pdf_path
+        self.prefetch = prefetch
+        with fitz.open(pdf_path) as pdf:
+            self.page_count = pdf.page_count
+        if 0 < page_num < self.page_count:
+            self.page_count = page_num
+
+    def __len__(self):
+        return self.page_count
+
+    def _iter_pages(self):
+        import fitz
+        with fitz.open(self.pdf_path) as pdf:
+            for pg in range(0, self.page_count):
+                yield rasterize_pdf_page(pdf[pg])
+
+    def __iter__(self):
+        if self.prefetch <= 0:
+            yield from self._iter_pages()
+            return
+
+        page_queue = queue.Queue(maxsize=self.prefetch)
+        stop_event = threading.Event()
+
+        def put(item):
+            while not stop_event.is_set():
+                try:
+                    page_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def producer():
+            try:
+                for img in self._iter_pages():
+                    if not put((img, None)):
+                        return
+            except Exception as e:
+                put((None, e))
+                return
+            put((None, None))
+
+        thread = threading.Thread(target=producer, daemon=True)
+        thread.start()
+        try:
+            while True:
+                img, error = page_queue.get()
+                if error is not None:
+                    raise error
+                if img is None:
+                    break
+                yield img
+        finally:
+            stop_event.set()
+            thread.join()
+
+
+def check_and_read(img_path, page_num=0, lazy=False):
+    """
+    read a gif or pdf file, for a pdf all pages (or the first page_num
+    pages) are returned. With lazy=True a pdf is returned as a LazyPDFReader
+    that rasterizes the pages while they are consumed.
+    """
     if os.path.basename(img_path)[-3:].lower() == 'gif':
         gif = cv2.VideoCapture(img_path)
         ret, frame = gif.read()
@@ -107,23 +198,11 @@ def check_and_read(img_path):
         imgvalue = frame[:, :, ::-1]
         return imgvalue, True, False
     elif os.path.basename(img_path)[-3:].lower() == 'pdf':
-        import fitz
-        from PIL import Image
-        imgs = []
-        with fitz.open(img_path) as pdf:
-            for pg in range(0, pdf.page_count):
-                page = pdf[pg]
-                mat = fitz.Matrix(2, 2)
-                pm = page.get_pixmap(matrix=mat, alpha=False)
-
-                # if width or height > 2000 pixels, don't enlarge the image
-                if pm.width > 2000 or pm.height > 2000:
-                    pm = page.get_pixmap(matrix=fitz.Matrix(1, 1), alpha=False)
-
-                img = Image.frombytes("RGB", [pm.width, pm.height], pm.samples)
-                img = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-                imgs.append(img)
-            return imgs, False, True
+        reader = LazyPDFReader(
+            img_path, page_num=page_num, prefetch=1 if lazy else 0)
+        if lazy:
+            return reader, False, True
+        return list(reader), False, True
     return None, False, False
 
 
@@ -26,7 +26,7 @@ import numpy as np
 import time
 
 import tools.infer.utility as utility
-from ppocr.data import create_operators, transform
+from ppocr.data import create_operators, transform, transform_with_ocr
 from ppocr.postprocess import build_post_process
 from ppocr.utils.logging import get_logger
 from ppocr.utils.visual import draw_ser_results
@@ -97,23 +97,27 @@ class SerPredictor(object):
         self.postprocess_op = build_post_process(postprocess_params)
         self.predictor, self.input_tensor, self.output_tensors, self.config = \
             utility.create_predictor(args, 'ser', logger)
-
-    def __call__(self, img):
-        ori_im = img.copy()
-        data = {'image': img}
-        data = transform(data, self.preprocess_op)
-        if data[0] is None:
-            return None, 0
-        starttime = time.time()
-
-        for idx in range(len(data)):
-            if isinstance(data[idx], np.ndarray):
-                data[idx] = np.expand_dims(data[idx], axis=0)
+        self.batch_num = args.kie_batch_num
+        # number of non-padding tokens run through the model
+        self.token_num = 0
+
+    def stack_inputs(self, samples):
+        """
+        merge preprocessed samples into batched inputs. The token sequences
+        are padded to max_seq_len by VQATokenPad, so the arrays stack
+        directly, the other fields become lists with one entry per sample.
+        """
+        batch = []
+        for idx in range(len(samples[0])):
+            if isinstance(samples[0][idx], np.ndarray):
+                batch.append(np.stack([sample[idx] for sample in samples]))
             else:
-                data[idx] = [data[idx]]
+                batch.append([sample[idx] for sample in samples])
+        return batch
 
+    def run(self, batch):
         for idx in range(len(self.input_tensor)):
-            self.input_tensor[idx].copy_from_cpu(data[idx])
+            self.input_tensor[idx].copy_from_cpu(batch[idx])
 
         self.predictor.run()
 
@@ -121,13 +125,59 @@ class SerPredictor(object):
         for output_tensor in self.output_tensors:
             output = output_tensor.copy_to_cpu()
             outputs.append(output)
-        preds = outputs[0]
+        self.token_num += int(batch[2].sum())
+        return outputs[0]
+
+    def __call__(self, img):
+        ori_im = img.copy()
+        data = {'image': img}
+        data = transform(data, self.preprocess_op)
+        if data[0] is None:
+            return None, 0
+        starttime = time.time()
+
+        data = self.stack_inputs([data])
+        preds = self.run(data)
 
         post_result = self.postprocess_op(
             preds, segment_offset_ids=data[6], ocr_infos=data[7])
         elapse = time.time() - starttime
         return post_result, data, elapse
 
+    def predict_batch(self, img_list):
+        """
+        SER for a list of pages. The embedded OCR runs on all pages with
+        cross-image batching and the SER model on batches of kie_batch_num
+        pages. The post result and the inputs of every page are returned in
+        the format of __call__, or None for a page without text.
+        """
+        starttime = time.time()
+        data_list = transform_with_ocr([{
+            'image': img
+        } for img in img_list], self.preprocess_op)
+        samples, indices = [], []
+        for idx, data in enumerate(data_list):
+            if data is None or data[0] is None:
+                continue
+            samples.append(data)
+            indices.append(idx)
+
+        post_results = [None] * len(img_list)
+        inputs = [None] * len(img_list)
+        for beg in range(0, len(samples), self.batch_num):
+            batch = self.stack_inputs(samples[beg:beg + self.batch_num])
+            preds = self.run(batch)
+            post_result = self.postprocess_op(
+                preds, segment_offset_ids=batch[6], ocr_infos=batch[7])
+            for bno, idx in enumerate(indices[beg:beg + self.batch_num]):
+                post_results[idx] = post_result[bno:bno + 1]
+                inputs[idx] = [
+                    v[bno:bno + 1] if isinstance(v, np.ndarray) else [v[bno]]
+                    for v in batch
+                ]
+        elapse = time.time() - starttime
+        return post_results, inputs, elapse
+
 
 def main(args):
     image_file_list = get_image_file_list(args.image_dir)
@@ -40,6 +40,7 @@ logger = get_logger()
 class SerRePredictor(object):
     def __init__(self, args):
         self.use_visual_backbone = args.use_visual_backbone
+        self.batch_num = args.kie_batch_num
         self.ser_engine = SerPredictor(args)
         if args.re_model_dir is not None:
             postprocess_params = {'name': 'VQAReTokenLayoutLMPostProcess'}
@@ -79,56 +80,134 @@ class SerRePredictor(object):
         elapse = time.time() - starttime
         return post_result, elapse
 
+    def predict_batch(self, img_list):
+        """
+        SER and RE for a list of pages, both run on batches of kie_batch_num
+        pages. Returns the result of every page in the format of __call__,
+        or None for a page without text.
+        """
+        starttime = time.time()
+        ser_results, ser_inputs, _ = self.ser_engine.predict_batch(img_list)
+        if self.predictor is None:
+            return ser_results, time.time() - starttime
+
+        valid_idxs = [
+            idx for idx in range(len(img_list)) if ser_results[idx] is not None
+        ]
+        results = [None] * len(img_list)
+        for beg in range(0, len(valid_idxs), self.batch_num):
+            batch_idxs = valid_idxs[beg:beg + self.batch_num]
+            re_inputs, entity_idx_dict_batch = [], []
+            for idx in batch_idxs:
+                re_input, entity_idx_dict = make_input(ser_inputs[idx],
+                                                       ser_results[idx])
+                re_inputs.append(re_input)
+                entity_idx_dict_batch.extend(entity_idx_dict)
+            # the relation candidates differ per page, pad them with -1
+            max_relation_num = max([x[6].shape[1] for x in re_inputs])
+            for re_input in re_inputs:
+                pad_num = max_relation_num - re_input[6].shape[1]
+                re_input[6] = np.pad(re_input[6], ((0, 0), (0, pad_num),
+                                                   (0, 0)),
+                                     constant_values=-1)
+            re_input = [
+                np.concatenate([x[i] for x in re_inputs])
+                for i in range(len(re_inputs[0]))
+            ]
+            if self.use_visual_backbone == False:
+                re_input.pop(4)
+            for idx in range(len(self.input_tensor)):
+                self.input_tensor[idx].copy_from_cpu(re_input[idx])
+
+            self.predictor.run()
+            outputs = []
+            for output_tensor in self.output_tensors:
+                output = output_tensor.copy_to_cpu()
+                outputs.append(output)
+            preds = dict(
+                loss=outputs[1],
+                pred_relations=outputs[2],
+                hidden_states=outputs[0], )
+
+            post_result = self.postprocess_op(
+                preds,
+                ser_results=[ser_results[idx][0] for idx in batch_idxs],
+                entity_idx_dict_batch=entity_idx_dict_batch)
+            for idx, res in zip(batch_idxs, post_result):
+                results[idx] = [res]
+        return results, time.time() - starttime
+
 
 def main(args):
     image_file_list = get_image_file_list(args.image_dir)
     ser_re_predictor = SerRePredictor(args)
     count = 0
     total_time = 0
+    total_token_num = 0
 
     os.makedirs(args.output, exist_ok=True)
     with open(
             os.path.join(args.output, 'infer.txt'), mode='w',
             encoding='utf-8') as f_w:
-        for image_file in image_file_list:
-            img, flag, _ = check_and_read(image_file)
-            if not flag:
-                img = cv2.imread(image_file)
-                img = img[:, :, ::-1]
-            if img is None:
-                logger.info("error in loading image:{}".format(image_file))
+        for beg in range(0, len(image_file_list), args.kie_batch_num):
+            valid_file_list, img_list = [], []
+            for image_file in image_file_list[beg:beg + args.kie_batch_num]:
+                img, flag, _ = check_and_read(image_file)
+                if not flag:
+                    img = cv2.imread(image_file)
+                    img = img[:, :, ::-1]
+                if img is None:
+                    logger.info("error in loading image:{}".format(
+                        image_file))
+                    continue
+                valid_file_list.append(image_file)
+                img_list.append(img)
+            if len(img_list) == 0:
                 continue
-            re_res, elapse = ser_re_predictor(img)
-            re_res = re_res[0]
-
-            res_str = '{}\t{}\n'.format(
-                image_file,
-                json.dumps(
-                    {
-                        "ocr_info": re_res,
-                    }, ensure_ascii=False))
-            f_w.write(res_str)
-            if ser_re_predictor.predictor is not None:
-                img_res = draw_re_results(
-                    image_file, re_res, font_path=args.vis_font_path)
-                img_save_path = os.path.join(
-                    args.output,
-                    os.path.splitext(os.path.basename(image_file))[0] +
-                    "_ser_re.jpg")
-            else:
-                img_res = draw_ser_results(
-                    image_file, re_res, font_path=args.vis_font_path)
-                img_save_path = os.path.join(
-                    args.output,
-                    os.path.splitext(os.path.basename(image_file))[0] +
-                    "_ser.jpg")
-
-            cv2.imwrite(img_save_path, img_res)
-            logger.info("save vis result to {}".format(img_save_path))
+            token_num = ser_re_predictor.ser_engine.token_num
+            re_res_list, elapse = ser_re_predictor.predict_batch(img_list)
+            token_num = ser_re_predictor.ser_engine.token_num - token_num
+
+            for image_file, re_res in zip(valid_file_list, re_res_list):
+                if re_res is None:
+                    logger.info("no text found in {}".format(image_file))
+                    continue
+                re_res = re_res[0]
+
+                res_str = '{}\t{}\n'.format(
+                    image_file,
+                    json.dumps(
+                        {
+                            "ocr_info": re_res,
+                        }, ensure_ascii=False))
+                f_w.write(res_str)
+                if ser_re_predictor.predictor is not None:
+                    img_res = draw_re_results(
+                        image_file, re_res, font_path=args.vis_font_path)
+                    img_save_path = os.path.join(
+                        args.output,
+                        os.path.splitext(os.path.basename(image_file))[0] +
+                        "_ser_re.jpg")
+                else:
+                    img_res = draw_ser_results(
+                        image_file, re_res, font_path=args.vis_font_path)
+                    img_save_path = os.path.join(
+                        args.output,
+                        os.path.splitext(os.path.basename(image_file))[0] +
+                        "_ser.jpg")
+
+                cv2.imwrite(img_save_path, img_res)
+                logger.info("save vis result to {}".format(img_save_path))
+            # the first batch is warmup
             if count > 0:
                 total_time += elapse
+                total_token_num += token_num
             count += 1
-            logger.info("Predict time of {}: {}".format(image_file, elapse))
+            logger.info("Predict time of {} images: {}".format(
+                len(img_list), elapse))
+    if total_time > 0:
+        logger.info("tokens/sec: {:.1f}".format(total_token_num /
+                                                total_time))
 
 
 if __name__ == "__main__":
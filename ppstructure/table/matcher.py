@@ -54,6 +54,59 @@ def compute_iou(rec1, rec2):
         return (intersect / (sum_area - intersect)) * 1.0
 
 
+def distance_matrix(boxes_1, boxes_2):
+    """
+    distance of every box of boxes_1 (N, 4) to every box of boxes_2 (M, 4)
+    as a (N, M) matrix, computed like distance
+    """
+    x1, y1, x2, y2 = [boxes_1[:, np.newaxis, k] for k in range(4)]
+    x3, y3, x4, y4 = [boxes_2[np.newaxis, :, k] for k in range(4)]
+    dis_2 = np.abs(x3 - x1) + np.abs(y3 - y1)
+    dis_3 = np.abs(x4 - x2) + np.abs(y4 - y2)
+    dis = dis_2 + np.abs(x4 - x2) + np.abs(y4 - y2)
+    return dis + np.minimum(dis_2, dis_3)
+
+
+def iou_matrix(rec1, rec2):
+    """
+    IoU of every box of rec1 (N, 4) with every box of rec2 (M, 4) as a
+    (N, M) float64 matrix, computed like compute_iou
+    """
+    S_rec1 = ((rec1[:, 2] - rec1[:, 0]) * (rec1[:, 3] - rec1[:, 1]))[:,
+                                                                       np.newaxis]
+    S_rec2 = ((rec2[:, 2] - rec2[:, 0]) * (rec2[:, 3] - rec2[:, 1]))[
+        np.newaxis, :]
+    sum_area = S_rec1 + S_rec2
+
+    left_line = np.maximum(rec1[:, np.newaxis, 1], rec2[np.newaxis, :, 1])
+    right_line = np.minimum(rec1[:, np.newaxis, 3], rec2[np.newaxis, :, 3])
+    top_line = np.maximum(rec1[:, np.newaxis, 0], rec2[np.newaxis, :, 0])
+    bottom_line = np.minimum(rec1[:, np.newaxis, 2], rec2[np.newaxis, :, 2])
+
+    intersect = (right_line - left_line) * (bottom_line - top_line)
+    overlap = (left_line < right_line) & (top_line < bottom_line)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        iou = intersect / (sum_area - intersect)
+    # compute_iou returns the quotient as a float64 scalar
+    return np.where(overlap, iou, 0).astype(np.float64)
+
+
+def _xyxy_boxes(boxes):
+    """
+    (N, 4) x_min, y_min, x_max, y_max boxes of (N, 4) boxes or (N, 8)
+    quads, keeping their dtype
+    """
+    boxes = np.asarray(boxes)
+    if boxes.shape[1] == 8:
+        boxes = np.stack(
+            [
+                boxes[:, 0::2].min(axis=1), boxes[:, 1::2].min(axis=1),
+                boxes[:, 0::2].max(axis=1), boxes[:, 1::2].max(axis=1)
+            ],
+            axis=1)
+    return boxes
+
+
 class TableMatch:
     def __init__(self, filter_ocr_result=False, use_master=False):
         self.filter_ocr_result = filter_ocr_result
@@ -74,26 +127,26 @@ class TableMatch:
         return pred_html
 
     def match_result(self, dt_boxes, pred_bboxes):
+        """
+        index of the pred box each dt box is matched with, the one with the
+        highest IoU and then the lowest distance, grouped by pred box
+        """
         matched = {}
-        for i, gt_box in enumerate(dt_boxes):
-            distances = []
-            for j, pred_box in enumerate(pred_bboxes):
-                if len(pred_box) == 8:
-                    pred_box = [
-                        np.min(pred_box[0::2]), np.min(pred_box[1::2]),
-                        np.max(pred_box[0::2]), np.max(pred_box[1::2])
-                    ]
-                distances.append((distance(gt_box, pred_box),
-                                  1. - compute_iou(gt_box, pred_box)
-                                  ))  # compute iou and l1 distance
-            sorted_distances = distances.copy()
-            # select det box by iou and l1 distance
-            sorted_distances = sorted(
-                sorted_distances, key=lambda item: (item[1], item[0]))
-            if distances.index(sorted_distances[0]) not in matched.keys():
-                matched[distances.index(sorted_distances[0])] = [i]
-            else:
-                matched[distances.index(sorted_distances[0])].append(i)
+        if len(dt_boxes) == 0 or len(pred_bboxes) == 0:
+            return matched
+        dt_boxes = np.asarray(dt_boxes)
+        pred_bboxes = _xyxy_boxes(pred_bboxes)
+        # bound the (rows, pred boxes) matrices to about 1M elements
+        chunk_size = max(1, (1 << 20) // len(pred_bboxes))
+        for beg in range(0, len(dt_boxes), chunk_size):
+            gt_boxes = dt_boxes[beg:beg + chunk_size]
+            iou_dis = 1. - iou_matrix(gt_boxes, pred_bboxes)
+            l1_dis = distance_matrix(gt_boxes, pred_bboxes)
+            # lowest 1 - iou, then lowest distance, then lowest index
+            best = iou_dis == iou_dis.min(axis=1, keepdims=True)
+            best_index = np.argmin(np.where(best, l1_dis, np.inf), axis=1)
+            for i, j in enumerate(best_index.tolist(), beg):
+                matched.setdefault(j, []).append(i)
         return matched
 
     def get_pred_html(self, pred_structures, matched_index, ocr_contents):
@@ -115,7 +115,6 @@ class TableStructurer(object):
         if self.args.benchmark:
             self.autolog.times.start()
 
-        ori_im = img.copy()
         data = {'image': img}
         data = transform(data, self.preprocess_op)
         img = data[0]
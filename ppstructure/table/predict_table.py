@@ -26,6 +26,7 @@ import copy
 import logging
 import numpy as np
 import time
+from concurrent.futures import ThreadPoolExecutor
 import tools.infer.predict_rec as predict_rec
 import tools.infer.predict_det as predict_det
 import tools.infer.utility as utility
@@ -75,22 +76,43 @@ class TableSystem(object):
             self.match = TableMasterMatcher()
         else:
             self.match = TableMatch(filter_ocr_result=True)
-
-        self.predictor, self.input_tensor, self.output_tensors, self.config = utility.create_predictor(
-            args, 'table', logger)
+        # the table structure model runs in this thread while det and rec
+        # run in the calling one, the predictors release the GIL
+        self.structure_executor = None
+        if args.table_parallel_ocr:
+            self.structure_executor = ThreadPoolExecutor(1)
 
     def __call__(self, img, return_ocr_result_in_table=False):
+        """
+        time_dict holds the time of the table structure model ('table'),
+        det, rec, the whole ocr branch ('ocr') and match. When the
+        structure and ocr run concurrently, 'all' is less than their sum.
+        """
         result = dict()
-        time_dict = {'det': 0, 'rec': 0, 'table': 0, 'all': 0, 'match': 0}
+        time_dict = {
+            'det': 0,
+            'rec': 0,
+            'table': 0,
+            'ocr': 0,
+            'all': 0,
+            'match': 0
+        }
         start = time.time()
-        structure_res, elapse = self._structure(copy.deepcopy(img))
-        result['cell_bbox'] = structure_res[1].tolist()
-        time_dict['table'] = elapse
-
-        dt_boxes, rec_res, det_elapse, rec_elapse = self._ocr(
-            copy.deepcopy(img))
+        # the models only read img, no copies are needed
+        if self.structure_executor is not None:
+            structure_future = self.structure_executor.submit(self._structure,
+                                                              img)
+        else:
+            structure_res, elapse = self._structure(img)
+        ocr_start = time.time()
+        dt_boxes, rec_res, det_elapse, rec_elapse = self._ocr(img)
+        time_dict['ocr'] = time.time() - ocr_start
         time_dict['det'] = det_elapse
         time_dict['rec'] = rec_elapse
+        if self.structure_executor is not None:
+            structure_res, elapse = structure_future.result()
+        result['cell_bbox'] = structure_res[1].tolist()
+        time_dict['table'] = elapse
 
         if return_ocr_result_in_table:
             result['boxes'] = [x.tolist() for x in dt_boxes]
@@ -106,12 +128,12 @@ class TableSystem(object):
         return result, time_dict
 
     def _structure(self, img):
-        structure_res, elapse = self.table_structurer(copy.deepcopy(img))
+        structure_res, elapse = self.table_structurer(img)
         return structure_res, elapse
 
     def _ocr(self, img):
         h, w = img.shape[:2]
-        dt_boxes, det_elapse = self.text_detector(copy.deepcopy(img))
+        dt_boxes, det_elapse = self.text_detector(img)
         dt_boxes = sorted_boxes(dt_boxes)
 
         r_boxes = []
@@ -178,13 +200,19 @@ def main(args):
             logger.error("error in loading image:{}".format(image_file))
             continue
         starttime = time.time()
-        pred_res, _ = table_sys(img)
+        pred_res, time_dict = table_sys(img)
         pred_html = pred_res['html']
         logger.info(pred_html)
         to_excel(pred_html, excel_path)
         logger.info('excel saved to {}'.format(excel_path))
         elapse = time.time() - starttime
         logger.info("Predict time : {:.3f}s".format(elapse))
+        logger.debug("table: {:.3f}s, det: {:.3f}s, rec: {:.3f}s, match: "
+                     "{:.3f}s, structure and ocr overlap: {:.3f}s".format(
+                         time_dict['table'], time_dict['det'], time_dict[
+                             'rec'], time_dict['match'], time_dict['table'] +
+                         time_dict['ocr'] + time_dict['match'] - time_dict[
+                             'all']))
 
         if len(pred_res['cell_bbox']) > 0 and len(pred_res['cell_bbox'][
                 0]) == 4:
@@ -29,6 +29,7 @@ def init_args():
     parser.add_argument("--table_model_dir", type=str)
     parser.add_argument(
         "--merge_no_span_structure", type=str2bool, default=True)
+    parser.add_argument("--table_parallel_ocr", type=str2bool, default=True)
     parser.add_argument(
         "--table_char_dict_path",
         type=str,
@@ -60,6 +61,7 @@ def init_args():
         default="../train_data/XFUND/class_list_xfun.txt")
     # need to be None or tb-yx
     parser.add_argument("--ocr_order_method", type=str, default=None)
+    parser.add_argument("--kie_batch_num", type=int, default=1)
     # params for inference
     parser.add_argument(
         "--mode",
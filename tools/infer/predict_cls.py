@@ -21,7 +21,6 @@ sys.path.insert(0, os.path.abspath(os.path.join(__dir__, '../..')))
 os.environ["FLAGS_allocator_strategy"] = 'auto_growth'
 
 import cv2
-import copy
 import numpy as np
 import math
 import time
@@ -72,7 +71,9 @@ class TextClassifier(object):
         return padding_im
 
     def __call__(self, img_list):
-        img_list = copy.deepcopy(img_list)
+        # the crops are only read, the ones classified as rotated by 180
+        # degrees are replaced by rotated copies in a new list
+        img_list = list(img_list)
         img_num = len(img_list)
         # Calculate the aspect ratio of all text bars
         width_list = []
@@ -87,19 +88,11 @@ class TextClassifier(object):
         for beg_img_no in range(0, img_num, batch_num):
 
             end_img_no = min(img_num, beg_img_no + batch_num)
-            norm_img_batch = []
-            max_wh_ratio = 0
             starttime = time.time()
-            for ino in range(beg_img_no, end_img_no):
-                h, w = img_list[indices[ino]].shape[0:2]
-                wh_ratio = w * 1.0 / h
-                max_wh_ratio = max(max_wh_ratio, wh_ratio)
-            for ino in range(beg_img_no, end_img_no):
-                norm_img = self.resize_norm_img(img_list[indices[ino]])
-                norm_img = norm_img[np.newaxis, :]
-                norm_img_batch.append(norm_img)
-            norm_img_batch = np.concatenate(norm_img_batch)
-            norm_img_batch = norm_img_batch.copy()
+            norm_img_batch = np.stack([
+                self.resize_norm_img(img_list[indices[ino]])
+                for ino in range(beg_img_no, end_img_no)
+            ])
 
             if self.use_onnx:
                 input_dict = {}
@@ -107,10 +100,11 @@ class TextClassifier(object):
                 outputs = self.predictor.run(self.output_tensors, input_dict)
                 prob_out = outputs[0]
             else:
+                # the input shape is fixed, so the memory pool is kept
+                # between batches instead of shrinking it after each one
                 self.input_tensor.copy_from_cpu(norm_img_batch)
                 self.predictor.run()
                 prob_out = self.output_tensors[0].copy_to_cpu()
-                self.predictor.try_shrink_memory()
             cls_result = self.postprocess_op(prob_out)
             elapse += time.time() - starttime
             for rno in range(len(cls_result)):
@@ -59,8 +59,10 @@ class TextDetector(object):
             }
         }]
         postprocess_params = {}
+        db_postprocess_name = 'DBBatchPostProcess' \
+            if args.det_db_batch_postprocess else 'DBPostProcess'
         if self.det_algorithm == "DB":
-            postprocess_params['name'] = 'DBPostProcess'
+            postprocess_params['name'] = db_postprocess_name
             postprocess_params["thresh"] = args.det_db_thresh
             postprocess_params["box_thresh"] = args.det_db_box_thresh
             postprocess_params["max_candidates"] = 1000
@@ -69,7 +71,7 @@ class TextDetector(object):
             postprocess_params["score_mode"] = args.det_db_score_mode
             postprocess_params["box_type"] = args.det_box_type
         elif self.det_algorithm == "DB++":
-            postprocess_params['name'] = 'DBPostProcess'
+            postprocess_params['name'] = db_postprocess_name
             postprocess_params["thresh"] = args.det_db_thresh
             postprocess_params["box_thresh"] = args.det_db_box_thresh
             postprocess_params["max_candidates"] = 1000
@@ -218,7 +220,7 @@ class TextDetector(object):
         return dt_boxes
 
     def __call__(self, img):
-        ori_im = img.copy()
+        ori_shape = img.shape
         data = {'image': img}
 
         st = time.time()
@@ -274,15 +276,93 @@ class TextDetector(object):
         dt_boxes = post_result[0]['points']
 
         if self.args.det_box_type == 'poly':
-            dt_boxes = self.filter_tag_det_res_only_clip(dt_boxes, ori_im.shape)
+            dt_boxes = self.filter_tag_det_res_only_clip(dt_boxes, ori_shape)
         else:
-            dt_boxes = self.filter_tag_det_res(dt_boxes, ori_im.shape)
+            dt_boxes = self.filter_tag_det_res(dt_boxes, ori_shape)
 
         if self.args.benchmark:
             self.autolog.times.end(stamp=True)
         et = time.time()
         return dt_boxes, et - st
 
+    def predict_batch(self, img_list):
+        """
+        Detect text on several images, feeding up to det_batch_num images
+        per forward pass. Images of similar size are grouped together and
+        zero-padded to the largest one in the group; each probability map is
+        cropped back to its own size before post-processing.
+        args:
+            img_list(list): BGR images, entries may be None
+        return:
+            list of dt_boxes (None for invalid images), elapsed time
+        """
+        dt_boxes_list = [None] * len(img_list)
+        if self.det_algorithm not in ['DB', 'DB++']:
+            # the output maps of other algorithms are not aligned with the
+            # padded input, so fall back to one image per forward pass
+            elapse = 0
+            for idx, img in enumerate(img_list):
+                if img is None:
+                    continue
+                dt_boxes_list[idx], _elapse = self.__call__(img)
+                elapse += _elapse
+            return dt_boxes_list, elapse
+
+        st = time.time()
+        norm_img_list, shape_list, valid_indices = {}, {}, []
+        for idx, img in enumerate(img_list):
+            if img is None:
+                continue
+            data = transform({'image': img}, self.preprocess_op)
+            norm_img, shape = data
+            if norm_img is None:
+                continue
+            norm_img_list[idx] = norm_img
+            shape_list[idx] = shape
+            valid_indices.append(idx)
+        # group images of similar size to reduce padding
+        valid_indices.sort(key=lambda i: norm_img_list[i].shape[1:])
+
+        batch_num = max(1, self.args.det_batch_num)
+        for beg_no in range(0, len(valid_indices), batch_num):
+            batch_indices = valid_indices[beg_no:beg_no + batch_num]
+            imgC = norm_img_list[batch_indices[0]].shape[0]
+            max_h = max([norm_img_list[i].shape[1] for i in batch_indices])
+            max_w = max([norm_img_list[i].shape[2] for i in batch_indices])
+            norm_img_batch = np.zeros(
+                (len(batch_indices), imgC, max_h, max_w), dtype=np.float32)
+            for bno, idx in enumerate(batch_indices):
+                _, h, w = norm_img_list[idx].shape
+                norm_img_batch[bno, :, :h, :w] = norm_img_list[idx]
+
+            if self.use_onnx:
+                input_dict = {}
+                input_dict[self.input_tensor.name] = norm_img_batch
+                outputs = self.predictor.run(self.output_tensors, input_dict)
+            else:
+                self.input_tensor.copy_from_cpu(norm_img_batch)
+                self.predictor.run()
+                outputs = []
+                for output_tensor in self.output_tensors:
+                    output = output_tensor.copy_to_cpu()
+                    outputs.append(output)
+
+            for bno, idx in enumerate(batch_indices):
+                _, h, w = norm_img_list[idx].shape
+                preds = {'maps': outputs[0][bno:bno + 1, :, :h, :w]}
+                post_result = self.postprocess_op(
+                    preds, np.expand_dims(shape_list[idx], axis=0))
+                dt_boxes = post_result[0]['points']
+                if self.args.det_box_type == 'poly':
+                    dt_boxes = self.filter_tag_det_res_only_clip(
+                        dt_boxes, img_list[idx].shape)
+                else:
+                    dt_boxes = self.filter_tag_det_res(dt_boxes,
+                                                       img_list[idx].shape)
+                dt_boxes_list[idx] = dt_boxes
+        et = time.time()
+        return dt_boxes_list, et - st
+
 
 if __name__ == "__main__":
     args = utility.parse_args()
@@ -68,6 +68,7 @@ class TextE2E(object):
             postprocess_params["character_dict_path"] = args.e2e_char_dict_path
             postprocess_params["valid_set"] = args.e2e_pgnet_valid_set
             postprocess_params["mode"] = args.e2e_pgnet_mode
+            postprocess_params["num_workers"] = args.e2e_pgnet_num_workers
         else:
             logger.info("unknown e2e_algorithm:{}".format(self.e2e_algorithm))
             sys.exit(0)
@@ -94,16 +95,38 @@ class TextE2E(object):
         return dt_boxes
 
     def __call__(self, img):
-
-        ori_im = img.copy()
-        data = {'image': img}
-        data = transform(data, self.preprocess_op)
-        img, shape_list = data
-        if img is None:
+        results, elapse = self.predict_batch([img])
+        if results[0] is None:
             return None, 0
-        img = np.expand_dims(img, axis=0)
-        shape_list = np.expand_dims(shape_list, axis=0)
-        img = img.copy()
+        dt_boxes, strs = results[0]
+        return dt_boxes, strs, elapse
+
+    def predict_batch(self, img_list):
+        """
+        end-to-end results of several images run as one batch, the images
+        are padded at the bottom and right to the largest size of the batch.
+        Return a (dt_boxes, strs) pair per image, None for an image the
+        preprocess fails on, and the elapse of the batch.
+        """
+        norm_img_list, shape_list, indices = [], [], []
+        for idx, img in enumerate(img_list):
+            data = transform({'image': img}, self.preprocess_op)
+            if data is None or data[0] is None:
+                continue
+            norm_img_list.append(data[0])
+            shape_list.append(data[1])
+            indices.append(idx)
+        results = [None] * len(img_list)
+        if len(norm_img_list) == 0:
+            return results, 0
+        max_h = max([norm_img.shape[1] for norm_img in norm_img_list])
+        max_w = max([norm_img.shape[2] for norm_img in norm_img_list])
+        img = np.zeros(
+            (len(norm_img_list), norm_img_list[0].shape[0], max_h, max_w),
+            dtype=np.float32)
+        for ino, norm_img in enumerate(norm_img_list):
+            img[ino, :, :norm_img.shape[1], :norm_img.shape[2]] = norm_img
+        shape_list = np.array(shape_list)
         starttime = time.time()
 
         if self.use_onnx:
@@ -132,10 +155,25 @@ class TextE2E(object):
             else:
                 raise NotImplementedError
         post_result = self.postprocess_op(preds, shape_list)
-        points, strs = post_result['points'], post_result['texts']
-        dt_boxes = self.filter_tag_det_res_only_clip(points, ori_im.shape)
+        for idx, res in zip(indices, post_result):
+            dt_boxes = self.filter_tag_det_res_only_clip(
+                res['points'], img_list[idx].shape)
+            results[idx] = (dt_boxes, res['texts'])
         elapse = time.time() - starttime
-        return dt_boxes, strs, elapse
+        return results, elapse
+
+
+def save_e2e_res(file_list, results, draw_img_save):
+    for image_file, res in zip(file_list, results):
+        if res is None:
+            continue
+        points, strs = res
+        src_im = utility.draw_e2e_res(points, strs, image_file)
+        img_name_pure = os.path.split(image_file)[-1]
+        img_path = os.path.join(draw_img_save,
+                                "e2e_res_{}".format(img_name_pure))
+        cv2.imwrite(img_path, src_im)
+        logger.info("The visualized image saved in {}".format(img_path))
 
 
 if __name__ == "__main__":
@@ -147,23 +185,33 @@ if __name__ == "__main__":
     draw_img_save = "./inference_results"
     if not os.path.exists(draw_img_save):
         os.makedirs(draw_img_save)
-    for image_file in image_file_list:
+
+    # images are read and predicted batch by batch
+    batch_num = max(args.e2e_batch_num, 1)
+    file_list, img_list = [], []
+    batch_idx = 0
+    for fno, image_file in enumerate(image_file_list):
         img, flag, _ = check_and_read(image_file)
         if not flag:
             img = cv2.imread(image_file)
         if img is None:
             logger.info("error in loading image:{}".format(image_file))
+        else:
+            file_list.append(image_file)
+            img_list.append(img)
+        if len(img_list) < batch_num and fno < len(image_file_list) - 1:
+            continue
+        if len(img_list) == 0:
             continue
-        points, strs, elapse = text_detector(img)
-        if count > 0:
+        results, elapse = text_detector.predict_batch(img_list)
+        # the first batch is a warmup
+        if batch_idx > 0:
             total_time += elapse
-        count += 1
-        logger.info("Predict time of {}: {}".format(image_file, elapse))
-        src_im = utility.draw_e2e_res(points, strs, image_file)
-        img_name_pure = os.path.split(image_file)[-1]
-        img_path = os.path.join(draw_img_save,
-                                "e2e_res_{}".format(img_name_pure))
-        cv2.imwrite(img_path, src_im)
-        logger.info("The visualized image saved in {}".format(img_path))
-    if count > 1:
-        logger.info("Avg Time: {}".format(total_time / (count - 1)))
+            count += len(img_list)
+        batch_idx += 1
+        logger.info("Predict time of {} images from {}: {}".format(
+            len(img_list), file_list[0], elapse))
+        save_e2e_res(file_list, results, draw_img_save)
+        file_list, img_list = [], []
+    if count > 0:
+        logger.info("Avg Time per image: {}".format(total_time / count))
@@ -35,6 +35,37 @@ from ppocr.utils.utility import get_image_file_list, check_and_read
 logger = get_logger()
 
 
+class RecBatchBuffer(object):
+    """
+    Reusable float32 input buffer of the rec predictor. get() returns a
+    C-contiguous [N, C, H, W] view of one flat allocation, so batches of any
+    width are assembled in place and passed to the predictor without a copy.
+    The buffer only grows when a batch needs more room than it holds.
+    """
+
+    def __init__(self, img_c, img_h, batch_num, img_w):
+        self.img_c = img_c
+        self.img_h = img_h
+        self.alloc_num = 0
+        self.alloc_bytes = 0
+        self.batch_num = 0
+        self._buffer = None
+        self._reserve(batch_num * img_c * img_h * img_w)
+
+    def _reserve(self, size):
+        if self._buffer is None or self._buffer.size < size:
+            self._buffer = np.empty(size, dtype=np.float32)
+            self.alloc_num += 1
+            self.alloc_bytes += self._buffer.nbytes
+
+    def get(self, batch_size, img_w):
+        size = batch_size * self.img_c * self.img_h * img_w
+        self._reserve(size)
+        self.batch_num += 1
+        return self._buffer[:size].reshape(
+            (batch_size, self.img_c, self.img_h, img_w))
+
+
 class TextRecognizer(object):
     def __init__(self, args):
         self.rec_image_shape = [int(v) for v in args.rec_image_shape.split(",")]
@@ -43,7 +74,8 @@ class TextRecognizer(object):
         postprocess_params = {
             'name': 'CTCLabelDecode',
             "character_dict_path": args.rec_char_dict_path,
-            "use_space_char": args.use_space_char
+            "use_space_char": args.use_space_char,
+            "beam_size": args.rec_beam_size
         }
         if self.rec_algorithm == "SRN":
             postprocess_params = {
@@ -127,6 +159,27 @@ class TextRecognizer(object):
             utility.create_predictor(args, 'rec', logger)
         self.benchmark = args.benchmark
         self.use_onnx = args.use_onnx
+        # the CTC style models share resize_norm_img's default branch, which
+        # can fill a reused batch buffer instead of concatenating crops
+        self.batch_buffer = None
+        self.width_buckets = []
+        # padding statistics of the buffered batches, keyed by batch width,
+        # only with width buckets, which keep the number of widths fixed
+        self.width_stats = {}
+        if self.rec_algorithm not in [
+                "SAR", "SRN", "SVTR", "SATRN", "VisionLAN", "PREN", "SPIN",
+                "ABINet", "RobustScanner", "CAN", "NRTR", "ViTSTR", "RFL",
+                "RARE"
+        ]:
+            imgC, imgH, imgW = self.rec_image_shape[:3]
+            if args.rec_width_buckets and not self.use_onnx:
+                self.width_buckets = sorted(
+                    [int(v) for v in args.rec_width_buckets.split(",")])
+                imgW = max(imgW, self.width_buckets[-1])
+            self.batch_buffer = RecBatchBuffer(imgC, imgH, self.rec_batch_num,
+                                               imgW)
+            # (x / 255 - 0.5) / 0.5 for every uint8 value, in float32
+            self.norm_lut = (np.arange(256, dtype=np.float32) / 255 - 0.5) / 0.5
         if args.benchmark:
             import auto_log
             pid = os.getpid()
@@ -203,6 +256,116 @@ class TextRecognizer(object):
         padding_im[:, :, 0:resized_w] = resized_image
         return padding_im
 
+    def get_batch_plan(self, width_list):
+        """
+        order the crops and split them into batches of (beg, end, width).
+        Without width buckets the crops are sorted by aspect ratio and every
+        batch takes the width of its widest crop (width is None). With
+        buckets each crop goes to the narrowest bucket it fits, crops wider
+        than the last bucket to a multiple of it, and batches are filled to
+        rec_batch_num within a bucket so only a fixed set of shapes is fed to
+        the predictor.
+        """
+        img_num = len(width_list)
+        batch_num = self.rec_batch_num
+        indices = np.argsort(np.array(width_list))
+        if not self.width_buckets:
+            return indices, [(beg, min(img_num, beg + batch_num), None)
+                             for beg in range(0, img_num, batch_num)]
+
+        imgH = self.rec_image_shape[1]
+        buckets = np.array(self.width_buckets)
+        need_w = np.ceil(imgH * np.array(width_list)).astype(np.int64)
+        bucket_w = buckets[np.minimum(
+            np.searchsorted(buckets, need_w), len(buckets) - 1)]
+        bucket_w = np.where(need_w > buckets[-1],
+                            np.ceil(need_w / buckets[-1]) * buckets[-1],
+                            bucket_w).astype(np.int64)
+        # a stable sort keeps the aspect ratio order inside a bucket
+        indices = indices[np.argsort(bucket_w[indices], kind='stable')]
+        batch_plan = []
+        beg = 0
+        while beg < img_num:
+            width = bucket_w[indices[beg]]
+            end = beg
+            while end < min(img_num, beg + batch_num) and \
+                    bucket_w[indices[end]] == width:
+                end += 1
+            batch_plan.append((beg, end, int(width)))
+            beg = end
+        return indices, batch_plan
+
+    def update_width_stats(self, norm_img_batch, crop_list):
+        """
+        record the share of padded pixels of a buffered batch
+        """
+        batch_size, _, imgH, batch_w = norm_img_batch.shape
+        content_w = sum([
+            min(batch_w, int(math.ceil(imgH * img.shape[1] / float(img.shape[
+                0])))) for img in crop_list
+        ])
+        stats = self.width_stats.setdefault(batch_w, {
+            'crop_num': 0,
+            'batch_num': 0,
+            'pad_pixels': 0,
+            'total_pixels': 0
+        })
+        stats['crop_num'] += batch_size
+        stats['batch_num'] += 1
+        stats['pad_pixels'] += (batch_size * batch_w - content_w) * imgH
+        stats['total_pixels'] += batch_size * batch_w * imgH
+
+    def get_width_report(self):
+        """
+        per batch width: crops, batches, average batch size and padding waste
+        """
+        report = []
+        for batch_w in sorted(self.width_stats.keys()):
+            stats = self.width_stats[batch_w]
+            report.append({
+                'width': batch_w,
+                'crop_num': stats['crop_num'],
+                'batch_num': stats['batch_num'],
+                'avg_batch_size': stats['crop_num'] / stats['batch_num'],
+                'pad_ratio': stats['pad_pixels'] / stats['total_pixels']
+            })
+        return report
+
+    def get_batch_width(self, max_wh_ratio):
+        imgC, imgH, imgW = self.rec_image_shape
+        imgW = int((imgH * max_wh_ratio))
+        if self.use_onnx:
+            w = self.input_tensor.shape[3:][0]
+            if isinstance(w, str):
+                pass
+            elif w is not None and w > 0:
+                imgW = w
+        return imgW
+
+    def resize_norm_img_into(self, img, norm_img):
+        """
+        same result as resize_norm_img, but written into norm_img, a [C, H, W]
+        view of the batch buffer. Normalization is a single lookup-table
+        gather from the resized uint8 crop.
+        """
+        imgC, imgH, imgW = norm_img.shape
+        assert imgC == img.shape[2]
+        h, w = img.shape[:2]
+        ratio = w / float(h)
+        resized_w = min(imgW, int(math.ceil(imgH * ratio)))
+        resized_image = cv2.resize(img, (resized_w, imgH))
+        if resized_image.dtype == np.uint8:
+            np.take(
+                self.norm_lut,
+                resized_image.transpose((2, 0, 1)),
+                out=norm_img[:, :, :resized_w],
+                mode='clip')
+        else:
+            norm_img[:, :, :resized_w] = (
+                resized_image.transpose((2, 0, 1)).astype('float32') / 255 -
+                0.5) / 0.5
+        norm_img[:, :, resized_w:] = 0
+
     def resize_norm_img_vl(self, img, image_shape):
 
         imgC, imgH, imgW = image_shape
@@ -397,14 +560,12 @@ class TextRecognizer(object):
         for img in img_list:
             width_list.append(img.shape[1] / float(img.shape[0]))
         # Sorting can speed up the recognition process
-        indices = np.argsort(np.array(width_list))
+        indices, batch_plan = self.get_batch_plan(width_list)
         rec_res = [['', 0.0]] * img_num
-        batch_num = self.rec_batch_num
         st = time.time()
         if self.benchmark:
             self.autolog.times.start()
-        for beg_img_no in range(0, img_num, batch_num):
-            end_img_no = min(img_num, beg_img_no + batch_num)
+        for beg_img_no, end_img_no, batch_w in batch_plan:
             norm_img_batch = []
             if self.rec_algorithm == "SRN":
                 encoder_word_pos_list = []
@@ -420,73 +581,90 @@ class TextRecognizer(object):
                 h, w = img_list[indices[ino]].shape[0:2]
                 wh_ratio = w * 1.0 / h
                 max_wh_ratio = max(max_wh_ratio, wh_ratio)
-            for ino in range(beg_img_no, end_img_no):
-                if self.rec_algorithm == "SAR":
-                    norm_img, _, _, valid_ratio = self.resize_norm_img_sar(
-                        img_list[indices[ino]], self.rec_image_shape)
-                    norm_img = norm_img[np.newaxis, :]
-                    valid_ratio = np.expand_dims(valid_ratio, axis=0)
-                    valid_ratios.append(valid_ratio)
-                    norm_img_batch.append(norm_img)
-                elif self.rec_algorithm == "SRN":
-                    norm_img = self.process_image_srn(
-                        img_list[indices[ino]], self.rec_image_shape, 8, 25)
-                    encoder_word_pos_list.append(norm_img[1])
-                    gsrm_word_pos_list.append(norm_img[2])
-                    gsrm_slf_attn_bias1_list.append(norm_img[3])
-                    gsrm_slf_attn_bias2_list.append(norm_img[4])
-                    norm_img_batch.append(norm_img[0])
-                elif self.rec_algorithm in ["SVTR", "SATRN"]:
-                    norm_img = self.resize_norm_img_svtr(img_list[indices[ino]],
-                                                         self.rec_image_shape)
-                    norm_img = norm_img[np.newaxis, :]
-                    norm_img_batch.append(norm_img)
-                elif self.rec_algorithm in ["VisionLAN", "PREN"]:
-                    norm_img = self.resize_norm_img_vl(img_list[indices[ino]],
-                                                       self.rec_image_shape)
-                    norm_img = norm_img[np.newaxis, :]
-                    norm_img_batch.append(norm_img)
-                elif self.rec_algorithm == 'SPIN':
-                    norm_img = self.resize_norm_img_spin(img_list[indices[ino]])
-                    norm_img = norm_img[np.newaxis, :]
-                    norm_img_batch.append(norm_img)
-                elif self.rec_algorithm == "ABINet":
-                    norm_img = self.resize_norm_img_abinet(
-                        img_list[indices[ino]], self.rec_image_shape)
-                    norm_img = norm_img[np.newaxis, :]
-                    norm_img_batch.append(norm_img)
-                elif self.rec_algorithm == "RobustScanner":
-                    norm_img, _, _, valid_ratio = self.resize_norm_img_sar(
-                        img_list[indices[ino]],
-                        self.rec_image_shape,
-                        width_downsample_ratio=0.25)
-                    norm_img = norm_img[np.newaxis, :]
-                    valid_ratio = np.expand_dims(valid_ratio, axis=0)
-                    valid_ratios = []
-                    valid_ratios.append(valid_ratio)
-                    norm_img_batch.append(norm_img)
-                    word_positions_list = []
-                    word_positions = np.array(range(0, 40)).astype('int64')
-                    word_positions = np.expand_dims(word_positions, axis=0)
-                    word_positions_list.append(word_positions)
-                elif self.rec_algorithm == "CAN":
-                    norm_img = self.norm_img_can(img_list[indices[ino]],
-                                                 max_wh_ratio)
-                    norm_img = norm_img[np.newaxis, :]
-                    norm_img_batch.append(norm_img)
-                    norm_image_mask = np.ones(norm_img.shape, dtype='float32')
-                    word_label = np.ones([1, 36], dtype='int64')
-                    norm_img_mask_batch = []
-                    word_label_list = []
-                    norm_img_mask_batch.append(norm_image_mask)
-                    word_label_list.append(word_label)
-                else:
-                    norm_img = self.resize_norm_img(img_list[indices[ino]],
-                                                    max_wh_ratio)
-                    norm_img = norm_img[np.newaxis, :]
-                    norm_img_batch.append(norm_img)
-            norm_img_batch = np.concatenate(norm_img_batch)
-            norm_img_batch = norm_img_batch.copy()
+            if self.batch_buffer is not None:
+                # resize and normalize the crops straight into the reused
+                # batch buffer, which is fed to the predictor without copies
+                if batch_w is None:
+                    batch_w = self.get_batch_width(max_wh_ratio)
+                norm_img_batch = self.batch_buffer.get(end_img_no - beg_img_no,
+                                                       batch_w)
+                crop_list = [
+                    img_list[indices[ino]]
+                    for ino in range(beg_img_no, end_img_no)
+                ]
+                for bno, crop in enumerate(crop_list):
+                    self.resize_norm_img_into(crop, norm_img_batch[bno])
+                if self.width_buckets:
+                    self.update_width_stats(norm_img_batch, crop_list)
+            else:
+                for ino in range(beg_img_no, end_img_no):
+                    if self.rec_algorithm == "SAR":
+                        norm_img, _, _, valid_ratio = self.resize_norm_img_sar(
+                            img_list[indices[ino]], self.rec_image_shape)
+                        norm_img = norm_img[np.newaxis, :]
+                        valid_ratio = np.expand_dims(valid_ratio, axis=0)
+                        valid_ratios.append(valid_ratio)
+                        norm_img_batch.append(norm_img)
+                    elif self.rec_algorithm == "SRN":
+                        norm_img = self.process_image_srn(
+                            img_list[indices[ino]], self.rec_image_shape, 8, 25)
+                        encoder_word_pos_list.append(norm_img[1])
+                        gsrm_word_pos_list.append(norm_img[2])
+                        gsrm_slf_attn_bias1_list.append(norm_img[3])
+                        gsrm_slf_attn_bias2_list.append(norm_img[4])
+                        norm_img_batch.append(norm_img[0])
+                    elif self.rec_algorithm in ["SVTR", "SATRN"]:
+                        norm_img = self.resize_norm_img_svtr(
+                            img_list[indices[ino]], self.rec_image_shape)
+                        norm_img = norm_img[np.newaxis, :]
+                        norm_img_batch.append(norm_img)
+                    elif self.rec_algorithm in ["VisionLAN", "PREN"]:
+                        norm_img = self.resize_norm_img_vl(
+                            img_list[indices[ino]], self.rec_image_shape)
+                        norm_img = norm_img[np.newaxis, :]
+                        norm_img_batch.append(norm_img)
+                    elif self.rec_algorithm == 'SPIN':
+                        norm_img = self.resize_norm_img_spin(
+                            img_list[indices[ino]])
+                        norm_img = norm_img[np.newaxis, :]
+                        norm_img_batch.append(norm_img)
+                    elif self.rec_algorithm == "ABINet":
+                        norm_img = self.resize_norm_img_abinet(
+                            img_list[indices[ino]], self.rec_image_shape)
+                        norm_img = norm_img[np.newaxis, :]
+                        norm_img_batch.append(norm_img)
+                    elif self.rec_algorithm == "RobustScanner":
+                        norm_img, _, _, valid_ratio = self.resize_norm_img_sar(
+                            img_list[indices[ino]],
+                            self.rec_image_shape,
+                            width_downsample_ratio=0.25)
+                        norm_img = norm_img[np.newaxis, :]
+                        valid_ratio = np.expand_dims(valid_ratio, axis=0)
+                        valid_ratios = []
+                        valid_ratios.append(valid_ratio)
+                        norm_img_batch.append(norm_img)
+                        word_positions_list = []
+                        word_positions = np.array(range(0, 40)).astype('int64')
+                        word_positions = np.expand_dims(word_positions, axis=0)
+                        word_positions_list.append(word_positions)
+                    elif self.rec_algorithm == "CAN":
+                        norm_img = self.norm_img_can(img_list[indices[ino]],
+                                                     max_wh_ratio)
+                        norm_img = norm_img[np.newaxis, :]
+                        norm_img_batch.append(norm_img)
+                        norm_image_mask = np.ones(
+                            norm_img.shape, dtype='float32')
+                        word_label = np.ones([1, 36], dtype='int64')
+                        norm_img_mask_batch = []
+                        word_label_list = []
+                        norm_img_mask_batch.append(norm_image_mask)
+                        word_label_list.append(word_label)
+                    else:
+                        norm_img = self.resize_norm_img(img_list[indices[ino]],
+                                                        max_wh_ratio)
+                        norm_img = norm_img[np.newaxis, :]
+                        norm_img_batch.append(norm_img)
+                norm_img_batch = np.concatenate(norm_img_batch)
             if self.benchmark:
                 self.autolog.times.stamp()
 
@@ -670,6 +848,18 @@ def main(args):
                                                rec_res[ino]))
     if args.benchmark:
         text_recognizer.autolog.report()
+        if text_recognizer.batch_buffer is not None:
+            batch_buffer = text_recognizer.batch_buffer
+            logger.info(
+                "rec batch buffer: {} allocations ({:.2f} MB) for {} batches".
+                format(batch_buffer.alloc_num, batch_buffer.alloc_bytes /
+                       1024 / 1024, batch_buffer.batch_num))
+            for stats in text_recognizer.get_width_report():
+                logger.info(
+                    "rec width {}: {} crops in {} batches (avg {:.2f}), "
+                    "padding {:.1%}".format(stats['width'], stats[
+                        'crop_num'], stats['batch_num'], stats[
+                            'avg_batch_size'], stats['pad_ratio']))
 
 
 if __name__ == "__main__":
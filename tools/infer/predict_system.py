@@ -13,7 +13,6 @@
 # limitations under the License.
 import os
 import sys
-import subprocess
 
 __dir__ = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(__dir__)
@@ -26,7 +25,13 @@ import copy
 import numpy as np
 import json
 import time
+import queue
 import logging
+import threading
+import functools
+import traceback
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import tools.infer.utility as utility
 import tools.infer.predict_rec as predict_rec
@@ -34,9 +39,24 @@ import tools.infer.predict_det as predict_det
 import tools.infer.predict_cls as predict_cls
 from ppocr.utils.utility import get_image_file_list, check_and_read
 from ppocr.utils.logging import get_logger
-from tools.infer.utility import draw_ocr_box_txt, get_rotate_crop_image, get_minarea_rect_crop
+from tools.infer.utility import draw_ocr_box_txt, get_crop_image_list
 logger = get_logger()
 
+_PIPELINE_END = object()
+
+
+def _cls_state(num, num_pages):
+    """
+    which of num crops are classified, rotated and recognized again, and
+    which of the pages are rotated
+    """
+    return {
+        'classified': np.zeros(num, dtype=bool),
+        'rotated': np.zeros(num, dtype=bool),
+        'rerec': np.zeros(num, dtype=bool),
+        'page_rotated': np.zeros(num_pages, dtype=bool)
+    }
+
 
 class TextSystem(object):
     def __init__(self, args):
@@ -49,9 +69,27 @@ class TextSystem(object):
         self.drop_score = args.drop_score
         if self.use_angle_cls:
             self.text_classifier = predict_cls.TextClassifier(args)
+        self.cls_mode = args.cls_mode
+        # cls and rec work of all the pages so far, see _cls_rec
+        self.cls_stats = {
+            'crops': 0,
+            'cls': 0,
+            'cls_skip': 0,
+            'rotated': 0,
+            'rec': 0,
+            'rerec': 0,
+            'rotated_pages': 0
+        }
+        self._cls_stats_lock = threading.Lock()
 
         self.args = args
         self.crop_image_res_index = 0
+        self.crop_executor = None
+        if args.crop_num_threads > 1:
+            self.crop_executor = ThreadPoolExecutor(args.crop_num_threads)
+        self.crop_height = None
+        if args.crop_to_rec_height:
+            self.crop_height = self.text_recognizer.rec_image_shape[1]
 
     def draw_crop_rec_res(self, output_dir, img_crop_list, rec_res):
         os.makedirs(output_dir, exist_ok=True)
@@ -64,6 +102,139 @@ class TextSystem(object):
             logger.debug(f"{bno}, {rec_res[bno]}")
         self.crop_image_res_index += bbox_num
 
+    def get_crop_list(self, img, dt_boxes):
+        return get_crop_image_list(
+            img,
+            dt_boxes,
+            box_type=self.args.det_box_type,
+            target_height=self.crop_height,
+            executor=self.crop_executor)
+
+    def _classify(self, img_crop_list, idx_list, state, time_dict):
+        """
+        classify the crops of idx_list, rotated crops are replaced in
+        img_crop_list
+        """
+        if len(idx_list) == 0:
+            return
+        crops, angle_list, elapse = self.text_classifier(
+            [img_crop_list[idx] for idx in idx_list])
+        time_dict['cls'] += elapse
+        for idx, crop, (label, score) in zip(idx_list, crops, angle_list):
+            img_crop_list[idx] = crop
+            state['classified'][idx] = True
+            state['rotated'][idx] = '180' in label and \
+                score > self.text_classifier.cls_thresh
+
+    def _adaptive_cls_rec(self, img_crop_list, page_sizes, state, time_dict):
+        """
+        Recognize the crops as they are, then classify the crops recognized
+        with a score below cls_rec_score_thresh. When enough of those are
+        rotated, the page is taken as rotated and its other crops are
+        classified too. Only the rotated crops are recognized again, and
+        the rotated crop is kept only if it is recognized with a higher
+        score.
+        """
+        args = self.args
+        rec_res, elapse = self.text_recognizer(img_crop_list)
+        time_dict['rec'] += elapse
+        rec_res = list(rec_res)
+        ori_crop_list = img_crop_list
+        img_crop_list = list(img_crop_list)
+
+        scores = np.array([score for _, score in rec_res])
+        self._classify(img_crop_list,
+                       np.nonzero(scores < args.cls_rec_score_thresh)[0],
+                       state, time_dict)
+
+        # page orientation vote of the classified crops
+        idx_list = []
+        beg = 0
+        for pno, size in enumerate(page_sizes):
+            page = slice(beg, beg + size)
+            num_cls = state['classified'][page].sum()
+            num_rotated = state['rotated'][page].sum()
+            if num_rotated >= args.cls_page_vote_min and \
+                    num_rotated >= args.cls_page_vote_ratio * num_cls:
+                state['page_rotated'][pno] = True
+                idx_list.extend(np.nonzero(~state['classified'][page])[0] +
+                                beg)
+            beg += size
+        self._classify(img_crop_list, idx_list, state, time_dict)
+
+        idx_list = np.nonzero(state['rotated'])[0]
+        state['rerec'][idx_list] = True
+        if len(idx_list) > 0:
+            new_rec_res, elapse = self.text_recognizer(
+                [img_crop_list[idx] for idx in idx_list])
+            time_dict['rec'] += elapse
+            for idx, rec_result in zip(idx_list, new_rec_res):
+                if rec_result[1] > rec_res[idx][1]:
+                    rec_res[idx] = rec_result
+                else:
+                    img_crop_list[idx] = ori_crop_list[idx]
+        return img_crop_list, rec_res
+
+    def _cls_rec(self, img_crop_list, cls, time_dict, page_sizes=None):
+        """
+        angle classification, as set by cls_mode, and recognition of the
+        crops of one or more pages
+        args:
+            img_crop_list(list): crops of all pages
+            cls(bool): use angle classifier or not
+            time_dict(dict): cls and rec time are added to it
+            page_sizes(list): number of crops of every page, all crops are
+                one page by default
+        return:
+            crops after classification, rec_res, list of the cls stats of
+            every page or None if the classifier is not used
+        """
+        num = len(img_crop_list)
+        if page_sizes is None:
+            page_sizes = [num]
+        use_cls = self.use_angle_cls and cls and num > 0
+        state = _cls_state(num, len(page_sizes))
+        if use_cls and self.cls_mode == 'adaptive':
+            img_crop_list, rec_res = self._adaptive_cls_rec(
+                img_crop_list, page_sizes, state, time_dict)
+        else:
+            if use_cls:
+                img_crop_list = list(img_crop_list)
+                self._classify(img_crop_list, range(num), state, time_dict)
+            rec_res, elapse = self.text_recognizer(img_crop_list)
+            time_dict['rec'] += elapse
+        logger.debug("rec_res num  : {}, elapsed : {}".format(
+            len(rec_res), time_dict['rec']))
+        if not use_cls:
+            return img_crop_list, rec_res, None
+        logger.debug("cls num  : {}, elapsed : {}".format(
+            state['classified'].sum(), time_dict['cls']))
+        return img_crop_list, rec_res, self._update_cls_stats(page_sizes,
+                                                              state)
+
+    def _update_cls_stats(self, page_sizes, state):
+        page_stats = []
+        beg = 0
+        for pno, size in enumerate(page_sizes):
+            page = slice(beg, beg + size)
+            num_cls = int(state['classified'][page].sum())
+            num_rerec = int(state['rerec'][page].sum())
+            page_stats.append({
+                'crops': size,
+                'cls': num_cls,
+                'cls_skip': size - num_cls,
+                'rotated': int(state['rotated'][page].sum()),
+                'rec': size + num_rerec,
+                'rerec': num_rerec,
+                'rotated_pages': int(state['page_rotated'][pno])
+            })
+            beg += size
+        with self._cls_stats_lock:
+            for stats in page_stats:
+                for key, value in stats.items():
+                    self.cls_stats[key] += value
+        return page_stats
+
     def __call__(self, img, cls=True):
         time_dict = {'det': 0, 'rec': 0, 'cls': 0, 'all': 0}
 
@@ -72,7 +243,6 @@ class TextSystem(object):
             return None, None, time_dict
 
         start = time.time()
-        ori_im = img.copy()
         dt_boxes, elapse = self.text_detector(img)
         time_dict['det'] = elapse
 
@@ -84,28 +254,15 @@ class TextSystem(object):
         else:
             logger.debug("dt_boxes num : {}, elapsed : {}".format(
                 len(dt_boxes), elapse))
-        img_crop_list = []
 
         dt_boxes = sorted_boxes(dt_boxes)
 
-        for bno in range(len(dt_boxes)):
-            tmp_box = copy.deepcopy(dt_boxes[bno])
-            if self.args.det_box_type == "quad":
-                img_crop = get_rotate_crop_image(ori_im, tmp_box)
-            else:
-                img_crop = get_minarea_rect_crop(ori_im, tmp_box)
-            img_crop_list.append(img_crop)
-        if self.use_angle_cls and cls:
-            img_crop_list, angle_list, elapse = self.text_classifier(
-                img_crop_list)
-            time_dict['cls'] = elapse
-            logger.debug("cls num  : {}, elapsed : {}".format(
-                len(img_crop_list), elapse))
-
-        rec_res, elapse = self.text_recognizer(img_crop_list)
-        time_dict['rec'] = elapse
-        logger.debug("rec_res num  : {}, elapsed : {}".format(
-            len(rec_res), elapse))
+        # the detector does not modify img, crop it directly
+        img_crop_list = self.get_crop_list(img, dt_boxes)
+        img_crop_list, rec_res, cls_stats = self._cls_rec(img_crop_list, cls,
+                                                          time_dict)
+        if cls_stats is not None:
+            time_dict['cls_stats'] = cls_stats[0]
         if self.args.save_crop_res:
             self.draw_crop_rec_res(self.args.crop_res_save_dir, img_crop_list,
                                    rec_res)
@@ -119,6 +276,219 @@ class TextSystem(object):
         time_dict['all'] = end - start
         return filter_boxes, filter_rec_res, time_dict
 
+    def predict_batch(self, img_list, cls=True):
+        """
+        OCR several images at once. Detection runs on batches of
+        det_batch_num images, then the crops of all images are pooled into
+        shared cls and rec batches and the results are split back per image.
+        args:
+            img_list(list): BGR images
+            cls(bool): use angle classifier or not
+        return:
+            list of (filter_boxes, filter_rec_res) for each image, time_dict,
+            with the cls stats of every image in time_dict['cls_stats']
+            when the classifier is used
+        """
+        time_dict = {'det': 0, 'rec': 0, 'cls': 0, 'all': 0}
+        start = time.time()
+        dt_boxes_list, elapse = self.text_detector.predict_batch(img_list)
+        time_dict['det'] = elapse
+        logger.debug("det batch of {} images, elapsed : {}".format(
+            len(img_list), elapse))
+
+        img_crop_list = []
+        crop_num_list = []
+        for idx, dt_boxes in enumerate(dt_boxes_list):
+            if dt_boxes is None:
+                crop_num_list.append(0)
+                continue
+            dt_boxes = sorted_boxes(dt_boxes)
+            dt_boxes_list[idx] = dt_boxes
+            img_crop_list.extend(self.get_crop_list(img_list[idx], dt_boxes))
+            crop_num_list.append(len(dt_boxes))
+
+        img_crop_list, rec_res, cls_stats = self._cls_rec(
+            img_crop_list, cls, time_dict, page_sizes=crop_num_list)
+        if cls_stats is not None:
+            time_dict['cls_stats'] = cls_stats
+        if self.args.save_crop_res:
+            self.draw_crop_rec_res(self.args.crop_res_save_dir, img_crop_list,
+                                   rec_res)
+
+        ocr_res = []
+        beg_crop_no = 0
+        for dt_boxes, crop_num in zip(dt_boxes_list, crop_num_list):
+            if dt_boxes is None:
+                ocr_res.append((None, None))
+                continue
+            filter_boxes, filter_rec_res = [], []
+            for box, rec_result in zip(
+                    dt_boxes, rec_res[beg_crop_no:beg_crop_no + crop_num]):
+                text, score = rec_result
+                if score >= self.drop_score:
+                    filter_boxes.append(box)
+                    filter_rec_res.append(rec_result)
+            beg_crop_no += crop_num
+            ocr_res.append((filter_boxes, filter_rec_res))
+        end = time.time()
+        time_dict['all'] = end - start
+        return ocr_res, time_dict
+
+    def predict_pipeline(self, img_iter, cls=True, queue_size=4):
+        """
+        Streaming OCR. Detection, cropping, angle classification and
+        recognition each run in their own worker thread connected by bounded
+        queues, so image N+1 is detected while the crops of image N are
+        recognized. Results are yielded in input order, and the share of
+        wall time each stage spent working is kept in self.pipeline_stats.
+        args:
+            img_iter(iterable): BGR images
+            cls(bool): use angle classifier or not
+            queue_size(int): capacity of each stage queue
+        return:
+            generator of (filter_boxes, filter_rec_res, time_dict)
+        """
+        stages = [('det', self._det_stage), ('crop', self._crop_stage)]
+        # adaptive classification needs the rec scores, it runs in the rec
+        # stage
+        adaptive_cls = self.use_angle_cls and cls and \
+            self.cls_mode == 'adaptive'
+        if self.use_angle_cls and cls and not adaptive_cls:
+            stages.append(('cls', self._cls_stage))
+        stages.append(('rec', functools.partial(
+            self._rec_stage, cls=adaptive_cls)))
+
+        queues = [
+            queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)
+        ]
+        stop_event = threading.Event()
+        busy_time = {name: 0. for name, _ in stages}
+        workers = [
+            threading.Thread(
+                target=self._feed_pipeline,
+                args=(img_iter, queues[0], stop_event),
+                daemon=True)
+        ]
+        for sno, (name, func) in enumerate(stages):
+            workers.append(
+                threading.Thread(
+                    target=self._run_pipeline_stage,
+                    args=(name, func, queues[sno], queues[sno + 1], busy_time,
+                          stop_event),
+                    daemon=True))
+        start = time.time()
+        for worker in workers:
+            worker.start()
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _PIPELINE_END:
+                    break
+                if 'error' in item:
+                    raise item['error']
+                yield item['boxes'], item['rec_res'], item['time_dict']
+        finally:
+            stop_event.set()
+            elapse = max(time.time() - start, 1e-6)
+            self.pipeline_stats = {
+                name: busy_time[name] / elapse
+                for name in busy_time
+            }
+            logger.debug("pipeline stage occupancy: {}".format(", ".join([
+                "{}: {:.1%}".format(name, occupancy)
+                for name, occupancy in self.pipeline_stats.items()
+            ])))
+
+    def _put_pipeline_item(self, out_queue, item, stop_event):
+        while not stop_event.is_set():
+            try:
+                out_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _feed_pipeline(self, img_iter, out_queue, stop_event):
+        try:
+            for img in img_iter:
+                item = {
+                    'img': img,
+                    'time_dict': {
+                        'det': 0,
+                        'rec': 0,
+                        'cls': 0,
+                        'all': 0
+                    },
+                    'start': time.time()
+                }
+                if not self._put_pipeline_item(out_queue, item, stop_event):
+                    return
+        except Exception as e:
+            self._put_pipeline_item(out_queue, {'error': e}, stop_event)
+        self._put_pipeline_item(out_queue, _PIPELINE_END, stop_event)
+
+    def _run_pipeline_stage(self, name, func, in_queue, out_queue, busy_time,
+                            stop_event):
+        while True:
+            try:
+                item = in_queue.get(timeout=0.1)
+            except queue.Empty:
+                if stop_event.is_set():
+                    return
+                continue
+            if item is not _PIPELINE_END and 'error' not in item:
+                st = time.time()
+                try:
+                    func(item)
+                except Exception as e:
+                    item = {'error': e}
+                busy_time[name] += time.time() - st
+            if not self._put_pipeline_item(out_queue, item, stop_event):
+                return
+            if item is _PIPELINE_END:
+                return
+
+    def _det_stage(self, item):
+        item['boxes'], item['rec_res'] = None, None
+        if item['img'] is None:
+            logger.debug("no valid image provided")
+            return
+        dt_boxes, elapse = self.text_detector(item['img'])
+        item['time_dict']['det'] = elapse
+        if dt_boxes is not None:
+            item['boxes'] = sorted_boxes(dt_boxes)
+
+    def _crop_stage(self, item):
+        img = item.pop('img')
+        if item['boxes'] is not None:
+            item['crops'] = self.get_crop_list(img, item['boxes'])
+
+    def _cls_stage(self, item):
+        if item['boxes'] is None:
+            return
+        crops = list(item['crops'])
+        num = len(crops)
+        state = _cls_state(num, 1)
+        self._classify(crops, range(num), state, item['time_dict'])
+        item['crops'] = crops
+        item['time_dict']['cls_stats'] = self._update_cls_stats([num],
+                                                                state)[0]
+
+    def _rec_stage(self, item, cls=False):
+        if item['boxes'] is not None:
+            _, rec_res, cls_stats = self._cls_rec(
+                item.pop('crops'), cls, item['time_dict'])
+            if cls_stats is not None:
+                item['time_dict']['cls_stats'] = cls_stats[0]
+            filter_boxes, filter_rec_res = [], []
+            for box, rec_result in zip(item['boxes'], rec_res):
+                text, score = rec_result
+                if score >= self.drop_score:
+                    filter_boxes.append(box)
+                    filter_rec_res.append(rec_result)
+            item['boxes'], item['rec_res'] = filter_boxes, filter_rec_res
+        item['time_dict']['all'] = time.time() - item['start']
+
 
 def sorted_boxes(dt_boxes):
     """
@@ -144,13 +514,247 @@ def sorted_boxes(dt_boxes):
     return _boxes
 
 
+def read_image_pages(image_file, page_num=0):
+    """
+    pages of an image, gif or pdf file, or None if it can not be read
+    """
+    # pdf pages are rasterized while the previous page is processed
+    img, flag_gif, flag_pdf = check_and_read(
+        image_file, page_num=page_num, lazy=True)
+    if not flag_gif and not flag_pdf:
+        img = cv2.imread(image_file)
+    if not flag_pdf:
+        if img is None:
+            return None, flag_gif, flag_pdf
+        return [img], flag_gif, flag_pdf
+    return img, flag_gif, flag_pdf
+
+
+def ocr_task(text_sys, item):
+    """
+    default task of OCRWorkerPool: item is a BGR image, for which
+    (dt_boxes, rec_res, time_dict) is returned, or the path of an image,
+    gif or pdf file, for which a list of those is returned, one per page
+    """
+    if isinstance(item, np.ndarray):
+        return text_sys(item)
+    imgs, _, _ = read_image_pages(item)
+    if imgs is None:
+        return None
+    return [text_sys(img) for img in imgs]
+
+
+def _ocr_worker(args, build_fn, task_fn, cpu_ids, in_queue, out_queue):
+    if cpu_ids is not None and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpu_ids)
+    try:
+        text_sys = build_fn(args)
+        if args.warmup:
+            warmup(text_sys)
+    except Exception:
+        out_queue.put((None, None, traceback.format_exc()))
+        return
+    while True:
+        task = in_queue.get()
+        if task is None:
+            return
+        idx, item = task
+        try:
+            out_queue.put((idx, task_fn(text_sys, item), None))
+        except Exception:
+            out_queue.put((idx, None, traceback.format_exc()))
+
+
+class OCRWorkerPool(object):
+    """
+    Processes that each load the OCR models once and pull tasks from a
+    shared queue, so slow images do not hold back a fixed share of the
+    input. The CPU threads of every worker are capped so that cpu_threads
+    times num_workers does not exceed the cores, and on Linux every worker
+    is pinned to its own cores.
+
+    usage:
+        with OCRWorkerPool(args, num_workers=4) as pool:
+            for dt_boxes, rec_res, time_dict in pool.map(img_list):
+                ...
+    args:
+        args: the arguments of TextSystem
+        num_workers(int): number of worker processes
+        task_fn: picklable function(text_sys, item) run on every item,
+            ocr_task by default
+        build_fn: picklable function(args) that builds the text_sys of
+            every worker, TextSystem by default
+        queue_size(int): tasks in flight per worker
+    """
+
+    def __init__(self,
+                 args,
+                 num_workers=2,
+                 task_fn=ocr_task,
+                 build_fn=TextSystem,
+                 queue_size=2):
+        self.num_workers = num_workers
+        self.queue_size = queue_size
+        num_cores = len(os.sched_getaffinity(0)) if hasattr(
+            os, 'sched_getaffinity') else os.cpu_count()
+        cpu_threads = max(1, min(args.cpu_threads,
+                                 num_cores // num_workers))
+        worker_args = copy.copy(args)
+        worker_args.cpu_threads = cpu_threads
+        cores = sorted(os.sched_getaffinity(0)) if hasattr(
+            os, 'sched_getaffinity') else None
+        pin = cores is not None and cpu_threads * num_workers <= len(cores)
+
+        # spawn, the predictors are not fork safe
+        ctx = multiprocessing.get_context('spawn')
+        self.in_queue = ctx.Queue()
+        self.out_queue = ctx.Queue()
+        self.workers = []
+        for wid in range(num_workers):
+            cpu_ids = cores[wid * cpu_threads:(wid + 1) *
+                            cpu_threads] if pin else None
+            worker = ctx.Process(
+                target=_ocr_worker,
+                args=(worker_args, build_fn, task_fn, cpu_ids,
+                      self.in_queue, self.out_queue),
+                daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        logger.info("OCRWorkerPool: {} workers, {} cpu threads each".format(
+            num_workers, cpu_threads))
+
+    def _get_result(self):
+        while True:
+            try:
+                idx, res, error = self.out_queue.get(timeout=1)
+            except queue.Empty:
+                if not all([worker.is_alive() for worker in self.workers]):
+                    raise RuntimeError("an OCR worker exited unexpectedly")
+                continue
+            if error is not None:
+                raise RuntimeError("OCR worker failed on item {}:\n{}".format(
+                    idx, error))
+            return idx, res
+
+    def map(self, items):
+        """
+        results of task_fn for items, in input order
+        """
+        items = enumerate(items)
+        max_pending = self.num_workers * self.queue_size
+        pending, next_idx, done = 0, 0, {}
+        exhausted = False
+        while True:
+            while not exhausted and pending < max_pending:
+                task = next(items, None)
+                if task is None:
+                    exhausted = True
+                    break
+                self.in_queue.put(task)
+                pending += 1
+            if pending == 0:
+                return
+            idx, res = self._get_result()
+            pending -= 1
+            done[idx] = res
+            while next_idx in done:
+                yield done.pop(next_idx)
+                next_idx += 1
+
+    def close(self):
+        for worker in self.workers:
+            if worker.is_alive():
+                self.in_queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def warmup(text_sys):
+    img = np.random.uniform(0, 255, [640, 640, 3]).astype(np.uint8)
+    for i in range(10):
+        res = text_sys(img)
+
+
+def ocr_image_file(text_sys, task, args):
+    """
+    OCR one image file and save its visualizations, returns the lines of
+    system_results.txt and the predict time. Used as the task of the
+    OCRWorkerPool of --use_mp.
+    """
+    idx, image_file = task
+    imgs, flag_gif, flag_pdf = read_image_pages(image_file, args.page_num)
+    if imgs is None:
+        logger.debug("error in loading image:{}".format(image_file))
+        return [], 0
+    save_results = []
+    total_time = 0
+    for index, img in enumerate(imgs):
+        starttime = time.time()
+        dt_boxes, rec_res, time_dict = text_sys(img)
+        elapse = time.time() - starttime
+        total_time += elapse
+        if len(imgs) > 1:
+            logger.debug(
+                str(idx) + '_' + str(index) + "  Predict time of %s: %.3fs" %
+                (image_file, elapse))
+        else:
+            logger.debug(
+                str(idx) + "  Predict time of %s: %.3fs" % (image_file, elapse))
+        if 'cls_stats' in time_dict:
+            logger.debug("cls stats: {}".format(time_dict['cls_stats']))
+        for text, score in rec_res:
+            logger.debug("{}, {:.3f}".format(text, score))
+
+        res = [{
+            "transcription": rec_res[i][0],
+            "points": np.array(dt_boxes[i]).astype(np.int32).tolist(),
+        } for i in range(len(dt_boxes))]
+        if len(imgs) > 1:
+            save_pred = os.path.basename(image_file) + '_' + str(
+                index) + "\t" + json.dumps(
+                    res, ensure_ascii=False) + "\n"
+        else:
+            save_pred = os.path.basename(image_file) + "\t" + json.dumps(
+                res, ensure_ascii=False) + "\n"
+        save_results.append(save_pred)
+
+        image = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+        boxes = dt_boxes
+        txts = [rec_res[i][0] for i in range(len(rec_res))]
+        scores = [rec_res[i][1] for i in range(len(rec_res))]
+
+        draw_img = draw_ocr_box_txt(
+            image,
+            boxes,
+            txts,
+            scores,
+            drop_score=args.drop_score,
+            font_path=args.vis_font_path)
+        if flag_gif:
+            save_file = image_file[:-3] + "png"
+        elif flag_pdf:
+            save_file = image_file.replace('.pdf', '_' + str(index) + '.png')
+        else:
+            save_file = image_file
+        cv2.imwrite(
+            os.path.join(args.draw_img_save_dir, os.path.basename(save_file)),
+            draw_img[:, :, ::-1])
+        logger.debug("The visualized image saved in {}".format(
+            os.path.join(args.draw_img_save_dir, os.path.basename(save_file))))
+    return save_results, total_time
+
+
 def main(args):
     image_file_list = get_image_file_list(args.image_dir)
-    image_file_list = image_file_list[args.process_id::args.total_process_num]
-    text_sys = TextSystem(args)
-    is_visualize = True
-    font_path = args.vis_font_path
-    drop_score = args.drop_score
     draw_img_save_dir = args.draw_img_save_dir
     os.makedirs(draw_img_save_dir, exist_ok=True)
     save_results = []
@@ -160,92 +764,39 @@ def main(args):
         "if you are using recognition model with PP-OCRv2 or an older version, please set --rec_image_shape='3,32,320"
     )
 
-    # warm up 10 times
-    if args.warmup:
-        img = np.random.uniform(0, 255, [640, 640, 3]).astype(np.uint8)
-        for i in range(10):
-            res = text_sys(img)
-
     total_time = 0
-    cpu_mem, gpu_mem, gpu_util = 0, 0, 0
     _st = time.time()
-    count = 0
-    for idx, image_file in enumerate(image_file_list):
-
-        img, flag_gif, flag_pdf = check_and_read(image_file)
-        if not flag_gif and not flag_pdf:
-            img = cv2.imread(image_file)
-        if not flag_pdf:
-            if img is None:
-                logger.debug("error in loading image:{}".format(image_file))
-                continue
-            imgs = [img]
-        else:
-            page_num = args.page_num
-            if page_num > len(img) or page_num == 0:
-                page_num = len(img)
-            imgs = img[:page_num]
-        for index, img in enumerate(imgs):
-            starttime = time.time()
-            dt_boxes, rec_res, time_dict = text_sys(img)
-            elapse = time.time() - starttime
+    tasks = list(enumerate(image_file_list))
+    if args.use_mp:
+        with OCRWorkerPool(
+                args,
+                num_workers=args.total_process_num,
+                task_fn=functools.partial(
+                    ocr_image_file, args=args)) as pool:
+            for file_results, elapse in pool.map(tasks):
+                save_results.extend(file_results)
+                total_time += elapse
+        logger.info("The predict total time is {}".format(time.time() - _st))
+    else:
+        text_sys = TextSystem(args)
+        # warm up 10 times
+        if args.warmup:
+            warmup(text_sys)
+        for task in tasks:
+            file_results, elapse = ocr_image_file(text_sys, task, args)
+            save_results.extend(file_results)
             total_time += elapse
-            if len(imgs) > 1:
-                logger.debug(
-                    str(idx) + '_' + str(index) + "  Predict time of %s: %.3fs"
-                    % (image_file, elapse))
-            else:
-                logger.debug(
-                    str(idx) + "  Predict time of %s: %.3fs" % (image_file,
-                                                                elapse))
-            for text, score in rec_res:
-                logger.debug("{}, {:.3f}".format(text, score))
-
-            res = [{
-                "transcription": rec_res[i][0],
-                "points": np.array(dt_boxes[i]).astype(np.int32).tolist(),
-            } for i in range(len(dt_boxes))]
-            if len(imgs) > 1:
-                save_pred = os.path.basename(image_file) + '_' + str(
-                    index) + "\t" + json.dumps(
-                        res, ensure_ascii=False) + "\n"
-            else:
-                save_pred = os.path.basename(image_file) + "\t" + json.dumps(
-                    res, ensure_ascii=False) + "\n"
-            save_results.append(save_pred)
-
-            if is_visualize:
-                image = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
-                boxes = dt_boxes
-                txts = [rec_res[i][0] for i in range(len(rec_res))]
-                scores = [rec_res[i][1] for i in range(len(rec_res))]
-
-                draw_img = draw_ocr_box_txt(
-                    image,
-                    boxes,
-                    txts,
-                    scores,
-                    drop_score=drop_score,
-                    font_path=font_path)
-                if flag_gif:
-                    save_file = image_file[:-3] + "png"
-                elif flag_pdf:
-                    save_file = image_file.replace('.pdf',
-                                                   '_' + str(index) + '.png')
-                else:
-                    save_file = image_file
-                cv2.imwrite(
-                    os.path.join(draw_img_save_dir,
-                                 os.path.basename(save_file)),
-                    draw_img[:, :, ::-1])
-                logger.debug("The visualized image saved in {}".format(
-                    os.path.join(draw_img_save_dir, os.path.basename(
-                        save_file))))
-
-    logger.info("The predict total time is {}".format(time.time() - _st))
-    if args.benchmark:
-        text_sys.text_detector.autolog.report()
-        text_sys.text_recognizer.autolog.report()
+        logger.info("The predict total time is {}".format(time.time() - _st))
+        if args.use_angle_cls:
+            stats = text_sys.cls_stats
+            logger.info(
+                "cls mode {}: {} of {} crops classified, {} rotated, {} "
+                "recognized again, {} rotated pages".format(
+                    args.cls_mode, stats['cls'], stats['crops'], stats[
+                        'rotated'], stats['rerec'], stats['rotated_pages']))
+        if args.benchmark:
+            text_sys.text_detector.autolog.report()
+            text_sys.text_recognizer.autolog.report()
 
     with open(
             os.path.join(draw_img_save_dir, "system_results.txt"),
@@ -256,17 +807,4 @@ def main(args):
 
 if __name__ == "__main__":
     args = utility.parse_args()
-    if args.use_mp:
-        p_list = []
-        total_process_num = args.total_process_num
-        for process_id in range(total_process_num):
-            cmd = [sys.executable, "-u"] + sys.argv + [
-                "--process_id={}".format(process_id),
-                "--use_mp={}".format(False)
-            ]
-            p = subprocess.Popen(cmd, stdout=sys.stdout, stderr=sys.stdout)
-            p_list.append(p)
-        for p in p_list:
-            p.wait()
-    else:
-        main(args)
+    main(args)
@@ -49,11 +49,16 @@ def init_args():
     # params for text detector
     parser.add_argument("--image_dir", type=str)
     parser.add_argument("--page_num", type=int, default=0)
+    parser.add_argument("--use_result_cache", type=str2bool, default=False)
+    parser.add_argument("--result_cache_size", type=int, default=256)
+    parser.add_argument("--result_cache_dir", type=str, default=None)
+    parser.add_argument("--result_cache_max_disk_mb", type=int, default=1024)
     parser.add_argument("--det_algorithm", type=str, default='DB')
     parser.add_argument("--det_model_dir", type=str)
     parser.add_argument("--det_limit_side_len", type=float, default=960)
     parser.add_argument("--det_limit_type", type=str, default='max')
     parser.add_argument("--det_box_type", type=str, default='quad')
+    parser.add_argument("--det_batch_num", type=int, default=1)
 
     # DB parmas
     parser.add_argument("--det_db_thresh", type=float, default=0.3)
@@ -62,6 +67,7 @@ def init_args():
     parser.add_argument("--max_batch_size", type=int, default=10)
     parser.add_argument("--use_dilation", type=str2bool, default=False)
     parser.add_argument("--det_db_score_mode", type=str, default="fast")
+    parser.add_argument("--det_db_batch_postprocess", type=str2bool, default=False)
 
     # EAST parmas
     parser.add_argument("--det_east_score_thresh", type=float, default=0.8)
@@ -90,6 +96,8 @@ def init_args():
     parser.add_argument("--rec_image_inverse", type=str2bool, default=True)
     parser.add_argument("--rec_image_shape", type=str, default="3, 48, 320")
     parser.add_argument("--rec_batch_num", type=int, default=6)
+    parser.add_argument("--rec_beam_size", type=int, default=1)
+    parser.add_argument("--rec_width_buckets", type=str, default="")
     parser.add_argument("--max_text_length", type=int, default=25)
     parser.add_argument(
         "--rec_char_dict_path",
@@ -99,6 +107,8 @@ def init_args():
     parser.add_argument(
         "--vis_font_path", type=str, default="./doc/fonts/simfang.ttf")
     parser.add_argument("--drop_score", type=float, default=0.5)
+    parser.add_argument("--crop_num_threads", type=int, default=1)
+    parser.add_argument("--crop_to_rec_height", type=str2bool, default=False)
 
     # params for e2e
     parser.add_argument("--e2e_algorithm", type=str, default='PGNet')
@@ -112,6 +122,8 @@ def init_args():
         "--e2e_char_dict_path", type=str, default="./ppocr/utils/ic15_dict.txt")
     parser.add_argument("--e2e_pgnet_valid_set", type=str, default='totaltext')
     parser.add_argument("--e2e_pgnet_mode", type=str, default='fast')
+    parser.add_argument("--e2e_batch_num", type=int, default=1)
+    parser.add_argument("--e2e_pgnet_num_workers", type=int, default=1)
 
     # params for text classifier
     parser.add_argument("--use_angle_cls", type=str2bool, default=False)
@@ -120,6 +132,14 @@ def init_args():
     parser.add_argument("--label_list", type=list, default=['0', '180'])
     parser.add_argument("--cls_batch_num", type=int, default=6)
     parser.add_argument("--cls_thresh", type=float, default=0.9)
+    parser.add_argument(
+        "--cls_mode",
+        type=str,
+        default='always',
+        choices=['always', 'adaptive'])
+    parser.add_argument("--cls_rec_score_thresh", type=float, default=0.8)
+    parser.add_argument("--cls_page_vote_ratio", type=float, default=0.5)
+    parser.add_argument("--cls_page_vote_min", type=int, default=2)
 
     parser.add_argument("--enable_mkldnn", type=str2bool, default=False)
     parser.add_argument("--cpu_threads", type=int, default=10)
@@ -634,7 +654,7 @@ def get_rotate_crop_image(img, points):
     return dst_img
 
 
-def get_minarea_rect_crop(img, points):
+def get_minarea_rect(points):
     bounding_box = cv2.minAreaRect(np.array(points).astype(np.int32))
     points = sorted(list(cv2.boxPoints(bounding_box)), key=lambda x: x[0])
 
@@ -653,10 +673,95 @@ def get_minarea_rect_crop(img, points):
         index_c = 2
 
     box = [points[index_a], points[index_b], points[index_c], points[index_d]]
-    crop_img = get_rotate_crop_image(img, np.array(box))
+    return np.array(box)
+
+
+def get_minarea_rect_crop(img, points):
+    crop_img = get_rotate_crop_image(img, get_minarea_rect(points))
     return crop_img
 
 
+def get_crop_image(img, points, target_height=None):
+    """
+    same crop as get_rotate_crop_image, with two shortcuts: an axis-aligned
+    box inside the image is sliced instead of warped, and with target_height
+    a crop taller than it (after the rot90 of tall crops) is warped down to
+    that height directly, so the recognizer does not need to resize it again.
+    Smaller crops are left to the cheaper bilinear upscale of the recognizer.
+    """
+    assert len(points) == 4, "shape of points must be 4*2"
+    points = np.float32(points)
+    img_crop_width = int(
+        max(
+            np.linalg.norm(points[0] - points[1]),
+            np.linalg.norm(points[2] - points[3])))
+    img_crop_height = int(
+        max(
+            np.linalg.norm(points[0] - points[3]),
+            np.linalg.norm(points[1] - points[2])))
+    if img_crop_width == 0 or img_crop_height == 0:
+        return get_rotate_crop_image(img, points)
+    rotate = img_crop_height * 1.0 / img_crop_width >= 1.5
+    dst_width, dst_height = img_crop_width, img_crop_height
+    if target_height is not None and target_height < (img_crop_width if rotate
+                                                      else img_crop_height):
+        if rotate:
+            dst_width = target_height
+            dst_height = int(
+                math.ceil(target_height * img_crop_height / img_crop_width))
+        else:
+            dst_width = int(
+                math.ceil(target_height * img_crop_width / img_crop_height))
+            dst_height = target_height
+
+    left, top = points[0]
+    img_height, img_width = img.shape[0:2]
+    if np.all(points == np.round(points)) and \
+            points[1][1] == top and points[3][0] == left and \
+            np.all(points[2] == [left + img_crop_width,
+                                 top + img_crop_height]) and \
+            points[1][0] == points[2][0] and points[3][1] == points[2][1] and \
+            left >= 0 and top >= 0 and \
+            left + img_crop_width <= img_width and \
+            top + img_crop_height <= img_height:
+        left, top = int(left), int(top)
+        dst_img = img[top:top + img_crop_height, left:left + img_crop_width]
+        if (dst_width, dst_height) != (img_crop_width, img_crop_height):
+            dst_img = cv2.resize(dst_img, (dst_width, dst_height))
+    else:
+        pts_std = np.float32([[0, 0], [dst_width, 0], [dst_width, dst_height],
+                              [0, dst_height]])
+        M = cv2.getPerspectiveTransform(points, pts_std)
+        dst_img = cv2.warpPerspective(
+            img,
+            M, (dst_width, dst_height),
+            borderMode=cv2.BORDER_REPLICATE,
+            flags=cv2.INTER_CUBIC)
+    if rotate:
+        dst_img = np.rot90(dst_img)
+    return dst_img
+
+
+def get_crop_image_list(img,
+                        dt_boxes,
+                        box_type="quad",
+                        target_height=None,
+                        executor=None):
+    """
+    crop all boxes of an image, on the threads of executor if it is given.
+    OpenCV releases the GIL while warping, so the crops run in parallel.
+    """
+
+    def crop(box):
+        if box_type != "quad":
+            box = get_minarea_rect(box)
+        return get_crop_image(img, box, target_height)
+
+    if executor is None or len(dt_boxes) < 2:
+        return [crop(box) for box in dt_boxes]
+    return list(executor.map(crop, dt_boxes))
+
+
 def check_gpu(use_gpu):
     if use_gpu and not paddle.is_compiled_with_cuda():
         use_gpu = False
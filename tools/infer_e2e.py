@@ -143,7 +143,7 @@ def main():
             images = paddle.to_tensor(images)
             preds = model(images)
             post_result = post_process_class(preds, shape_list)
-            points, strs = post_result['points'], post_result['texts']
+            points, strs = post_result[0]['points'], post_result[0]['texts']
             # write result
             dt_boxes_json = []
             for poly, str in zip(points, strs):
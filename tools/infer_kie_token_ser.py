@@ -30,7 +30,7 @@ import cv2
 import json
 import paddle
 
-from ppocr.data import create_operators, transform
+from ppocr.data import create_operators, transform_with_ocr
 from ppocr.modeling.architectures import build_model
 from ppocr.postprocess import build_post_process
 from ppocr.utils.save_load import load_model
@@ -103,7 +103,7 @@ class SerPredictor(object):
         with open(data["img_path"], 'rb') as f:
             img = f.read()
         data["image"] = img
-        batch = transform(data, self.ops)
+        batch = transform_with_ocr([data], self.ops)[0]
         batch = to_tensor(batch)
         preds = self.model(batch)
 
@@ -14,17 +14,23 @@ sys.path.insert(0, os.path.abspath(os.path.join(__dir__, '..')))
 
 os.environ["FLAGS_allocator_strategy"] = 'auto_growth'
 import json
+import threading
+import cv2
 import paddle
 
-from ppocr.data import create_operators, transform
+from ppocr.data import create_operators, transform_with_ocr
 from ppocr.modeling.architectures import build_model
 from ppocr.postprocess import build_post_process
 from ppocr.utils.save_load import load_model
+from ppocr.utils.logging import get_logger
 from ppocr.utils.visual import draw_ser_results
-from ppocr.utils.utility import get_image_file_list, load_vqa_bio_label_maps
+from ppocr.utils.utility import get_image_file_list, load_vqa_bio_label_maps, LazyPDFReader
+from ppocr.utils.micro_batch import MicroBatchScheduler
+from ppocr.utils.result_cache import ResultCache, get_fingerprint
 import tools.program as program
+import tools.infer.utility as utility
+from ppstructure.utility import init_args as kie_init_args
 from invoice import Invoice
-import fitz
 from PIL import Image
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfbase import pdfmetrics
@@ -32,18 +38,26 @@ from easyofd.ofd import OFD
 
 
 def to_tensor(data):
+    return batch_to_tensor([data])
+
+
+def batch_to_tensor(samples, to_numpy=False):
     import numbers
     from collections import defaultdict
     data_dict = defaultdict(list)
     to_tensor_idxs = []
 
-    for idx, v in enumerate(data):
-        if isinstance(v, (np.ndarray, paddle.Tensor, numbers.Number)):
-            if idx not in to_tensor_idxs:
-                to_tensor_idxs.append(idx)
-        data_dict[idx].append(v)
+    for data in samples:
+        for idx, v in enumerate(data):
+            if isinstance(v, (np.ndarray, paddle.Tensor, numbers.Number)):
+                if idx not in to_tensor_idxs:
+                    to_tensor_idxs.append(idx)
+            data_dict[idx].append(v)
     for idx in to_tensor_idxs:
-        data_dict[idx] = paddle.to_tensor(data_dict[idx])
+        if to_numpy:
+            data_dict[idx] = np.stack(data_dict[idx])
+        else:
+            data_dict[idx] = paddle.to_tensor(data_dict[idx])
     return list(data_dict.values())
 
 
@@ -57,10 +71,7 @@ class SerPredictor(object):
                                                      global_config)
 
         # build model
-        self.model = build_model(config['Architecture'])
-
-        load_model(
-            config, self.model, model_type=config['Architecture']["model_type"])
+        self.build_model(config)
 
         from paddleocr import PaddleOCR
 
@@ -89,51 +100,141 @@ class SerPredictor(object):
             global_config['infer_mode'] = True
         self.ops = create_operators(config['Eval']['dataset']['transforms'],
                                     global_config)
+
+    def build_model(self, config):
+        self.model = build_model(config['Architecture'])
+        load_model(
+            config, self.model, model_type=config['Architecture']["model_type"])
         self.model.eval()
 
-    def __call__(self, data):
-        with open(data["img_path"], 'rb') as f:
-            img = f.read()
-        data["image"] = img
-        batch = transform(data, self.ops)
-        batch = to_tensor(batch)
+    def preprocess(self, data):
+        return self.preprocess_batch([data])[0]
+
+    def preprocess_batch(self, data_list):
+        """
+        preprocess several requests, their OCR runs as one batch
+        """
+        for data in data_list:
+            with open(data["img_path"], 'rb') as f:
+                data["image"] = f.read()
+        return transform_with_ocr(data_list, self.ops)
+
+    def predict_batch(self, samples):
+        """
+        run the SER model on several preprocessed samples in one forward pass
+        """
+        batch = batch_to_tensor(samples)
         preds = self.model(batch)
 
         post_result = self.post_process_class(
             preds, segment_offset_ids=batch[6], ocr_infos=batch[7])
         return post_result, batch
 
+    def __call__(self, data):
+        return self.predict_batch([self.preprocess(data)])
+
+
+class SerInferencePredictor(SerPredictor):
+    """
+    SerPredictor on an exported inference model (Global.ser_model_dir, see
+    tools/export_model.py), run by paddle inference with IR optimization and
+    MKLDNN on CPU instead of the dygraph model.
+    """
+
+    def build_model(self, config):
+        global_config = config['Global']
+        args = kie_init_args().parse_args([])
+        args.ser_model_dir = global_config['ser_model_dir']
+        args.use_gpu = global_config['use_gpu']
+        args.enable_mkldnn = global_config.get('enable_mkldnn',
+                                               not args.use_gpu)
+        args.cpu_threads = global_config.get('cpu_threads', args.cpu_threads)
+        self.predictor, self.input_tensor, self.output_tensors, _ = \
+            utility.create_predictor(args, 'ser', get_logger())
+        # a predictor must not run in several threads at once
+        self.lock = threading.Lock()
+
+    def predict_batch(self, samples):
+        batch = batch_to_tensor(samples, to_numpy=True)
+        with self.lock:
+            for idx in range(len(self.input_tensor)):
+                self.input_tensor[idx].copy_from_cpu(batch[idx])
+            self.predictor.run()
+            preds = self.output_tensors[0].copy_to_cpu()
+
+        post_result = self.post_process_class(
+            preds, segment_offset_ids=batch[6], ocr_infos=batch[7])
+        return post_result, batch
+
 class InvoiceApp:
     def __init__(self):
         self.config = None
         self.logger = None
         self.invoice_parser = None
         self.ser_engine = None
+        self.scheduler = None
+        self.result_cache = None
         self.initialized = False
 
     def Initialize(self):
         self.config, _, self.logger, _ = program.preprocess()
         try:
-            self.ser_engine = SerPredictor(self.config)
+            if self.config['Global'].get('use_result_cache', False):
+                self.result_cache = self.create_result_cache(self.config)
+            if self.config['Global'].get('ser_model_dir', None):
+                self.ser_engine = SerInferencePredictor(self.config)
+            else:
+                self.ser_engine = SerPredictor(self.config)
             self.initialize_ofd()
+            max_batch_size = self.config['Global'].get('max_batch_size', 1)
+            if max_batch_size > 1:
+                self.scheduler = MicroBatchScheduler(
+                    self.process_ser_batch,
+                    max_batch_size=max_batch_size,
+                    max_wait_ms=self.config['Global'].get(
+                        'max_batch_wait_ms', 10))
             self.initialized = True
         except Exception as e:
             self.logger.error("initialize failed: {}".format(e))
         return self.initialized
 
+    def create_result_cache(self, config):
+        # fingerprint the config before SerPredictor puts the ocr engine in
+        global_config = config['Global']
+        fingerprint = get_fingerprint(
+            {
+                'Architecture': config['Architecture'],
+                'PostProcess': config['PostProcess'],
+                'transforms': config['Eval']['dataset']['transforms'],
+                'kie_rec_model_dir': global_config.get('kie_rec_model_dir'),
+                'kie_det_model_dir': global_config.get('kie_det_model_dir')
+            }, [
+                config['Architecture']['Backbone'].get('checkpoints'),
+                global_config.get('kie_rec_model_dir'),
+                global_config.get('kie_det_model_dir')
+            ])
+        return ResultCache(
+            fingerprint=fingerprint,
+            max_memory_items=global_config.get('result_cache_size', 256),
+            disk_dir=global_config.get('result_cache_dir', None),
+            max_disk_mb=global_config.get('result_cache_max_disk_mb', 1024))
+
     def initialize_ofd(self):
         pdfmetrics.registerFont(TTFont('宋体', './doc/invoice/AR-PL-SungtiL-GB.ttf'))
         pdfmetrics.registerFont(TTFont('楷体', './doc/invoice/AR-PL-KaitiM-GB.ttf'))
 
+    def is_converted(self, src_path, image_path):
+        return os.path.exists(image_path) and \
+            os.path.getmtime(image_path) >= os.path.getmtime(src_path)
+
     def convert_pdf_to_image(self, pdf_path, image_path):
-        if not os.path.exists(image_path):
-            doc = fitz.open(pdf_path)
-            page = doc.load_page(0)
-            pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-            pix.save(image_path)
+        if not self.is_converted(pdf_path, image_path):
+            # only the first page is rasterized
+            img = next(iter(LazyPDFReader(pdf_path, page_num=1, prefetch=0)))
+            cv2.imwrite(image_path, img)
 
     def convert_ofd_to_image(self, ofd_path, image_path):
-        if not os.path.exists(image_path):
+        if not self.is_converted(ofd_path, image_path):
             ofd = OFD()
             ofd.read(ofd_path, 'path')
             images = ofd.to_jpg()
@@ -143,6 +244,47 @@ class InvoiceApp:
         img_end = {'jpg', 'bmp', 'png', 'jpeg', 'rgb', 'tif', 'tiff', 'gif', 'pdf', 'ofd'}
         return any([path.lower().endswith(e) for e in img_end])
 
+    def process_ser_batch(self, data_list):
+        results = [None] * len(data_list)
+        samples, indices = [], []
+        try:
+            sample_list = self.ser_engine.preprocess_batch(data_list)
+        except Exception:
+            # redo one by one so a bad request only fails itself
+            sample_list = []
+            for idx, data in enumerate(data_list):
+                try:
+                    sample_list.append(self.ser_engine.preprocess(data))
+                except Exception as e:
+                    sample_list.append(None)
+                    results[idx] = e
+        for idx, (data, sample) in enumerate(zip(data_list, sample_list)):
+            if results[idx] is not None:
+                continue
+            if sample is None:
+                results[idx] = ValueError("no text found in {}".format(data[
+                    'img_path']))
+                continue
+            samples.append(sample)
+            indices.append(idx)
+        if len(samples) > 0:
+            post_results, _ = self.ser_engine.predict_batch(samples)
+            for idx, post_result in zip(indices, post_results):
+                results[idx] = post_result
+        return results
+
+    def parse_invoice(self, data):
+        if self.scheduler is not None:
+            # merged with concurrent requests into one SER batch
+            result = self.scheduler.submit(data).result()
+        else:
+            result, _ = self.ser_engine(data)
+            result = result[0]
+        invoice = Invoice(result, self.logger)
+        invoice.parse()
+        # self.logger.info("{}".format(invoice))
+        return invoice.get_parse_result()
+
     def Process(self, img_path):
         if not self.initialized:
             return None
@@ -166,11 +308,15 @@ class InvoiceApp:
             return None
 
         try:
-            result, _ = self.ser_engine(data)
-            invoice = Invoice(result[0], self.logger)
-            invoice.parse()
-            # self.logger.info("{}".format(invoice))
-            return invoice.get_parse_result()
+            if self.result_cache is None:
+                return self.parse_invoice(data)
+            # resubmissions of the same image skip det, rec and SER
+            img = cv2.imread(data['img_path'])
+            if img is None:
+                raise ValueError("cannot decode {}".format(data['img_path']))
+            key = self.result_cache.make_key(img, 'invoice')
+            return self.result_cache.get_or_compute(
+                key, lambda: self.parse_invoice(data))
         except Exception as e:
             self.logger.error("processing {} failed: {}", img_path, e)
             return None
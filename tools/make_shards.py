@@ -0,0 +1,127 @@
+# Copyright (c) 2024 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Pack the images and labels of SimpleDataSet label files into pre-decoded
+shards for ShardDataSet, see ppocr/data/shard_dataset.py for the format.
+
+python3 tools/make_shards.py --data_dir=./train_data/ \\
+    --label_file_list ./train_data/rec/train.txt \\
+    --save_dir=./train_data/rec_shards --rec_image_shape 3,48,320
+
+The images are decoded with their EXIF orientation applied, like
+DecodeImage does by default. Pass --ignore_orientation for configs whose
+DecodeImage sets ignore_orientation: True.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+__dir__ = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(__dir__, '..')))
+
+import cv2
+import numpy as np
+
+from ppocr.data.shard_dataset import ShardWriter
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data_dir", type=str, required=True)
+    parser.add_argument(
+        "--label_file_list", type=str, nargs='+', required=True)
+    parser.add_argument("--save_dir", type=str, required=True)
+    parser.add_argument("--delimiter", type=str, default='\t')
+    parser.add_argument(
+        "--rec_image_shape",
+        type=str,
+        nargs='*',
+        default=[],
+        help="also write a pre-resized variant for each shape, e.g. 3,48,320")
+    parser.add_argument("--max_shard_mb", type=int, default=1024)
+    parser.add_argument("--num_workers", type=int, default=8)
+    parser.add_argument(
+        "--ignore_orientation",
+        action='store_true',
+        help="decode without applying the EXIF orientation, must match "
+        "ignore_orientation of DecodeImage in the training config")
+    return parser.parse_args()
+
+
+def read_lines(label_file_list):
+    for label_file in label_file_list:
+        with open(label_file, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield line if line.endswith(b'\n') else line + b'\n'
+
+
+def load_image(data_dir, delimiter, data_line, ignore_orientation=False):
+    file_name = data_line.decode('utf-8').strip("\n").split(delimiter)[0]
+    if len(file_name) > 0 and file_name[0] == "[":
+        # multiple images -> one gt label, only the first one is kept
+        file_name = json.loads(file_name)[0]
+    img_path = os.path.join(data_dir, file_name)
+    if not os.path.exists(img_path):
+        return img_path, None
+    with open(img_path, 'rb') as f:
+        buf = np.frombuffer(f.read(), dtype='uint8')
+    if ignore_orientation:
+        img = cv2.imdecode(buf, cv2.IMREAD_IGNORE_ORIENTATION |
+                           cv2.IMREAD_COLOR)
+    else:
+        img = cv2.imdecode(buf, 1)
+    return img_path, img
+
+
+def main(args):
+    rec_image_shapes = [[int(v) for v in shape.split(',')]
+                        for shape in args.rec_image_shape]
+    writer = ShardWriter(args.save_dir, rec_image_shapes, args.max_shard_mb,
+                         args.ignore_orientation)
+    lines = list(read_lines(args.label_file_list))
+    skipped = 0
+    st = time.time()
+    # decode a bounded window of images ahead of the writer
+    chunk_size = args.num_workers * 16
+    with ThreadPoolExecutor(max_workers=args.num_workers) as executor:
+        for beg in range(0, len(lines), chunk_size):
+            chunk = lines[beg:beg + chunk_size]
+            images = executor.map(
+                lambda line: load_image(args.data_dir, args.delimiter, line,
+                                        args.ignore_orientation),
+                chunk)
+            for data_line, (img_path, img) in zip(chunk, images):
+                if img is None:
+                    print("skip {}, missing or not an image".format(img_path))
+                    skipped += 1
+                    continue
+                writer.write(img, data_line)
+            done = beg + len(chunk)
+            if done // 10000 > beg // 10000 or done == len(lines):
+                print("{}/{} samples, {:.1f} samples/s".format(
+                    done, len(lines), done / (time.time() - st)))
+    meta = writer.close()
+    print("wrote {} samples ({} skipped) to {}, variants: {}, "
+          "ignore_orientation: {}".format(meta['num_samples'], skipped,
+                                          args.save_dir,
+                                          list(meta['variants'].keys()),
+                                          meta['ignore_orientation']))
+
+
+if __name__ == "__main__":
+    main(parse_args())